@@ -10,7 +10,9 @@ from .models import ApplicantApproval
 from .models import ApplicantGenderIdentity
 from .models import ApplicantRaceEthnicityInformation
 from .models import ApplicationReviewer
+from .models import ApprovalStatusTransition
 from .models import BarriersToParticipation
+from .models import CanonicalSkill
 from .models import PriorFOSSExperience
 from .models import ContractorInformation
 from .models import CommunicationChannel
@@ -18,6 +20,7 @@ from .models import Community
 from .models import Comrade
 from .models import Contribution
 from .models import CoordinatorApproval
+from .models import EmailBatch
 from .models import EmploymentTimeCommitment
 from .models import FinalApplication
 from .models import FinalInternFeedback
@@ -32,6 +35,7 @@ from .models import MentorRelationship
 from .models import NewCommunity
 from .models import NonCollegeSchoolTimeCommitment
 from .models import Notification
+from .models import OutgoingEmail
 from .models import OfficialSchool
 from .models import OfficialSchoolTerm
 from .models import Participation
@@ -47,6 +51,7 @@ from .models import Sponsorship
 from .models import TimeCommitmentSummary
 from .models import VolunteerTimeCommitment
 from .models import WorkEligibility
+from .models import normalize_project_skills
 
 class ComradeInline(admin.StackedInline):
     model = Comrade
@@ -479,6 +484,64 @@ class SignedContractAdmin(admin.ModelAdmin):
             'date_signed',
             )
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+            'subject',
+            'to',
+            'status',
+            'attempts',
+            'sent_at',
+            )
+    list_filter = (
+            'status',
+            'batch',
+            )
+    search_fields = (
+            'subject',
+            'to',
+            )
+
+class ApprovalStatusTransitionAdmin(admin.ModelAdmin):
+    list_display = (
+            'content_type',
+            'object_id',
+            'from_status',
+            'to_status',
+            'actor',
+            'created',
+            )
+    list_filter = (
+            'content_type',
+            'to_status',
+            )
+    date_hierarchy = 'created'
+    raw_id_fields = (
+            'actor',
+            )
+
+class CanonicalSkillAdmin(admin.ModelAdmin):
+    list_display = (
+            'name',
+            'order',
+            'additional',
+            )
+    list_editable = (
+            'order',
+            )
+    search_fields = (
+            'name',
+            'aliases',
+            )
+
+    # Existing project skills may count as a different skill now.
+    def save_model(self, request, obj, form, change):
+        super(CanonicalSkillAdmin, self).save_model(request, obj, form, change)
+        normalize_project_skills()
+
+    def delete_model(self, request, obj):
+        super(CanonicalSkillAdmin, self).delete_model(request, obj)
+        normalize_project_skills()
+
 class InitialMentorFeedbackInline(admin.StackedInline):
     model = InitialMentorFeedback
     can_delete = False
@@ -556,11 +619,14 @@ admin.site.register(AlumInfo, AlumInfoAdmin)
 admin.site.register(AlumSurvey, AlumSurveyAdmin)
 admin.site.register(ApplicantApproval, ApplicantApprovalAdmin)
 admin.site.register(ApplicationReviewer, ApplicationReviewerAdmin)
+admin.site.register(ApprovalStatusTransition, ApprovalStatusTransitionAdmin)
 admin.site.register(BarriersToParticipation, BarriersToParticipationAdmin)
+admin.site.register(CanonicalSkill, CanonicalSkillAdmin)
 admin.site.register(Community, CommunityAdmin)
 admin.site.register(Comrade, OnlyComradeAdmin)
 admin.site.register(CoordinatorApproval, CoordinatorApprovalAdmin)
 admin.site.register(Contribution, ContributionAdmin)
+admin.site.register(EmailBatch)
 admin.site.register(FinalApplication, FinalApplicationAdmin)
 admin.site.register(InternSelection, InternSelectionAdmin)
 admin.site.register(InitialMentorFeedback, FeedbackAdmin)
@@ -572,6 +638,7 @@ admin.site.register(MentorRelationship, MentorRelationshipAdmin)
 admin.site.register(NewCommunity, CommunityAdmin)
 admin.site.register(Notification)
 admin.site.register(OfficialSchool, OfficialSchoolAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
 admin.site.register(Participation, ParticipationAdmin)
 admin.site.register(RoundPage)
 admin.site.register(Project, ProjectAdmin)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class HomeConfig(AppConfig):
+    name = 'home'
+
+    def ready(self):
+        from . import context_processors, models, pagecache
+        context_processors.connect_signals()
+        models.connect_time_commitment_signals()
+        models.connect_counter_signals()
+        pagecache.connect_signals()
@@ -1,12 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.utils.functional import SimpleLazyObject
 from wagtail.wagtailcore.models import Page
 from .models import ApprovalStatus, DASHBOARD_MODELS
+from .pagecache import bump_versions_on_commit, get_cache, get_versions
+
+# Which approvals are pending for someone depends on the approval status of
+# every dashboard model (coordinator and mentor approvals decide who can
+# see what), so any change to one of them invalidates everyone's count.
+PENDING_APPROVALS = 'pending-approvals'
+
+PENDING_APPROVALS_TIMEOUT = 60 * 60
+
+def count_pending_approvals(user):
+    # TODO: don't count objects where the submission_and_approval_deadline has passed
+    return sum(
+            model.objects_for_dashboard(user).filter(approval_status=ApprovalStatus.PENDING).distinct().count()
+            for model in DASHBOARD_MODELS)
+
+def get_pending_approvals(user):
+    version, = get_versions((PENDING_APPROVALS,))
+    # Staff see everything, so their count changes if is_staff does.
+    key = 'home:pending-approvals:{}:{}:{}'.format(version, user.pk, int(user.is_staff))
+    cache = get_cache()
+    pending_approvals = cache.get(key)
+    if pending_approvals is None:
+        pending_approvals = count_pending_approvals(user)
+        cache.set(key, pending_approvals, PENDING_APPROVALS_TIMEOUT)
+    return pending_approvals
+
+def approvals_changed(sender, instance, **kwargs):
+    bump_versions_on_commit((PENDING_APPROVALS,))
+
+def connect_signals():
+    for sender in DASHBOARD_MODELS:
+        post_save.connect(approvals_changed, sender=sender, dispatch_uid='pending-approvals')
+        post_delete.connect(approvals_changed, sender=sender, dispatch_uid='pending-approvals')
 
 def header(request):
     if request.user.is_authenticated:
-        # TODO: don't count objects where the submission_and_approval_deadline has passed
-        pending_approvals = sum(
-                model.objects_for_dashboard(request.user).filter(approval_status=ApprovalStatus.PENDING).distinct().count()
-                for model in DASHBOARD_MODELS)
+        # Only count if the template actually shows the badge.
+        pending_approvals = SimpleLazyObject(lambda: get_pending_approvals(request.user))
     else:
         pending_approvals = 0
 
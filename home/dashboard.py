@@ -23,61 +23,152 @@ The context value can be any type. Here are some examples:
 
 - If it returns a list, then "{% for x in section %}" will loop over
   that list.
+
+Most sections need to know things about the current user, like their
+Comrade or their Role in some round. Get those from
+get_dashboard_context(request), so they're only looked up once no matter
+how many sections ask.
+
+If a section's template follows relationships from the objects the
+section returns, decorate the function with @prefetch and the names of
+those relationships, as in QuerySet.prefetch_related. They'll be loaded
+in bulk instead of one at a time while the template is rendered. This
+only works for sections that return a queryset, a list of model
+instances, or a single model instance.
+
+Staff see how long each section took to compute and render, and how many
+queries it made, at the bottom of their dashboard.
 """
 
 from collections import defaultdict
 import datetime
+import time
+
+from django.db import connection
+from django.db.models import Model, QuerySet, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils.functional import cached_property
+from outreachyhome import requesttiming
 
 from .models import ApplicantApproval
 from .models import ApprovalStatus
 from .models import Community
 from .models import Comrade
 from .models import DASHBOARD_MODELS
+from .models import InternSelection
 from .models import MentorApproval
 from .models import MentorRelationship
 from .models import Participation
 from .models import Role
-from .models import RoundPage
-from .models import get_deadline_date_for
+from .models import get_round_phases
 from .models import has_deadline_passed
+from .pagecache import get_intern_selection_report
 
 __all__ = ('get_dashboard_sections',)
 
+class DashboardContext(object):
+    """
+    What dashboard sections need to know about the person looking at the
+    dashboard. Use get_dashboard_context(request) to get the instance that
+    all sections share.
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.phases = get_round_phases(request)
+        self.roles = {}
+
+    @cached_property
+    def comrade(self):
+        try:
+            return self.user.comrade
+        except Comrade.DoesNotExist:
+            return None
+
+    def role(self, current_round):
+        try:
+            return self.roles[current_round.pk]
+        except KeyError:
+            role = Role(self.user, current_round, today=self.phases.today)
+            self.roles[current_round.pk] = role
+            return role
+
+def get_dashboard_context(request):
+    try:
+        return request.dashboard_context
+    except AttributeError:
+        request.dashboard_context = DashboardContext(request)
+        return request.dashboard_context
+
+
+def prefetch(*lookups):
+    def decorator(section):
+        section.prefetch_lookups = lookups
+        return section
+    return decorator
+
+def apply_prefetches(section, context):
+    lookups = getattr(section, 'prefetch_lookups', ())
+    if lookups:
+        # Careful not to evaluate querysets before adding the lookups.
+        if isinstance(context, QuerySet):
+            return context.prefetch_related(*lookups)
+        if isinstance(context, Model):
+            prefetch_related_objects([context], *lookups)
+        elif isinstance(context, list):
+            prefetch_related_objects(context, *lookups)
+    return context
+
+def render_section(request, section):
+    context = apply_prefetches(section, section(request))
+    if not context:
+        return None
+    template_name = "home/dashboard/{}.html".format(section.__name__)
+    return render_to_string(template_name, {'section': context}, request=request)
+
 def get_dashboard_sections(request):
+    """
+    Return a list of the rendered HTML of each section that has something
+    to show, and a list of (section name, milliseconds, number of queries)
+    for each section. Sections are only timed for staff.
+    """
     sections = []
+    timings = []
     for section in DASHBOARD_SECTIONS:
-        context = section(request)
-        if context:
-            template_name = "home/dashboard/{}.html".format(section.__name__)
-            sections.append((template_name, context))
-    return sections
+        if request.user.is_staff:
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                html = render_section(request, section)
+            milliseconds = round((time.perf_counter() - start) * 1000)
+            timings.append((section.__name__, milliseconds, len(queries)))
+        else:
+            html = render_section(request, section)
+        if html is not None:
+            sections.append(html)
+    return sections, timings
 
 
 def intern_announcement(request):
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        # Find the newest round whose intern announcement date has passed.
-        current_round = RoundPage.objects.filter(
-            internannounce__lte=today,
-        ).latest('internannounce')
-    except RoundPage.DoesNotExist:
+    dashboard = get_dashboard_context(request)
+    phases = dashboard.phases
+
+    # Find the newest round whose intern announcement date has passed.
+    current_round = phases.announced_round
+    if current_round is None:
         return None
 
     # Hide this message once the next round starts, where "starts" is defined
     # by pingnew, and "next round" means it has a later intern announcement
     # date than this one.
-    later_open_rounds = RoundPage.objects.filter(
-        pingnew__lte=today,
-        internannounce__gt=current_round.internannounce,
-    )
-    if later_open_rounds.exists():
+    if phases.has_later_open_round(current_round):
         return None
 
+    role = dashboard.role(current_round)
     roles = []
-    if current_round.is_coordinator(request.user):
+    if role.is_coordinator:
         roles.append("coordinator")
-    if current_round.is_mentor(request.user):
+    if role.is_mentor:
         roles.append("mentor")
     if request.user.is_staff:
         roles.append("organizer")
@@ -92,21 +183,17 @@ def intern_announcement(request):
 
 
 def coordinator_reminder(request):
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
+    dashboard = get_dashboard_context(request)
 
     # It's possible that some intern selections may not work out, and a mentor
     # will have to select another intern after the intern announcement date.
     # Show coordinator's communities until the day after their mentors' interns
     # start.
-    try:
-        current_round = RoundPage.objects.filter(
-            internstarts__gt=today,
-        ).earliest('internstarts')
-    except RoundPage.DoesNotExist:
+    current_round = dashboard.phases.upcoming_internship_round
+    if current_round is None:
         return None
 
-    role = Role(request.user, current_round)
+    role = dashboard.role(current_round)
     if not role.approved_coordinator_communities:
         return None
 
@@ -114,20 +201,12 @@ def coordinator_reminder(request):
 
 
 def application_summary(request):
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        current_round = RoundPage.objects.get(
-            appsopen__lte=today,
-            internannounce__gt=today,
-        )
-    except RoundPage.DoesNotExist:
+    dashboard = get_dashboard_context(request)
+    current_round = dashboard.phases.application_review_round
+    if current_round is None:
         return None
 
-    try:
-        if not request.user.is_staff and not current_round.is_reviewer(request.user):
-            return None
-    except Comrade.DoesNotExist:
+    if not request.user.is_staff and not dashboard.role(current_round).is_reviewer:
         return None
 
     pending_revisions_count = ApplicantApproval.objects.filter(
@@ -202,8 +281,8 @@ def round_events(request):
     if not request.user.is_staff:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
+    phases = get_round_phases(request)
+    today = phases.today
 
     # How long before and after the ideal date should we display each reminder?
     early = datetime.timedelta(weeks=2)
@@ -222,10 +301,11 @@ def round_events(request):
         #   target <= today + duration + late
         # but we can only query against field, so we do a little algebra to
         # shift the rest of each left-hand side over to the right.
-        rounds = RoundPage.objects.filter(**{
-            field + '__gte': today - delta - early,
-            field + '__lte': today - delta + duration + late,
-        })
+        rounds = phases.with_date_between(
+            field,
+            today - delta - early,
+            today - delta + duration + late,
+        )
 
         for current_round in rounds:
             events.append({
@@ -247,58 +327,46 @@ def sponsor_statistics(request):
     if not request.user.is_staff:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        return RoundPage.objects.filter(
-            appsopen__lte=today,
-        ).latest('appsopen')
-    except RoundPage.DoesNotExist:
+    current_round = get_round_phases(request).opened_round
+    if current_round is None:
         return None
 
+    return current_round.get_statistics(refresh='refresh-statistics' in request.GET)
+
 
 def staff_intern_progress(request):
     if not request.user.is_staff:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        return RoundPage.objects.get(
-            initialfeedback__lte=today + datetime.timedelta(days=7),
-            finalfeedback__gt=today - datetime.timedelta(days=30),
-        )
-    except RoundPage.DoesNotExist:
+    current_round = get_round_phases(request).feedback_round
+    if current_round is None:
         return None
 
+    return {
+        'current_round': current_round,
+        'interns': InternSelection.with_feedback_status(
+            current_round.get_approved_intern_selections().select_related(
+                'applicant__applicant')),
+    }
+
 
 def staff_intern_selection(request):
     if not request.user.is_staff:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        return RoundPage.objects.get(
-            appsopen__lte=today,
-            initialfeedback__gt=today + datetime.timedelta(days=7),
-        )
-    except RoundPage.DoesNotExist:
+    current_round = get_round_phases(request).intern_selection_round
+    if current_round is None:
         return None
 
+    return get_intern_selection_report(current_round)
+
 
 def staff_community_progress(request):
     if not request.user.is_staff:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        current_round = RoundPage.objects.get(
-            appsopen__lte=today,
-            internannounce__gt=today,
-        )
-    except RoundPage.DoesNotExist:
+    current_round = get_round_phases(request).application_review_round
+    if current_round is None:
         return None
 
     pending_participations = Participation.objects.filter(
@@ -318,11 +386,20 @@ def staff_community_progress(request):
     }
 
 
+def staff_request_timings(request):
+    if not request.user.is_staff:
+        return None
+
+    # Per-view statistics from a sample of recent requests; see
+    # outreachyhome/requesttiming.py.
+    return requesttiming.get_summary()
+
+
 def selected_intern(request):
-    try:
-        intern_selection = request.user.comrade.get_intern_selection()
-    except Comrade.DoesNotExist:
+    comrade = get_dashboard_context(request).comrade
+    if comrade is None:
         return None
+    intern_selection = comrade.get_intern_selection()
     if not intern_selection:
         return None
 
@@ -346,17 +423,12 @@ def intern(request):
 
 
 def eligibility_prompts(request):
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-    try:
-        current_round = RoundPage.objects.get(
-            appsopen__lte=today,
-            appslate__gt=today,
-        )
-    except RoundPage.DoesNotExist:
+    dashboard = get_dashboard_context(request)
+    current_round = dashboard.phases.initial_application_round
+    if current_round is None:
         return None
 
-    role = Role(request.user, current_round)
+    role = dashboard.role(current_round)
 
     return {
         'current_round': current_round,
@@ -372,8 +444,7 @@ def unselected_intern(request):
     away a few weeks later when the selected interns start working on
     their internships.
     """
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
+    today = get_round_phases(request).today
     try:
         return ApplicantApproval.objects.exclude(
             internselection__organizer_approved=True,
@@ -386,28 +457,29 @@ def unselected_intern(request):
         return None
 
 
+@prefetch(
+    'intern_selection__applicant__applicant__account',
+    'intern_selection__project__project_round__community',
+    'intern_selection__project__project_round__participating_round',
+    'intern_selection__initialmentorfeedback',
+    'intern_selection__midpointmentorfeedback',
+    'intern_selection__finalmentorfeedback',
+)
 def mentor(request):
     return MentorRelationship.objects.filter(mentor__mentor__account=request.user)
 
 
 def mentor_projects(request):
-    try:
-        comrade = request.user.comrade
-    except Comrade.DoesNotExist:
+    comrade = get_dashboard_context(request).comrade
+    if comrade is None:
         return None
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    today = get_deadline_date_for(now)
-
     # It's possible that some intern selections may not work out,
     # and a mentor will have to select another intern
     # after the intern announcement date.
     # Show their project until the day after their intern starts.
-    try:
-        current_round = RoundPage.objects.filter(
-            internstarts__gt=today,
-        ).earliest('internstarts')
-    except RoundPage.DoesNotExist:
+    current_round = get_round_phases(request).upcoming_internship_round
+    if current_round is None:
         return None
 
     # Get all projects where they're an approved mentor
@@ -477,6 +549,7 @@ DASHBOARD_SECTIONS = (
     staff_intern_progress,
     staff_intern_selection,
     staff_community_progress,
+    staff_request_timings,
     selected_intern,
     intern,
     eligibility_prompts,
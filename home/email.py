@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from django.core.mail import send_mail
 from django.core.signing import TimestampSigner
 from django.db import transaction
@@ -6,15 +7,57 @@ from django.template.loader import get_template
 from django.test import override_settings, RequestFactory
 from email.headerregistry import Address
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 organizers = Address("Outreachy Organizers", "organizers", "outreachy.org")
 applicant_help = Address("Outreachy Applicant Helpers", "applicant-help", "outreachy.org")
 
+_batch = threading.local()
+
+@contextmanager
+def reuse_templates():
+    """
+    While generating a batch of messages inside this block, load each
+    template only once, even if Django's cached template loader is off (as
+    it is when DEBUG is on).
+    """
+    outer = getattr(_batch, 'templates', None)
+    if outer is None:
+        _batch.templates = {}
+    try:
+        yield
+    finally:
+        _batch.templates = outer
+
+def load_template(template_name):
+    templates = getattr(_batch, 'templates', None)
+    if templates is None:
+        return get_template(template_name, using='plaintext')
+    try:
+        return templates[template_name]
+    except KeyError:
+        template = templates[template_name] = get_template(template_name, using='plaintext')
+        return template
+
+def render_template_mail(template, context, recipient_list, request=None):
+    """
+    Render a template whose first line is the subject and the rest is the
+    body, returning (subject, body).
+    """
+    # Load the specified template name unless it's already a Template object.
+    if not hasattr(template, 'render'):
+        template = load_template(template)
+
+    context.setdefault('recipient', recipient_list)
+    message = template.render(context, request).strip()
+    subject, body = message.split('\n', 1)
+    return subject.strip(), body.strip()
+
 def send_template_mail(template_name, context, recipient_list, request=None, **kwargs):
     # Only load the template once, no matter how many messages we're sending.
-    template = get_template(template_name, using='plaintext')
+    template = load_template(template_name)
     for recipient in recipient_list:
         # Templates used with this function expect the 'recipient' context
         # variable to contain a single address, not a list, so override
@@ -23,15 +66,9 @@ def send_template_mail(template_name, context, recipient_list, request=None, **k
         send_group_template_mail(template, context, [recipient], request, **kwargs)
 
 def send_group_template_mail(template, context, recipient_list, request=None, **kwargs):
-    # Load the specified template name unless it's already a Template object.
-    if not hasattr(template, 'render'):
-        template = get_template(template, using='plaintext')
-
-    context.setdefault('recipient', recipient_list)
-    message = template.render(context, request).strip()
-    subject, body = message.split('\n', 1)
+    subject, body = render_template_mail(template, context, recipient_list, request)
     kwargs.setdefault('from_email', organizers)
-    send_mail(message=body.strip(), subject=subject.strip(), recipient_list=recipient_list, **kwargs)
+    send_mail(message=body, subject=subject, recipient_list=recipient_list, **kwargs)
 
 def approval_status_changed(obj, request, **kwargs):
     get_recipients = {
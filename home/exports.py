@@ -0,0 +1,102 @@
+"""
+Stream staff data exports as JSON or CSV.
+
+An export is described by a list of columns: (name, function) pairs, where
+the function takes one exported object and returns that column's value.
+export_response turns any iterable of objects plus a column list into a
+StreamingHttpResponse, writing one row at a time, so the first bytes go out
+right away and memory use doesn't grow with the size of the round.
+
+Querysets are read with iterate_in_chunks, which (unlike
+QuerySet.iterator()) still honors select_related and prefetch_related,
+without holding every object in memory at once.
+
+JSON is the default format; add ?format=csv to the URL for CSV. CSV cells
+can't nest, so any column whose value is a list or dict (like the mentors
+on a contract export) is written to CSV as JSON.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+__all__ = ('export_response', 'iterate_in_chunks', 'export_row')
+
+CHUNK_SIZE = 100
+
+FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+}
+
+
+def iterate_in_chunks(queryset, chunk_size=CHUNK_SIZE, prepare=None):
+    """
+    Yield every object in the queryset, in order, loading chunk_size objects
+    (and their prefetched relations) at a time. If given, prepare is called
+    with each chunk's objects before any of them are yielded, for loading
+    anything prefetch_related can't.
+    """
+    pks = list(queryset.values_list('pk', flat=True))
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        by_pk = {obj.pk: obj for obj in queryset.filter(pk__in=chunk)}
+        if prepare is not None:
+            prepare(list(by_pk.values()))
+        for pk in chunk:
+            # Skip anything deleted since we looked up the list of pks.
+            if pk in by_pk:
+                yield by_pk[pk]
+
+
+def export_row(obj, columns):
+    return dict((name, get(obj)) for name, get in columns)
+
+
+def stream_json(objects, columns):
+    # Produces the same output as JsonResponse(list_of_rows, safe=False).
+    encoder = DjangoJSONEncoder()
+    separator = '['
+    for obj in objects:
+        yield separator + encoder.encode(export_row(obj, columns))
+        separator = ', '
+    yield '[]' if separator == '[' else ']'
+
+
+class Echo:
+    """
+    A file-like object for csv.writer that hands back each line instead of
+    storing it.
+    """
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return value
+
+
+def stream_csv(objects, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, get in columns])
+    for obj in objects:
+        yield writer.writerow([csv_cell(get(obj)) for name, get in columns])
+
+
+def export_response(request, basename, objects, columns):
+    """
+    Stream the exported objects in the format the request asked for, as an
+    attachment named basename plus the format's extension.
+    """
+    export_format = request.GET.get('format', 'json')
+    if export_format not in FORMATS:
+        export_format = 'json'
+    stream = stream_csv if export_format == 'csv' else stream_json
+
+    response = StreamingHttpResponse(stream(objects, columns), content_type=FORMATS[export_format])
+    response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(basename, export_format)
+    return response
@@ -0,0 +1,80 @@
+import json
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+from reversion.models import Version
+from home.models import ApprovalStatus, ApprovalStatusTransition
+
+# ApprovalStatusAction uses one of these as the comment on every revision
+# it saves.
+ACTION_COMMENTS = frozenset(
+    action.title() + '.' for action in ('submit', 'approve', 'reject', 'withdraw'))
+
+class Command(BaseCommand):
+    help = 'Adds approval actions taken before the approval status transition log existed to it, from the reversion history'
+
+    def handle(self, *args, **options):
+        added = 0
+        with transaction.atomic():
+            for model in apps.get_app_config('home').get_models():
+                if issubclass(model, ApprovalStatus):
+                    added += self.backfill(model)
+
+        self.stdout.write('{} transition{} added.'.format(
+            added, '' if added == 1 else 's'))
+
+    def backfill(self, model):
+        content_type = ContentType.objects.get_for_model(model)
+
+        # ApprovalStatusAction has logged every action since the earliest
+        # transition we have, and so has any earlier run of this command, so
+        # only look at history from before then.
+        earliest = ApprovalStatusTransition.objects.filter(
+            content_type=content_type,
+        ).aggregate(earliest=Min('created'))['earliest']
+
+        versions = Version.objects.get_for_model(model).select_related(
+            'revision',
+        ).order_by('object_id', 'revision__date_created', 'pk')
+        if earliest is not None:
+            versions = versions.filter(revision__date_created__lt=earliest)
+
+        transitions = []
+        previous_id, previous_status = None, None
+        for version in versions.iterator():
+            status = self.get_status(version)
+            if status is None:
+                continue
+            object_id = int(version.object_id)
+            # New objects start out withdrawn.
+            from_status = previous_status if object_id == previous_id else ApprovalStatus.WITHDRAWN
+            previous_id, previous_status = object_id, status
+
+            # Other revisions, like edits in the admin, still tell us what
+            # the status was before the next action, but weren't actions.
+            revision = version.revision
+            if revision.comment not in ACTION_COMMENTS:
+                continue
+
+            transitions.append(ApprovalStatusTransition(
+                content_type=content_type,
+                object_id=object_id,
+                from_status=from_status,
+                to_status=status,
+                actor_id=revision.user_id,
+                created=revision.date_created,
+            ))
+
+        ApprovalStatusTransition.objects.bulk_create(transitions, batch_size=1000)
+        return len(transitions)
+
+    def get_status(self, version):
+        # Decode the saved fields directly: Version.field_dict fails on
+        # versions that have fields the model no longer has.
+        try:
+            return json.loads(version.serialized_data)[0]['fields'].get('approval_status')
+        except (ValueError, LookupError, TypeError):
+            return None
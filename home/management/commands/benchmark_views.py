@@ -0,0 +1,219 @@
+from collections import namedtuple
+import json
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from home import models
+
+Scenario = namedtuple('Scenario', 'name role url')
+
+class Command(BaseCommand):
+    help = 'Times the most expensive views against the data in the database and writes a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--round',
+            dest='round_slug',
+            help='Slug of the round to benchmark (default: the newest round with interns)',
+        )
+        parser.add_argument('--runs', type=int, default=5, help='Timed requests per view (default: %(default)s)')
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            default=False,
+            help='Clear the cache before every timed request',
+        )
+        parser.add_argument(
+            '--only',
+            help='Only run scenarios whose name matches this regular expression',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument(
+            '--compare',
+            help='A report from an earlier run to print differences against',
+        )
+
+    def handle(self, *args, round_slug, runs, cold, only, output, compare, **options):
+        if runs < 1:
+            raise CommandError('--runs must be at least 1')
+        current_round = self.get_round(round_slug)
+        roles = self.get_roles(current_round)
+        scenarios = self.get_scenarios(current_round, roles)
+        if only:
+            scenarios = [s for s in scenarios if re.search(only, s.name)]
+
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            INTERNAL_IPS=[],
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        ):
+            for scenario in scenarios:
+                results[scenario.name] = self.run_scenario(scenario, roles[scenario.role], runs, cold)
+                self.stdout.write(self.format_result(scenario.name, results[scenario.name]))
+
+        report = {
+            'round': current_round.slug,
+            'runs': runs,
+            'cold': cold,
+            'results': results,
+        }
+        if output:
+            with open(output, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+        if compare:
+            with open(compare) as f:
+                self.print_comparison(json.load(f), report)
+
+    def get_round(self, round_slug):
+        rounds = models.RoundPage.objects.all()
+        if round_slug:
+            rounds = rounds.filter(slug=round_slug)
+        else:
+            rounds = rounds.filter(
+                participation__project__internselection__isnull=False,
+            ).order_by('-internstarts')
+        current_round = rounds.first()
+        if current_round is None:
+            raise CommandError('No round to benchmark; try running generate_benchmark_round first.')
+        return current_round
+
+    def get_roles(self, current_round):
+        """
+        Find one account to log in as for each kind of visitor. They're all
+        connected to the same intern's project and community, so every page
+        has something to show.
+        """
+        intern = models.InternSelection.objects.filter(
+            project__project_round__participating_round=current_round,
+        ).select_related(
+            'applicant__applicant__account',
+            'project__project_round__community',
+        ).order_by('pk').first()
+        if intern is None:
+            raise CommandError('Round {} has no interns to benchmark with.'.format(current_round.slug))
+
+        project = intern.project
+        community = project.project_round.community
+        return {
+            'anonymous': None,
+            'staff': User.objects.filter(is_staff=True, comrade__isnull=False).order_by('pk').first(),
+            'coordinator': User.objects.filter(
+                comrade__coordinatorapproval__community=community,
+                comrade__coordinatorapproval__approval_status=models.ApprovalStatus.APPROVED,
+            ).order_by('pk').first(),
+            'mentor': User.objects.filter(
+                comrade__mentorapproval__project=project,
+                comrade__mentorapproval__approval_status=models.ApprovalStatus.APPROVED,
+            ).order_by('pk').first(),
+            'applicant': User.objects.filter(
+                comrade__applicantapproval__application_round=current_round,
+                comrade__applicantapproval__internselection__isnull=True,
+                comrade__applicantapproval__contribution__isnull=False,
+            ).order_by('pk').first(),
+            'intern': intern.applicant.applicant.account,
+            'project': project,
+            'community': community,
+        }
+
+    def get_scenarios(self, current_round, roles):
+        round_kwargs = {'round_slug': current_round.slug}
+        community_kwargs = dict(round_kwargs, community_slug=roles['community'].slug)
+        project_kwargs = dict(community_kwargs, project_slug=roles['project'].slug)
+
+        scenarios = [
+            Scenario('project-selection', 'anonymous', reverse('project-selection')),
+            Scenario('alums', 'anonymous', reverse('alums')),
+        ]
+        for role in ('staff', 'coordinator', 'mentor', 'applicant', 'intern'):
+            scenarios.append(Scenario('dashboard-' + role, role, reverse('dashboard')))
+        scenarios += [
+            Scenario('project-selection-applicant', 'applicant', reverse('project-selection')),
+            Scenario('community-applicants', 'coordinator', reverse('community-applicants', kwargs=community_kwargs)),
+            Scenario('project-applicants', 'mentor', reverse('project-applicants', kwargs=project_kwargs)),
+            Scenario('contract-export', 'staff', reverse('contract-export', kwargs=round_kwargs)),
+            Scenario('initial-feedback-export', 'staff', reverse('initial-feedback-export', kwargs=round_kwargs)),
+            Scenario('intern-selection-report', 'staff', reverse('intern-selection-report', kwargs=round_kwargs)),
+            Scenario('email-mentor-intern-selection-reminder', 'staff', reverse('email-mentor-intern-selection-reminder', kwargs=round_kwargs)),
+            Scenario('email-coordinator-intern-selection-reminder', 'staff', reverse('email-coordinator-intern-selection-reminder', kwargs=round_kwargs)),
+            Scenario('email-intern-welcome', 'staff', reverse('email-intern-welcome', kwargs=round_kwargs)),
+            Scenario('email-internship-week', 'staff', reverse('email-internship-week', kwargs=dict(round_kwargs, week='one'))),
+            Scenario('email-initial-feedback-instructions', 'staff', reverse('email-initial-feedback-instructions', kwargs=round_kwargs)),
+        ]
+        return [s for s in scenarios if s.role == 'anonymous' or roles[s.role] is not None]
+
+    def run_scenario(self, scenario, user, runs, cold):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        # The first request pays for loading templates and connecting to
+        # the database, which isn't what we're trying to measure.
+        response, size = self.fetch(client, scenario.url)
+
+        seconds = []
+        queries = []
+        for _ in range(runs):
+            if cold:
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response, size = self.fetch(client, scenario.url)
+                seconds.append(time.perf_counter() - start)
+            queries.append(len(captured))
+
+        return {
+            'url': scenario.url,
+            'role': scenario.role,
+            'status': response.status_code,
+            'bytes': size,
+            'queries': max(queries),
+            'median_seconds': round(statistics.median(seconds), 4),
+            'min_seconds': round(min(seconds), 4),
+        }
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        # Streaming responses don't do their work until they're read.
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        return response, size
+
+    def format_result(self, name, result):
+        return '{:45} {:>4} {:>6} queries {:>9.1f} ms'.format(
+            name, result['status'], result['queries'], result['median_seconds'] * 1000)
+
+    def print_comparison(self, old_report, new_report):
+        self.stdout.write('')
+        self.stdout.write('Compared to {} ({} runs):'.format(old_report['round'], old_report['runs']))
+        old_results = old_report['results']
+        for name, new in sorted(new_report['results'].items()):
+            old = old_results.get(name)
+            if old is None:
+                self.stdout.write('{:45} new'.format(name))
+                continue
+            if old['median_seconds']:
+                change = '{:+.0%}'.format(new['median_seconds'] / old['median_seconds'] - 1)
+            else:
+                change = '-'
+            self.stdout.write('{:45} {:>6} -> {:<6} queries {:>9.1f} -> {:<9.1f} ms {:>6}'.format(
+                name,
+                old['queries'], new['queries'],
+                old['median_seconds'] * 1000, new['median_seconds'] * 1000,
+                change,
+            ))
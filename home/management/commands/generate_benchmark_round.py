@@ -0,0 +1,160 @@
+import datetime
+import random
+
+import factory.random
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+import reversion
+
+from home import factories
+from home import models
+
+class Command(BaseCommand):
+    help = 'Fills the database with a production-sized round of fake data, for use with benchmark_views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--communities', type=int, default=60)
+        parser.add_argument('--projects', type=int, default=200)
+        parser.add_argument('--applicants', type=int, default=5000)
+        parser.add_argument('--contributions', type=int, default=15000)
+        parser.add_argument('--final-applications', type=int, default=3000)
+        parser.add_argument('--interns', type=int, default=80)
+        parser.add_argument(
+            '--start-from',
+            default='initialfeedback',
+            choices=factories.round_dates,
+            help='Which deadline of the new round is today (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, so the same options generate the same round',
+        )
+
+    def handle(self, *args, communities, projects, applicants, contributions, final_applications, interns, start_from, seed, **options):
+        rng = random.Random(seed)
+        factory.random.reseed_random(seed)
+
+        # Every fake account gets the password "test". The default hasher is
+        # deliberately slow, which would make up most of the time spent here.
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            with transaction.atomic():
+                current_round = factories.RoundPageFactory(start_from=start_from)
+                staff = factories.ComradeFactory(account__is_staff=True, account__is_superuser=True)
+
+                participations = self.create_communities(current_round, communities)
+                mentors = self.create_projects(participations, projects)
+                approvals = [
+                    factories.ApplicantApprovalFactory(
+                        application_round=current_round,
+                        approval_status=models.ApprovalStatus.APPROVED,
+                    )
+                    for _ in range(applicants)
+                ]
+
+                pairs = self.pick_pairs(rng, approvals, list(mentors), contributions)
+                for applicant, project in pairs:
+                    factories.ContributionFactory(round=current_round, applicant=applicant, project=project)
+
+                applied = rng.sample(pairs, min(final_applications, len(pairs)))
+                for applicant, project in applied:
+                    factories.FinalApplicationFactory(round=current_round, applicant=applicant, project=project)
+
+                self.create_interns(current_round, applied, mentors, interns, staff.account)
+
+        self.stdout.write('Created round {}: {}'.format(current_round.roundnumber, current_round.slug))
+
+    def create_communities(self, current_round, count):
+        participations = []
+        for number in range(count):
+            community = factories.CommunityFactory(slug='community-{}'.format(number))
+            factories.CoordinatorApprovalFactory(
+                community=community,
+                approval_status=models.ApprovalStatus.APPROVED,
+            )
+            participations.append(factories.ParticipationFactory(
+                community=community,
+                participating_round=current_round,
+                approval_status=models.ApprovalStatus.APPROVED,
+            ))
+        return participations
+
+    def create_projects(self, participations, count):
+        """
+        Returns a dict mapping each new project to its mentor's approval.
+        """
+        mentors = {}
+        for number in range(count):
+            project = factories.ProjectFactory(
+                project_round=participations[number % len(participations)],
+                slug='project-{}'.format(number),
+                approval_status=models.ApprovalStatus.APPROVED,
+            )
+            mentors[project] = factories.MentorApprovalFactory(
+                project=project,
+                approval_status=models.ApprovalStatus.APPROVED,
+            )
+        return mentors
+
+    def pick_pairs(self, rng, approvals, projects, count):
+        """
+        Pick count distinct (applicant, project) pairs, spreading the
+        applicants out so every applicant has at least one contribution if
+        there are enough to go around.
+        """
+        count = min(count, len(approvals) * len(projects))
+        pairs = []
+        seen = set()
+        while len(pairs) < count:
+            applicant = approvals[len(pairs) % len(approvals)]
+            project = rng.choice(projects)
+            if (applicant.pk, project.pk) not in seen:
+                seen.add((applicant.pk, project.pk))
+                pairs.append((applicant, project))
+        return pairs
+
+    def create_interns(self, current_round, applied, mentors, count, staff):
+        today = datetime.date.today()
+        stages = (
+            (factories.InitialMentorFeedbackFactory, current_round.initialfeedback),
+            (factories.MidpointMentorFeedbackFactory, current_round.midfeedback),
+            (factories.FinalMentorFeedbackFactory, current_round.finalfeedback),
+        )
+
+        selected = set()
+        for applicant, project in applied:
+            if len(selected) >= count:
+                break
+            if applicant.pk in selected:
+                continue
+            selected.add(applicant.pk)
+
+            intern_selection = factories.InternSelectionFactory(
+                active=True,
+                round=current_round,
+                applicant=applicant,
+                project=project,
+                mentors=0,
+            )
+            mentor = factories.MentorRelationshipFactory(
+                intern_selection=intern_selection,
+                mentor=mentors[project],
+            )
+
+            # Submit feedback for every stage that has opened, the way the
+            # feedback views would, so there are revisions to look through.
+            for feedback_factory, due in stages:
+                if due - datetime.timedelta(days=7) > today:
+                    break
+                with reversion.create_revision():
+                    reversion.set_user(mentor.mentor.mentor.account)
+                    feedback = feedback_factory(intern_selection=intern_selection)
+
+                # Organizers go back and edit some of it afterward.
+                if len(selected) % 5 == 0:
+                    with reversion.create_revision():
+                        reversion.set_user(staff)
+                        feedback.organizer_payment_approved = True
+                        feedback.save()
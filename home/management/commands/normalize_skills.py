@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from home import pagecache
+from home.models import normalize_project_skills
+
+class Command(BaseCommand):
+    help = 'Counts every project skill under the canonical skill it matches now, for after aliases are changed outside the admin'
+
+    def handle(self, *args, **options):
+        changed = normalize_project_skills()
+        # normalize_project_skills doesn't send signals, so the cached skill
+        # counts have to be thrown away here.
+        if changed:
+            pagecache.bump_versions((pagecache.SITE, pagecache.SHARED))
+        self.stdout.write('{} project skill{} changed.'.format(
+            changed, '' if changed == 1 else 's'))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from home.models import Participation, Project, RoundCounters
+
+class Command(BaseCommand):
+    help = 'Rebuilds the stored counts on rounds, participations, and projects, and reports any that were wrong'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            dest='check',
+            default=False,
+            help="Only report wrong counts, don't fix them; exit with an error if any are wrong",
+        )
+
+    def handle(self, *args, check, **options):
+        wrong = 0
+        with transaction.atomic():
+            # Rounds whose counters haven't been created yet will get
+            # correct ones the first time they're needed.
+            for counters in RoundCounters.objects.select_related('round'):
+                wrong += self.recount(check, counters, RoundCounters.count(counters.round_id))
+            for participation in Participation.objects.select_related('community', 'participating_round'):
+                wrong += self.recount(check, participation, Participation.count(participation.pk))
+            for project in Project.objects.select_related('project_round__community', 'project_round__participating_round'):
+                wrong += self.recount(check, project, Project.count(project.pk))
+
+        self.stdout.write('{} wrong count{} {}.'.format(
+            wrong, '' if wrong == 1 else 's', 'found' if check else 'fixed'))
+        if check and wrong:
+            raise CommandError('Run recount without --check to fix them.')
+
+    def recount(self, check, obj, counts):
+        """
+        Compare obj's stored counts to the real ones, and fix any that are
+        wrong unless we're only checking. Returns how many were wrong.
+        """
+        wrong = {
+            field: count
+            for field, count in counts.items()
+            if getattr(obj, field) != count
+        }
+        for field, count in sorted(wrong.items()):
+            self.stdout.write('{}: {} is {}, should be {}'.format(obj, field, getattr(obj, field), count))
+        if wrong and not check:
+            type(obj).objects.filter(pk=obj.pk).update(**wrong)
+        return len(wrong)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from home.models import RoundPage, RoundPhases
+from home.pagecache import get_intern_selection_report
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached intern selection report, so organizers never wait for it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'rounds',
+            nargs='*',
+            metavar='round-slug',
+            help='Only refresh these rounds (default: the round organizers are selecting interns for)',
+        )
+
+    def handle(self, *args, rounds, **options):
+        if rounds:
+            queryset = RoundPage.objects.filter(slug__in=rounds).order_by('internstarts')
+        else:
+            current_round = RoundPhases().intern_selection_round
+            queryset = [current_round] if current_round is not None else []
+
+        for current_round in queryset:
+            report = get_intern_selection_report(current_round, refresh=True)
+            self.stdout.write('{}: {} interns, {} pending approval'.format(
+                current_round.slug,
+                len(report.interns),
+                len(report.pending),
+            ))
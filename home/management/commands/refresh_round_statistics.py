@@ -0,0 +1,33 @@
+import datetime
+from django.core.management.base import BaseCommand
+from home.models import RoundPage, get_deadline_date_for
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored statistics for rounds that are in progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'rounds',
+            nargs='*',
+            metavar='round-slug',
+            help='Only refresh these rounds (default: every round whose applications have opened and whose interns have not been announced)',
+        )
+
+    def handle(self, *args, rounds, **options):
+        if rounds:
+            queryset = RoundPage.objects.filter(slug__in=rounds)
+        else:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            today = get_deadline_date_for(now)
+            queryset = RoundPage.objects.filter(
+                appsopen__lte=today,
+                internannounce__gte=today,
+            )
+
+        for current_round in queryset.order_by('internstarts'):
+            statistics = current_round.get_statistics(refresh=True)
+            self.stdout.write('{}: {} applicants, {} contributors'.format(
+                current_round.slug,
+                statistics.applicants,
+                statistics.contributors,
+            ))
@@ -0,0 +1,85 @@
+import smtplib
+import time
+from django.conf import settings
+from django.core import mail
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from home.models import OutgoingEmail
+
+def is_transient(error):
+    """
+    Should we try sending again later? SMTP replies in the 400s mean the
+    server wants us to, and so do network problems; replies in the 500s
+    mean it will never work.
+    """
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, reply in error.recipients.values())
+    return isinstance(error, OSError)
+
+class Command(BaseCommand):
+    help = 'Sends the emails waiting in the outbox. Only run one of these at a time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100),
+            help='How many messages to send over each connection to the mail server',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=getattr(settings, 'EMAIL_OUTBOX_RATE', 0),
+            help='The most messages to send per second, or 0 for no limit',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+            help='Give up on a message after this many temporary failures',
+        )
+
+    def handle(self, *args, batch_size, rate, max_attempts, **options):
+        interval = 1 / rate if rate > 0 else 0
+        sent = failed = retry = 0
+
+        # Each message gets at most one try per run, so a message that keeps
+        # failing can't hold up the rest of the outbox.
+        last_pk = 0
+        while True:
+            batch = list(OutgoingEmail.objects.filter(
+                status=OutgoingEmail.QUEUED,
+                pk__gt=last_pk,
+            ).order_by('pk')[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            with mail.get_connection() as connection:
+                for outgoing in batch:
+                    started = time.monotonic()
+                    outgoing.attempts += 1
+                    try:
+                        connection.send_messages([outgoing.to_message()])
+                    except Exception as e:
+                        outgoing.last_error = '{}: {}'.format(type(e).__name__, e)
+                        if is_transient(e) and outgoing.attempts < max_attempts:
+                            retry += 1
+                        else:
+                            outgoing.status = OutgoingEmail.FAILED
+                            failed += 1
+                        # Start over with a fresh connection for the next
+                        # message, in case this one is broken.
+                        connection.close()
+                    else:
+                        outgoing.status = OutgoingEmail.SENT
+                        outgoing.sent_at = timezone.now()
+                        sent += 1
+                    outgoing.save(update_fields=('status', 'attempts', 'last_error', 'sent_at'))
+
+                    if interval:
+                        time.sleep(max(0, interval - (time.monotonic() - started)))
+
+        self.stdout.write('{} sent, {} failed, {} will be retried'.format(sent, failed, retry))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0151_auto_20190226_2022'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundStatistics',
+            fields=[
+                ('round', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='home.RoundPage')),
+                ('computed_at', models.DateTimeField()),
+                ('applicants', models.PositiveIntegerField(default=0)),
+                ('approved_applicants', models.PositiveIntegerField(default=0)),
+                ('rejected_applicants', models.PositiveIntegerField(default=0)),
+                ('rejected_time', models.PositiveIntegerField(default=0)),
+                ('rejected_general', models.PositiveIntegerField(default=0)),
+                ('rejected_essay', models.PositiveIntegerField(default=0)),
+                ('countries', models.TextField(blank=True)),
+                ('contributors', models.PositiveIntegerField(default=0)),
+                ('us_contributors', models.PositiveIntegerField(default=0)),
+                ('us_people_of_color_contributors', models.PositiveIntegerField(default=0)),
+                ('cisgender_contributors', models.PositiveIntegerField(default=0)),
+                ('transgender_contributors', models.PositiveIntegerField(default=0)),
+                ('genderqueer_contributors', models.PositiveIntegerField(default=0)),
+                ('final_applicants', models.PositiveIntegerField(default=0)),
+                ('approved_communities_with_projects', models.PositiveIntegerField(default=0)),
+                ('approved_projects', models.PositiveIntegerField(default=0)),
+                ('funded_interns', models.PositiveIntegerField(default=0)),
+                ('funded_interns_with_projects', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'round statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('home', '0152_roundstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailBatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=100)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'email batches',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Q', 'Queued'), ('S', 'Sent'), ('F', 'Failed')], db_index=True, default='Q', max_length=1)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('subject', models.TextField()),
+                ('body', models.TextField()),
+                ('from_email', models.TextField()),
+                ('to', models.TextField()),
+                ('cc', models.TextField(default='[]')),
+                ('bcc', models.TextField(default='[]')),
+                ('reply_to', models.TextField(default='[]')),
+                ('headers', models.TextField(default='{}')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='home.EmailBatch')),
+            ],
+        ),
+    ]
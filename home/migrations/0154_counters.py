@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_existing(apps, schema_editor):
+    # RoundCounters are created the first time each round's are needed, but
+    # every existing participation and project needs its counts now.
+    Participation = apps.get_model('home', 'Participation')
+    Project = apps.get_model('home', 'Project')
+    ApplicantApproval = apps.get_model('home', 'ApplicantApproval')
+    FinalApplication = apps.get_model('home', 'FinalApplication')
+
+    for p in Participation.objects.annotate(total=models.Sum('sponsorship__amount')):
+        Participation.objects.filter(pk=p.pk).update(total_funding=p.total or 0)
+
+    for project_id in Project.objects.values_list('pk', flat=True):
+        applications = FinalApplication.objects.filter(project=project_id)
+        approved_applications = applications.filter(applicant__approval_status='A')
+        Project.objects.filter(pk=project_id).update(
+            contributor_count=ApplicantApproval.objects.filter(
+                contribution__project=project_id,
+                approval_status='A').distinct().count(),
+            application_count=approved_applications.count(),
+            withdrawn_application_count=applications.filter(approval_status='W').count(),
+            gsoc_application_count=approved_applications.exclude(applying_to_gsoc="").count(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0153_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundCounters',
+            fields=[
+                ('round', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='home.RoundPage')),
+                ('approved_applicants', models.PositiveIntegerField(default=0)),
+                ('contributors', models.PositiveIntegerField(default=0)),
+                ('approved_projects', models.PositiveIntegerField(default=0)),
+                ('approved_communities_with_projects', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'round counters',
+            },
+        ),
+        migrations.AddField(
+            model_name='participation',
+            name='total_funding',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='contributor_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='withdrawn_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='gsoc_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.db import migrations, models
+
+
+# The skills the round page used to pick out of project skill descriptions
+# by hand, in the order it checked for them.
+CANONICAL_SKILLS = (
+    ('Python', 'python', False),
+    ('JavaScript', 'javascript\n(?-i:JS)', False),
+    ('HTML/CSS', 'html\ncss', False),
+    ('Java', 'java', False),
+    ('Django', 'django', False),
+    ('C programming', 'c program\nc language\nc code\nprogramming in c\n^(?-i:C)$', False),
+    ('C++', r'c\+\+', False),
+    ('Rust', 'rust', False),
+    ('Ruby on Rails', 'ruby on rails', False),
+    ('Ruby', 'ruby', False),
+    ('Operating Systems knowledge', 'operating systems\nkernel', False),
+    ('Linux', 'linux', False),
+    ('Web development', 'web development', False),
+    ('GTK programming', 'gtk\ngobject', False),
+    ('Git', 'git', False),
+    ('Documentation', 'writing\ndocumentation', False),
+    ('Android', 'android', True),
+    ('Mercurial', 'mercurial', True),
+    ('node.js', r'node\.js', True),
+)
+
+
+def add_canonical_skills(apps, schema_editor):
+    CanonicalSkill = apps.get_model('home', 'CanonicalSkill')
+    ProjectSkill = apps.get_model('home', 'ProjectSkill')
+
+    canonical_skills = []
+    for order, (name, aliases, additional) in enumerate(CANONICAL_SKILLS, 1):
+        canonical_skill = CanonicalSkill.objects.create(
+            name=name,
+            aliases=aliases,
+            order=order * 10,
+            additional=additional,
+        )
+        patterns = [re.compile(alias, re.IGNORECASE) for alias in aliases.splitlines()]
+        canonical_skills.append((canonical_skill, patterns))
+
+    # Historical models don't have ProjectSkill.save(), so normalize the
+    # existing project skills the same way it does.
+    for project_skill in ProjectSkill.objects.all():
+        matched = [
+            canonical_skill
+            for canonical_skill, patterns in canonical_skills
+            if any(pattern.search(project_skill.skill) for pattern in patterns)
+        ]
+        project_skill.normalized_skill = next(
+            (c.name for c in matched if not c.additional),
+            project_skill.skill.strip())
+        project_skill.save(update_fields=['normalized_skill'])
+        project_skill.additional_skills.set([c for c in matched if c.additional])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0154_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalSkill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('aliases', models.TextField(help_text='One regular expression per line. A project skill counts as this skill if its description contains a match for any of them. Matching ignores case, except inside (?-i:...).')),
+                ('order', models.PositiveSmallIntegerField(default=0, help_text='Project skills count as the first skill, in this order, whose aliases they match.')),
+                ('additional', models.BooleanField(default=False, help_text='Count matching project skills as this skill too, as well as the first ordinary skill they match. For example, projects often list Android together with another skill.')),
+            ],
+            options={
+                'ordering': ('order', 'name'),
+            },
+        ),
+        migrations.AddField(
+            model_name='projectskill',
+            name='normalized_skill',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='projectskill',
+            name='additional_skills',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='project_skills', to='home.CanonicalSkill'),
+        ),
+        migrations.RunPython(add_canonical_skills, reverse_code=migrations.RunPython.noop),
+    ]
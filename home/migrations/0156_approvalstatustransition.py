@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('home', '0155_canonicalskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalStatusTransition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('from_status', models.CharField(choices=[('P', 'Pending'), ('A', 'Approved'), ('W', 'Withdrawn'), ('R', 'Rejected')], max_length=1)),
+                ('to_status', models.CharField(choices=[('P', 'Pending'), ('A', 'Approved'), ('W', 'Withdrawn'), ('R', 'Rejected')], max_length=1)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'get_latest_by': 'created',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='approvalstatustransition',
+            index=models.Index(fields=['content_type', 'to_status', 'created'], name='home_approv_content_7eb01f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalstatustransition',
+            index=models.Index(fields=['content_type', 'object_id', 'created'], name='home_approv_content_2b32a5_idx'),
+        ),
+    ]
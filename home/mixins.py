@@ -13,7 +13,9 @@ import reversion
 
 from .models import ApplicantApproval
 from .models import ApprovalStatus
+from .models import ApprovalStatusTransition
 from .models import Comrade
+from .models import forget_permissions
 from .models import has_deadline_passed
 from .models import Role
 from .models import RoundPage
@@ -192,6 +194,19 @@ class ApprovalStatusAction(LoginRequiredMixin, ComradeRequiredMixin, reversion.v
         reversion.set_comment(self.kwargs['action'].title() + ".")
         self.object = self.save_form(form)
 
+        ApprovalStatusTransition.objects.create(
+                content_object=self.object,
+                from_status=self.prior_status,
+                to_status=self.target_status,
+                actor=self.request.user,
+                # Same time as the revision, so the backfill command can
+                # tell this action was already logged.
+                created=reversion.get_date_created())
+
+        # This may have changed what the user is allowed to do, and
+        # get_success_url may check.
+        forget_permissions(self.request.user)
+
         # Delay calling notify() until the database transaction is fully
         # written to disk.
         transaction.on_commit(self.notify)
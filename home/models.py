@@ -2,21 +2,31 @@ from __future__ import absolute_import, unicode_literals
 
 from os import urandom
 from base64 import urlsafe_b64encode
-from collections import Counter
+from collections import Counter, defaultdict
 import datetime
 from email.headerregistry import Address
+import json
 import random
 import os.path
+import re
 
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.core import validators
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.core.mail import EmailMessage
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
 from django.forms import ValidationError
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.functional import cached_property
-from itertools import chain, groupby
+from django.views.decorators.http import condition
+from itertools import chain
 from urllib.parse import urlsplit, urlparse
 
 from ckeditor.fields import RichTextField as CKEditorField
@@ -42,6 +52,7 @@ from wagtail.wagtailimages.blocks import ImageChooserBlock
 from wagtail.contrib.table_block.blocks import TableBlock
 from wagtail.contrib.wagtailroutablepage.models import RoutablePageMixin, route
 from wagtail.wagtailembeds.blocks import EmbedBlock
+from wagtail.wagtailsearch import index as search_index
 
 from . import email
 from .feeds import WagtailFeed
@@ -97,9 +108,38 @@ class StatsRoundFifteen(Page):
 class BlogIndex(RoutablePageMixin, Page):
     feed_generator = WagtailFeed()
 
+    @cached_property
+    def feed_summary(self):
+        """
+        Just enough about the posts in the feed to tell whether a feed reader
+        already has the current version, in a single query.
+        """
+        summary = self.get_children().live().aggregate(
+            count=models.Count('pk'),
+            last_published_at=models.Max('last_published_at'),
+        )
+        summary['last_published_at'] = max(
+            filter(None, (summary['last_published_at'], self.last_published_at)),
+            default=None,
+        )
+        return summary
+
+    def feed_etag(self, request, *args):
+        # Include the number of posts so unpublishing one changes the ETag.
+        summary = self.feed_summary
+        if summary['last_published_at'] is None:
+            return None
+        return '{}-{}'.format(summary['count'], summary['last_published_at'].timestamp())
+
+    def feed_last_modified(self, request, *args):
+        return self.feed_summary['last_published_at']
+
     @route(r'^feed/$')
     def feed(self, request):
-        return self.feed_generator(request, self)
+        return condition(
+            etag_func=self.feed_etag,
+            last_modified_func=self.feed_last_modified,
+        )(self.feed_generator)(request, self)
 
 # All dates in RoundPage below, if an exact time matters, actually represent
 # the given date at 4PM UTC.
@@ -302,12 +342,12 @@ class RoundPage(Page):
 
     # Is there an approved project with a late deadline, or are all projects on time?
     def has_application_deadline_passed(self):
-        participations = self.participation_set.all().approved()
-        for p in participations:
-            projects = p.project_set.approved()
-            for project in projects:
-                if project.deadline == Project.LATE:
-                    return has_deadline_passed(self.appslate)
+        late_projects = Project.objects.approved().filter(
+                project_round__participating_round=self,
+                project_round__approval_status=ApprovalStatus.APPROVED,
+                deadline=Project.LATE)
+        if late_projects.exists():
+            return has_deadline_passed(self.appslate)
         return has_deadline_passed(self.appsclose)
 
     def has_intern_announcement_deadline_passed(self):
@@ -332,35 +372,41 @@ class RoundPage(Page):
         approved_participations = Participation.objects.filter(participating_round=self, approval_status=Participation.APPROVED).order_by('community__name')
         return [p.community for p in approved_participations]
 
+    def get_counters(self):
+        """
+        Return this round's RoundCounters, counting everything the first
+        time they're asked for. After that, signal handlers keep them up to
+        date.
+        """
+        try:
+            return self.counters
+        except RoundCounters.DoesNotExist:
+            self.counters, created = RoundCounters.objects.get_or_create(
+                    round=self, defaults=RoundCounters.count(self.pk))
+            return self.counters
+
     def number_approved_communities_with_projects(self):
-        return Participation.objects.filter(participating_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                project__isnull=False).distinct().count()
+        return self.get_counters().approved_communities_with_projects
 
     def number_approved_projects(self):
-        return Project.objects.filter(project_round__participating_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                project_round__approval_status=ApprovalStatus.APPROVED).distinct().count()
+        return self.get_counters().approved_projects
 
     def get_new_projects(self):
-        # Find all approved projects
-        projects = Project.objects.filter(project_round__participating_round=self,
+        """
+        Return the approved projects in this round that were submitted or
+        edited while pending within the last week.
+        """
+        week_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(weeks=1)
+        recently_pending = ApprovalStatusTransition.objects.for_model(Project).filter(
+                to_status=ApprovalStatus.PENDING,
+                created__gte=week_ago,
+        ).values('object_id')
+        return list(Project.objects.filter(
+                pk__in=recently_pending,
+                project_round__participating_round=self,
                 approval_status=ApprovalStatus.APPROVED,
-                project_round__approval_status=ApprovalStatus.APPROVED).order_by('project_round__community__name').distinct()
-
-        new_projects = []
-        now = datetime.datetime.now(datetime.timezone.utc)
-        week_ago = now - datetime.timedelta(weeks=1)
-        # Find all projects that were in the submitted state within the last week
-        for p in projects:
-            versions = Version.objects.get_for_object(p)
-            for v in versions:
-                if v.revision.date_created < week_ago:
-                    break
-                if v.field_dict['approval_status'] == ApprovalStatus.PENDING:
-                    new_projects.append(p)
-                    break
-        return new_projects
+                project_round__approval_status=ApprovalStatus.APPROVED,
+        ).order_by('project_round__community__name'))
     # for p in new_projects:
     #   print(p.project_round.community.name, '"' + p.short_title + '" - ', ', '.join([s.skill for s in p.projectskill_set.all()]))
     #   print("New @outreachy internship project:", p.project_round.community.name, '"' + p.short_title + '" - ', ', '.join([s.skill for s in p.projectskill_set.all()]), 'https://www.outreachy.org/apply/project-selection/#' + p.project_round.community.slug + '-' + p.slug)
@@ -376,34 +422,29 @@ class RoundPage(Page):
         return funded
 
     def is_coordinator(self, user):
-        return CoordinatorApproval.objects.filter(
-            coordinator__account=user,
-            approval_status=ApprovalStatus.APPROVED,
-            community__participation__approval_status=ApprovalStatus.APPROVED,
-            community__participation__participating_round=self,
-        ).exists()
+        return self.pk in get_permissions(user).coordinated_round_ids
 
     def is_mentor(self, user):
-        try:
-            return user.comrade.get_mentored_projects().approved().filter(
-                project_round__participating_round=self,
-                project_round__approval_status=ApprovalStatus.APPROVED,
-            ).exists()
-        except Comrade.DoesNotExist:
-            return False
+        return self.pk in get_permissions(user).mentored_round_ids
 
     def is_reviewer(self, user):
-        return self.applicationreviewer_set.approved().filter(
-            comrade__account=user,
-        ).exists()
+        return self.pk in get_permissions(user).reviewed_round_ids
 
-    def get_intern_selections(self):
+    @staticmethod
+    def get_intern_selections_in(rounds):
+        """
+        Intern selections for every round in rounds, which can be a list or
+        a queryset of RoundPages.
+        """
         return InternSelection.objects.filter(
-                project__project_round__participating_round=self,
+                project__project_round__participating_round__in=rounds,
                 project__approval_status=Project.APPROVED,
                 project__project_round__approval_status=Participation.APPROVED).exclude(
                         funding_source=InternSelection.NOT_FUNDED).order_by('project__project_round__community__name', 'project__short_title')
 
+    def get_intern_selections(self):
+        return self.get_intern_selections_in([self])
+
     def get_general_funding_intern_selections(self):
         return self.get_intern_selections().filter(
                 funding_source=InternSelection.GENERAL_FUNDED)
@@ -429,27 +470,24 @@ class RoundPage(Page):
                 in_good_standing=True)
 
     def get_interns_with_open_initial_feedback(self):
-        interns = []
         # interns may not give feedback, but we only want to send a reminder email
         # if their mentor hasn't given feedback yet.
-        for i in self.get_in_good_standing_intern_selections():
-            if i.is_initial_feedback_on_intern_open():
-                interns.append(i)
-        return interns
+        return InternSelection.with_email_recipients(
+                InternSelection.with_feedback_status(
+                    self.get_in_good_standing_intern_selections())).filter(
+                initial_feedback_on_intern_open=True)
 
     def get_interns_with_open_midpoint_feedback(self):
-        interns = []
-        for i in self.get_in_good_standing_intern_selections():
-            if i.is_midpoint_feedback_on_intern_open():
-                interns.append(i)
-        return interns
+        return InternSelection.with_email_recipients(
+                InternSelection.with_feedback_status(
+                    self.get_in_good_standing_intern_selections())).filter(
+                midpoint_feedback_on_intern_open=True)
 
     def get_interns_with_open_final_feedback(self):
-        interns = []
-        for i in self.get_in_good_standing_intern_selections():
-            if i.is_final_feedback_on_intern_open():
-                interns.append(i)
-        return interns
+        return InternSelection.with_email_recipients(
+                InternSelection.with_feedback_status(
+                    self.get_in_good_standing_intern_selections())).filter(
+                final_feedback_on_intern_open=True)
 
     def get_communities_with_unused_funding(self):
         participations = Participation.objects.filter(
@@ -484,231 +522,338 @@ class RoundPage(Page):
     def is_travel_stipend_valid(self):
         return not has_deadline_passed(self.internstarts + datetime.timedelta(days=365))
 
-    def get_common_skills_counter(self):
-        approved_projects = Project.objects.filter(project_round__participating_round=self, approval_status=Project.APPROVED)
-        skills = []
-        for p in approved_projects:
-            for s in p.projectskill_set.all():
-                if 'python' in s.skill.lower():
-                    skills.append('Python')
-                elif 'javascript' in s.skill.lower() or 'JS' in s.skill:
-                    skills.append('JavaScript')
-                elif 'html' in s.skill.lower() or 'css' in s.skill.lower():
-                    skills.append('HTML/CSS')
-                elif 'java' in s.skill.lower():
-                    skills.append('Java')
-                elif 'django' in s.skill.lower():
-                    skills.append('Django')
-                elif 'c program' in s.skill.lower() or 'c language' in s.skill.lower() or 'c code' in s.skill.lower() or 'programming in c' in s.skill.lower() or s.skill == 'C':
-                    skills.append('C programming')
-                elif 'c++' in s.skill.lower():
-                    skills.append('C++')
-                elif 'rust' in s.skill.lower():
-                    skills.append('Rust')
-                elif 'ruby on rails' in s.skill.lower():
-                    skills.append('Ruby on Rails')
-                elif 'ruby' in s.skill.lower():
-                    skills.append('Ruby')
-                elif 'operating systems' in s.skill.lower() or 'kernel' in s.skill.lower():
-                    skills.append('Operating Systems knowledge')
-                elif 'linux' in s.skill.lower():
-                    skills.append('Linux')
-                elif 'web development' in s.skill.lower():
-                    skills.append('Web development')
-                elif 'gtk' in s.skill.lower() or 'gobject' in s.skill.lower():
-                    skills.append('GTK programming')
-                elif 'git' in s.skill.lower():
-                    skills.append('Git')
-                elif 'writing' in s.skill.lower() or 'documentation' in s.skill.lower():
-                    skills.append('Documentation')
-                else:
-                    skills.append(s.skill)
-
-                # A lot of projects list Android in conjunction with another skill
-                if 'android' in s.skill.lower():
-                    skills.append('Android')
-                # Some projects list both Git or mercurial
-                if 'mercurial' in s.skill.lower():
-                    skills.append('Mercurial')
-                # Some projects list both JavaScipt and node.js
-                if 'node.js' in s.skill.lower():
-                    skills.append('node.js')
-        return Counter(skills)
-
     # Statistics functions
     def get_common_skills(self):
-        skill_counter = self.get_common_skills_counter()
-        return skill_counter.most_common(20)
+        """
+        Return the 20 skills used most often in this round's approved
+        projects, as (name, count) pairs, most common first. Each project
+        skill counts under its normalized name and under any additional
+        CanonicalSkills it matches, all totalled in one query. Use
+        pagecache.get_common_skills to get a cached copy.
+        """
+        project_skills = ProjectSkill.objects.filter(
+                project__project_round__participating_round=self,
+                project__approval_status=Project.APPROVED,
+        ).order_by()
+        normalized = project_skills.values_list(
+                'normalized_skill',
+        ).annotate(count=models.Count('pk'))
+        additional = project_skills.filter(
+                additional_skills__isnull=False,
+        ).values_list(
+                'additional_skills__name',
+        ).annotate(count=models.Count('pk'))
+
+        counter = Counter()
+        for name, count in normalized.union(additional, all=True):
+            counter[name] += count
+        return sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:20]
 
     def number_accepted_initial_applications(self):
-        return ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.APPROVED,
-                application_round=self).count()
+        return self.get_counters().approved_applicants
 
     def number_contributors(self):
-        return ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
-
-    def get_statistics_on_eligibility_check(self):
-        count_all = ApplicantApproval.objects.filter(
-                application_round=self).count()
-        count_approved = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.APPROVED,
-                application_round=self).count()
-        count_rejected_all = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.REJECTED,
-                application_round=self).count()
-        count_rejected_time = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.REJECTED,
-                reason_denied="TIME",
-                application_round=self).count()
-        count_rejected_general = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.REJECTED,
-                reason_denied="GENERAL",
-                application_round=self).count()
-        count_rejected_essay = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.REJECTED,
-                reason_denied__contains="ALIGNMENT",
-                application_round=self).count()
-        if count_rejected_all == 0:
-            return (count_all, count_approved, 0, 0, 0)
-        return (count_all, count_approved, count_rejected_essay * 100 / count_rejected_all, count_rejected_time * 100 / count_rejected_all, count_rejected_general * 100 / count_rejected_all)
+        return self.get_counters().contributors
 
-    def get_countries_stats(self):
-        all_apps = ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApplicantApproval.APPROVED)
-        countries = []
-        cities = []
-        for a in all_apps:
-            city, country = a.applicant.get_city_country()
-            if city != '':
-                cities.append(city)
-            if country != '':
-                countries.append(country)
+    def get_statistics(self, refresh=False):
+        """
+        Return the RoundStatistics snapshot for this round, computing it if
+        it doesn't exist yet, is out of date, or refresh is requested.
+        """
+        try:
+            statistics = self.statistics
+        except RoundStatistics.DoesNotExist:
+            statistics = RoundStatistics(round=self)
+            refresh = True
 
-        return Counter(countries).most_common(25)
+        if refresh or statistics.is_stale():
+            statistics.update()
+        return statistics
 
-    def get_contributor_demographics(self):
-        applicants = ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
+    def serve(self, request, *args, **kwargs):
+        # If the project selection page (views.current_round_page) would
+        # consider this a current_round, redirect there. Keep this in sync
+        # with RoundPhases.application_round.
+        now = datetime.datetime.now(datetime.timezone.utc)
+        today = get_deadline_date_for(now)
+        if self.pingnew <= today and self.appslate > today:
+            return redirect('project-selection')
 
-        us_apps = ApplicantApproval.objects.filter(
-                models.Q(paymenteligibility__us_national_or_permanent_resident=True) | models.Q(paymenteligibility__living_in_us=True),
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
+        # Only show this page if we shouldn't be showing the project selection page.
+        return super(RoundPage, self).serve(request, *args, **kwargs)
 
-        us_people_of_color_apps = ApplicantApproval.objects.filter(
-                applicantraceethnicityinformation__us_resident_demographics=True,
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
-        if us_apps == 0:
-            return (applicants, 0, 0)
+    def get_context(self, request, *args, **kwargs):
+        context = super(RoundPage, self).get_context(request, *args, **kwargs)
+        context['role'] = Role(request.user, self)
+        return context
 
-        return (applicants, (us_apps - us_people_of_color_apps) * 100 / us_apps, us_people_of_color_apps * 100 / us_apps)
+class RoundStatistics(models.Model):
+    """
+    A stored snapshot of the statistics shown on the round statistics blog
+    post and in the sponsor statistics dashboard section.
+
+    Computing these means counting over every initial application in the
+    round, which gets slow once a round has thousands of applicants, so we
+    store the raw counts here and serve pages from this one row. Use
+    RoundPage.get_statistics() to get an up-to-date snapshot, or the
+    refresh_round_statistics management command to recompute them in the
+    background.
+    """
 
-    def get_contributor_gender_stats(self):
-        all_apps = ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
+    # While a round is still accepting applications and selecting interns,
+    # serve snapshots that are at most this old. Once interns have been
+    # announced, the numbers stop changing, so that snapshot is kept until
+    # someone explicitly refreshes it.
+    STALE_AFTER = datetime.timedelta(hours=1)
+
+    # An applicant is counted as cisgender if they didn't select any of these.
+    NON_CISGENDER_IDENTITIES = (
+        'transgender',
+        'genderqueer',
+        'demi_boy',
+        'demi_girl',
+        'trans_masculine',
+        'trans_feminine',
+        'non_binary',
+        'demi_non_binary',
+        'genderflux',
+        'genderfluid',
+        'demi_genderfluid',
+        'demi_gender',
+        'bi_gender',
+        'tri_gender',
+        'multigender',
+        'pangender',
+        'maxigender',
+        'aporagender',
+        'intergender',
+        'mavrique',
+        'gender_confusion',
+        'gender_indifferent',
+        'graygender',
+        'agender',
+        'genderless',
+        'gender_neutral',
+        'neutrois',
+        'androgynous',
+        'androgyne',
+    )
 
-        if all_apps == 0:
-            return (0, 0, 0)
+    round = models.OneToOneField(RoundPage, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    computed_at = models.DateTimeField()
+
+    # Initial applications
+    applicants = models.PositiveIntegerField(default=0)
+    approved_applicants = models.PositiveIntegerField(default=0)
+    rejected_applicants = models.PositiveIntegerField(default=0)
+    rejected_time = models.PositiveIntegerField(default=0)
+    rejected_general = models.PositiveIntegerField(default=0)
+    rejected_essay = models.PositiveIntegerField(default=0)
+    # JSON list of [country, number of approved applicants] pairs,
+    # most common first.
+    countries = models.TextField(blank=True)
+
+    # Approved applicants who recorded a contribution
+    contributors = models.PositiveIntegerField(default=0)
+    us_contributors = models.PositiveIntegerField(default=0)
+    us_people_of_color_contributors = models.PositiveIntegerField(default=0)
+    cisgender_contributors = models.PositiveIntegerField(default=0)
+    transgender_contributors = models.PositiveIntegerField(default=0)
+    genderqueer_contributors = models.PositiveIntegerField(default=0)
+
+    # Approved applicants who submitted a final application
+    final_applicants = models.PositiveIntegerField(default=0)
+
+    # Communities, projects, and funding
+    approved_communities_with_projects = models.PositiveIntegerField(default=0)
+    approved_projects = models.PositiveIntegerField(default=0)
+    funded_interns = models.PositiveIntegerField(default=0)
+    funded_interns_with_projects = models.PositiveIntegerField(default=0)
 
-        cis_apps = ApplicantGenderIdentity.objects.filter(
-                transgender=False,
-                genderqueer=False,
-                demi_boy=False,
-                demi_girl=False,
-                trans_masculine=False,
-                trans_feminine=False,
-                non_binary=False,
-                demi_non_binary=False,
-                genderflux=False,
-                genderfluid=False,
-                demi_genderfluid=False,
-                demi_gender=False,
-                bi_gender=False,
-                tri_gender=False,
-                multigender=False,
-                pangender=False,
-                maxigender=False,
-                aporagender=False,
-                intergender=False,
-                mavrique=False,
-                gender_confusion=False,
-                gender_indifferent=False,
-                graygender=False,
-                agender=False,
-                genderless=False,
-                gender_neutral=False,
-                neutrois=False,
-                androgynous=False,
-                androgyne=False,
-                applicant__application_round=self,
-                applicant__approval_status=ApprovalStatus.APPROVED,
-                applicant__contribution__isnull=False).distinct().count()
+    class Meta:
+        verbose_name_plural = 'round statistics'
 
-        trans_folks_apps = ApplicantGenderIdentity.objects.filter(
-                transgender=True,
-                applicant__application_round=self,
-                applicant__approval_status=ApprovalStatus.APPROVED,
-                applicant__contribution__isnull=False).distinct().count()
+    def __str__(self):
+        return 'Statistics for {}'.format(self.round)
 
-        genderqueer_folks_apps = ApplicantGenderIdentity.objects.filter(
-                genderqueer=True,
-                applicant__application_round=self,
-                applicant__approval_status=ApprovalStatus.APPROVED,
-                applicant__contribution__isnull=False).distinct().count()
+    def is_stale(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if get_deadline_date_for(self.computed_at) > self.round.internannounce:
+            return False
+        return self.computed_at + self.STALE_AFTER < now
 
-        return (cis_apps * 100 / all_apps, trans_folks_apps * 100 / all_apps, genderqueer_folks_apps * 100 / all_apps)
+    def update(self):
+        """
+        Recompute every statistic for this round and save the snapshot.
+        """
+        applications = ApplicantApproval.objects.filter(application_round=self.round)
+        approved = applications.filter(approval_status=ApprovalStatus.APPROVED)
+        rejected = models.Q(approval_status=ApprovalStatus.REJECTED)
+
+        def count_where(*args, **kwargs):
+            return models.Sum(models.Case(
+                models.When(models.Q(*args, **kwargs), then=1),
+                default=0,
+                output_field=models.IntegerField(),
+            ))
+
+        counts = applications.aggregate(
+            applicants=models.Count('pk'),
+            approved_applicants=count_where(approval_status=ApprovalStatus.APPROVED),
+            rejected_applicants=count_where(rejected),
+            rejected_time=count_where(rejected, reason_denied="TIME"),
+            rejected_general=count_where(rejected, reason_denied="GENERAL"),
+            rejected_essay=count_where(rejected, reason_denied__contains="ALIGNMENT"),
+        )
 
-    def get_contributor_applicant_funding_status(self):
-        eligible = ApplicantApproval.objects.filter(
-                approval_status=ApplicantApproval.APPROVED,
-                application_round=self).count()
+        # Filtering on a subquery rather than joining Contribution keeps each
+        # applicant from being counted once per contribution.
+        contributors = approved.filter(pk__in=Contribution.objects.values('applicant'))
+        counts.update(contributors.aggregate(
+            contributors=models.Count('pk'),
+            us_contributors=count_where(
+                models.Q(paymenteligibility__us_national_or_permanent_resident=True) | models.Q(paymenteligibility__living_in_us=True)),
+            us_people_of_color_contributors=count_where(
+                applicantraceethnicityinformation__us_resident_demographics=True),
+        ))
+        counts.update(ApplicantGenderIdentity.objects.filter(
+            applicant__in=contributors,
+        ).aggregate(
+            cisgender_contributors=count_where(**{
+                identity: False for identity in self.NON_CISGENDER_IDENTITIES
+            }),
+            transgender_contributors=count_where(transgender=True),
+            genderqueer_contributors=count_where(genderqueer=True),
+        ))
+        counts['final_applicants'] = approved.filter(
+                pk__in=FinalApplication.objects.values('applicant')).count()
 
-        contributed = ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                contribution__isnull=False).distinct().count()
+        for field, value in counts.items():
+            # Sum() over no rows is None rather than 0.
+            setattr(self, field, value or 0)
 
-        applied = ApplicantApproval.objects.filter(
-                application_round=self,
-                approval_status=ApprovalStatus.APPROVED,
-                finalapplication__isnull=False).distinct().count()
+        countries = Counter()
+        for application in approved.select_related('applicant').only('applicant', 'applicant__location', 'applicant__timezone'):
+            city, country = application.applicant.get_city_country()
+            if country != '':
+                countries[country] += 1
+        self.countries = json.dumps(countries.most_common(25))
 
-        funded = 0
+        # The blog post counts funding for every approved community, but the
+        # sponsor dashboard only counts communities that have projects.
         participations = Participation.objects.filter(
+                participating_round=self.round,
                 approval_status=Participation.APPROVED,
-                participating_round=self)
+        ).annotate(
+            has_projects=models.Exists(Project.objects.filter(project_round=models.OuterRef('pk'))),
+        )
+        self.funded_interns = 0
+        self.funded_interns_with_projects = 0
+        self.approved_communities_with_projects = 0
         for p in participations:
-            funded = funded + p.interns_funded()
+            interns = p.interns_funded()
+            self.funded_interns += interns
+            if p.has_projects:
+                self.funded_interns_with_projects += interns
+                self.approved_communities_with_projects += 1
+        self.approved_projects = self.round.number_approved_projects()
 
-        return (eligible, contributed, applied, funded)
+        self.computed_at = datetime.datetime.now(datetime.timezone.utc)
+        self.save()
 
-    def serve(self, request, *args, **kwargs):
-        # If the project selection page (views.current_round_page) would
-        # consider this a current_round, redirect there.
-        now = datetime.datetime.now(datetime.timezone.utc)
-        today = get_deadline_date_for(now)
-        if self.pingnew <= today and self.appslate > today:
-            return redirect('project-selection')
+    # These return the same tuples the round statistics blog post has always
+    # used, computed from the stored counts.
 
-        # Only show this page if we shouldn't be showing the project selection page.
-        return super(RoundPage, self).serve(request, *args, **kwargs)
+    def get_statistics_on_eligibility_check(self):
+        if self.rejected_applicants == 0:
+            return (self.applicants, self.approved_applicants, 0, 0, 0)
+        return (
+            self.applicants,
+            self.approved_applicants,
+            self.rejected_essay * 100 / self.rejected_applicants,
+            self.rejected_time * 100 / self.rejected_applicants,
+            self.rejected_general * 100 / self.rejected_applicants,
+        )
 
-    def get_context(self, request, *args, **kwargs):
-        context = super(RoundPage, self).get_context(request, *args, **kwargs)
-        context['role'] = Role(request.user, self)
-        return context
+    def get_countries_stats(self):
+        if not self.countries:
+            return []
+        return [tuple(pair) for pair in json.loads(self.countries)]
+
+    def get_contributor_demographics(self):
+        if self.us_contributors == 0:
+            return (self.contributors, 0, 0)
+        return (
+            self.contributors,
+            (self.us_contributors - self.us_people_of_color_contributors) * 100 / self.us_contributors,
+            self.us_people_of_color_contributors * 100 / self.us_contributors,
+        )
+
+    def get_contributor_gender_stats(self):
+        if self.contributors == 0:
+            return (0, 0, 0)
+        return (
+            self.cisgender_contributors * 100 / self.contributors,
+            self.transgender_contributors * 100 / self.contributors,
+            self.genderqueer_contributors * 100 / self.contributors,
+        )
+
+    def get_contributor_applicant_funding_status(self):
+        return (self.approved_applicants, self.contributors, self.final_applicants, self.funded_interns)
+
+class RoundCounters(models.Model):
+    """
+    Counts that listing pages show for a round, stored so they don't have
+    to be counted on every page view.
+
+    Unlike RoundStatistics, these are never stale: the handlers registered
+    by connect_counter_signals recount them in the same transaction as any
+    change that could affect them. Changes made with QuerySet.update()
+    don't send signals, though, so the recount management command can
+    rebuild and check every stored count.
+    """
+
+    round = models.OneToOneField(RoundPage, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    approved_applicants = models.PositiveIntegerField(default=0)
+    # Approved applicants who recorded a contribution
+    contributors = models.PositiveIntegerField(default=0)
+    # Approved projects in approved communities
+    approved_projects = models.PositiveIntegerField(default=0)
+    approved_communities_with_projects = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'round counters'
+
+    def __str__(self):
+        return 'Counters for {}'.format(self.round)
+
+    @staticmethod
+    def count(round_id):
+        approved_applicants = ApplicantApproval.objects.filter(
+                application_round=round_id,
+                approval_status=ApprovalStatus.APPROVED)
+        return {
+            'approved_applicants': approved_applicants.count(),
+            'contributors': approved_applicants.filter(
+                contribution__isnull=False).distinct().count(),
+            'approved_projects': Project.objects.filter(
+                project_round__participating_round=round_id,
+                approval_status=ApprovalStatus.APPROVED,
+                project_round__approval_status=ApprovalStatus.APPROVED).count(),
+            'approved_communities_with_projects': Participation.objects.filter(
+                participating_round=round_id,
+                approval_status=ApprovalStatus.APPROVED,
+                project__isnull=False).distinct().count(),
+        }
+
+    @classmethod
+    def recount(cls, round_ids):
+        # Only update counters that already exist. They're created the first
+        # time someone asks for them, and creating them here could happen
+        # while their round is being deleted.
+        existing = cls.objects.filter(round__in=set(round_ids)).values_list('round', flat=True)
+        for round_id in existing:
+            cls.objects.filter(round=round_id).update(**cls.count(round_id))
 
 class CohortPage(Page):
     round_start = models.DateField("Round start date")
@@ -1157,7 +1302,63 @@ class ApprovalStatus(models.Model):
     def is_rejected(self):
         return self.approval_status == self.REJECTED
 
-class Community(models.Model):
+class ApprovalStatusTransitionQuerySet(models.QuerySet):
+    def for_model(self, model):
+        return self.filter(content_type=ContentType.objects.get_for_model(model))
+
+class ApprovalStatusTransition(models.Model):
+    """
+    A log of every action someone took on an ApprovalStatus object through
+    ApprovalStatusAction: submitting (or editing), approving, rejecting, or
+    withdrawing it. Re-submitting without a change of status is logged too,
+    with the same from_status and to_status.
+
+    The reversion history has this information as well, but getting it out
+    means loading and decoding every version of every object. Questions
+    like "which projects were submitted this week" or "how long do
+    mentors wait for approval" are range queries on this table instead.
+    Status changes made in the Django admin or by other views aren't
+    logged. The backfill_approval_transitions management command fills in
+    actions taken before this log existed from the reversion history.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    from_status = models.CharField(max_length=1, choices=ApprovalStatus.APPROVAL_STATUS_CHOICES)
+    to_status = models.CharField(max_length=1, choices=ApprovalStatus.APPROVAL_STATUS_CHOICES)
+    actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created = models.DateTimeField(default=timezone.now)
+
+    objects = ApprovalStatusTransitionQuerySet.as_manager()
+
+    class Meta:
+        get_latest_by = 'created'
+        indexes = [
+            models.Index(fields=['content_type', 'to_status', 'created']),
+            models.Index(fields=['content_type', 'object_id', 'created']),
+        ]
+
+    def __str__(self):
+        return '{} {}: {} to {} at {}'.format(
+                self.content_type.model,
+                self.object_id,
+                self.get_from_status_display(),
+                self.get_to_status_display(),
+                self.created)
+
+def prefetch_approved_coordinators(community_lookup):
+    """
+    Load every approved coordinator (and their account) for the communities
+    reached through community_lookup in one query, for
+    Community.get_coordinator_email_list and get_coordinator_names.
+    """
+    return models.Prefetch(
+            community_lookup + '__coordinatorapproval_set',
+            queryset=CoordinatorApproval.objects.approved().select_related('coordinator__account'),
+            to_attr='approved_coordinator_approvals')
+
+class Community(search_index.Indexed, models.Model):
     name = models.CharField(
             max_length=50, verbose_name="Community name")
     slug = models.SlugField(
@@ -1189,6 +1390,12 @@ class Community(models.Model):
     class Meta:
         verbose_name_plural = "communities"
 
+    search_fields = [
+        search_index.SearchField('name', partial_match=True, boost=2),
+        search_index.SearchField('description'),
+        search_index.SearchField('long_description'),
+    ]
+
     def __str__(self):
         return self.name
 
@@ -1196,16 +1403,22 @@ class Community(models.Model):
         return reverse('community-read-only', kwargs={'community_slug': self.slug})
 
     def is_coordinator(self, user):
-        return self.coordinatorapproval_set.approved().filter(
-                coordinator__account=user).exists()
+        return self.pk in get_permissions(user).coordinated_community_ids
+
+    def get_approved_coordinator_approvals(self):
+        # Use the list from prefetch_approved_coordinators, if there is one.
+        try:
+            return self.approved_coordinator_approvals
+        except AttributeError:
+            return self.coordinatorapproval_set.approved().select_related('coordinator__account')
 
     def get_coordinator_email_list(self):
         return [ca.coordinator.email_address()
-                for ca in self.coordinatorapproval_set.approved()]
+                for ca in self.get_approved_coordinator_approvals()]
 
     def get_coordinator_names(self):
         return [ca.coordinator.public_name
-                for ca in self.coordinatorapproval_set.approved()]
+                for ca in self.get_approved_coordinator_approvals()]
 
 class Notification(models.Model):
     community = models.ForeignKey(Community)
@@ -1298,6 +1511,10 @@ class Participation(ApprovalStatus):
     community = models.ForeignKey(Community)
     participating_round = models.ForeignKey(RoundPage)
 
+    # The sum of all this community's sponsorships for the round, kept up
+    # to date by connect_counter_signals.
+    total_funding = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return '{start:%Y %B} to {end:%Y %B} round - {community}'.format(
                 community = self.community.name,
@@ -1305,10 +1522,34 @@ class Participation(ApprovalStatus):
                 end = self.participating_round.internends,
                 )
 
+    @classmethod
+    def recount(cls, participation_ids):
+        for pk in set(participation_ids):
+            cls.objects.filter(pk=pk).update(**cls.count(pk))
+
+    @staticmethod
+    def count(participation_id):
+        total = Sponsorship.objects.filter(participation=participation_id).aggregate(
+                total=models.Sum('amount'))['total']
+        return {'total_funding': total or 0}
+
+    @classmethod
+    def with_email_recipients(cls, queryset):
+        """
+        Load everything coordinator reminder emails need up front, so
+        sending one per community doesn't look up each one's coordinators
+        separately.
+        """
+        return queryset.select_related(
+                'community',
+                'participating_round',
+                ).prefetch_related(
+                prefetch_approved_coordinators('community'),
+                )
+
     def interns_funded(self):
-        total_funding = self.sponsorship_set.aggregate(total=models.Sum('amount'))['total'] or 0
         # Use integer division so it rounds down.
-        return total_funding // 6500
+        return self.total_funding // 6500
 
     # Plain text string to use in email to Outreachy organizers
     # to confirm this community's participation in the round
@@ -1406,12 +1647,7 @@ class Participation(ApprovalStatus):
                 )
 
     def is_mentor(self, user):
-        try:
-            return user.comrade.get_mentored_projects().approved().filter(
-                project_round=self,
-            ).exists()
-        except Comrade.DoesNotExist:
-            return False
+        return self.pk in get_permissions(user).mentored_participation_ids
 
 class Sponsorship(models.Model):
     participation = models.ForeignKey(Participation, on_delete=models.CASCADE)
@@ -1454,7 +1690,7 @@ class Sponsorship(models.Model):
                 name=self.name,
                 community=self.participation.community)
 
-class Project(ApprovalStatus):
+class Project(search_index.Indexed, ApprovalStatus):
     project_round = models.ForeignKey(Participation, verbose_name="Outreachy round and community")
     mentors = models.ManyToManyField(Comrade, through='MentorApproval')
 
@@ -1576,12 +1812,28 @@ class Project(ApprovalStatus):
             verbose_name="Does your project need more applicants?",
             help_text='Check this box to advertise this project as needing more applicants. This is typically used by projects without a lot of strong applicants two weeks before the application deadline.<br><br>You should uncheck this box if you already have many strong applicants who have filled out a final application.')
 
+    # Counts of this project's approved applicants, kept up to date by
+    # connect_counter_signals. These match the lengths of
+    # get_applicants_and_contributions_list(), get_applications(),
+    # get_withdrawn_applications(), and get_gsoc_applications().
+    contributor_count = models.PositiveIntegerField(default=0, editable=False)
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    withdrawn_application_count = models.PositiveIntegerField(default=0, editable=False)
+    gsoc_application_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         unique_together = (
                 ('slug', 'project_round'),
                 )
         ordering = ['slug']
 
+    search_fields = [
+        search_index.SearchField('short_title', partial_match=True, boost=2),
+        search_index.SearchField('long_description'),
+        search_index.FilterField('approval_status'),
+        search_index.FilterField('project_round'),
+    ]
+
     def __str__(self):
         return '{start:%Y %B} to {end:%Y %B} round - {community} - {title}'.format(
                 start = self.project_round.participating_round.internstarts,
@@ -1642,48 +1894,74 @@ class Project(ApprovalStatus):
         if self.id is None:
             return True
         # XXX: Should coordinators also be allowed to edit projects?
-        return self.mentorapproval_set.approved().filter(
-                mentor__account=user).exists()
+        return self.pk in get_permissions(user).mentored_project_ids
 
     def get_submitter_email_list(self):
         return [ma.mentor.email_address()
                 for ma in self.mentorapproval_set.approved()]
 
+    # These filter in Python so they can share skills loaded with
+    # prefetch_related('projectskill_set') instead of querying per project.
+
+    def skills_with_requirement(self, required):
+        return [s for s in self.projectskill_set.all() if s.required == required]
+
     def required_skills(self):
-        return ProjectSkill.objects.filter(project=self, required=ProjectSkill.STRONG)
+        return self.skills_with_requirement(ProjectSkill.STRONG)
 
     def preferred_skills(self):
-        return ProjectSkill.objects.filter(project=self, required=ProjectSkill.OPTIONAL)
+        return self.skills_with_requirement(ProjectSkill.OPTIONAL)
 
     def bonus_skills(self):
-        return ProjectSkill.objects.filter(project=self, required=ProjectSkill.BONUS)
+        return self.skills_with_requirement(ProjectSkill.BONUS)
+
+    @classmethod
+    def recount(cls, project_ids):
+        for pk in set(project_ids):
+            cls.objects.filter(pk=pk).update(**cls.count(pk))
+
+    @staticmethod
+    def count(project_id):
+        counts = FinalApplication.objects.filter(project=project_id).aggregate(
+                application_count=models.Count(models.Case(models.When(
+                    applicant__approval_status=ApprovalStatus.APPROVED,
+                    then=1))),
+                withdrawn_application_count=models.Count(models.Case(models.When(
+                    approval_status=ApprovalStatus.WITHDRAWN,
+                    then=1))),
+                gsoc_application_count=models.Count(models.Case(models.When(
+                    models.Q(applicant__approval_status=ApprovalStatus.APPROVED) & ~models.Q(applying_to_gsoc=""),
+                    then=1))),
+                )
+        counts['contributor_count'] = ApplicantApproval.objects.filter(
+                contribution__project=project_id,
+                approval_status=ApprovalStatus.APPROVED).distinct().count()
+        return counts
 
     def get_applicants_and_contributions_list(self):
         applicants = ApplicantApproval.objects.filter(
                 contribution__project = self,
                 approval_status=ApprovalStatus.APPROVED).annotate(
-                        number_contributions=models.Count('contribution'))
+                        number_contributions=models.Count('contribution')
+                ).select_related('applicant').prefetch_related(models.Prefetch(
+                        'finalapplication_set',
+                        queryset=FinalApplication.objects.filter(project=self),
+                        to_attr='final_applications_to_project'))
 
         for a in applicants:
-            try:
-                fa = a.finalapplication_set.get(project=self)
-                a.submitted_application = True
-                if fa.rating == fa.UNRATED:
-                    a.rating = "Unrated"
-                else:
-                    a.rating = fa.rating
-                a.rating_tip = fa.get_rating_display()
-                if a.finalapplication_set.filter(project=self, approval_status = ApprovalStatus.WITHDRAWN):
-                    a.withdrew_application = True
-                else:
-                    a.withdrew_application = False
-
-                if a.finalapplication_set.filter(project=self).exclude(applying_to_gsoc=""):
-                    a.applying_to_gsoc = True
-                else:
-                    a.applying_to_gsoc = False
-            except:
+            # There's at most one final application per applicant and project.
+            if not a.final_applications_to_project:
                 a.submitted_application = False
+                continue
+            fa = a.final_applications_to_project[0]
+            a.submitted_application = True
+            if fa.rating == fa.UNRATED:
+                a.rating = "Unrated"
+            else:
+                a.rating = fa.rating
+            a.rating_tip = fa.get_rating_display()
+            a.withdrew_application = fa.approval_status == ApprovalStatus.WITHDRAWN
+            a.applying_to_gsoc = fa.applying_to_gsoc != ""
 
         return applicants
 
@@ -1705,11 +1983,29 @@ class Project(ApprovalStatus):
     def get_approved_mentors(self):
         return self.mentorapproval_set.filter(approval_status=ApprovalStatus.APPROVED)
 
+    @classmethod
+    def with_email_recipients(cls, queryset):
+        """
+        Load everything the mentor reminder emails need up front, so sending
+        one per project doesn't look up each project's mentors separately.
+        """
+        return queryset.select_related(
+                'project_round__community',
+                'project_round__participating_round',
+                ).prefetch_related(
+                models.Prefetch('mentorapproval_set',
+                    queryset=MentorApproval.objects.approved().select_related('mentor__account'),
+                    to_attr='approved_mentor_approvals'),
+                )
+
     def get_mentor_email_list(self):
         emails = []
-        mentors = Comrade.objects.filter(
-                mentorapproval__project=self,
-                mentorapproval__approval_status=ApprovalStatus.APPROVED).distinct()
+        try:
+            mentors = [ma.mentor for ma in self.approved_mentor_approvals]
+        except AttributeError:
+            mentors = Comrade.objects.filter(
+                    mentorapproval__project=self,
+                    mentorapproval__approval_status=ApprovalStatus.APPROVED).distinct().select_related('account')
         for m in mentors:
             emails.append(m.email_address())
         # Coordinators might get duplicate emails if they're mentors,
@@ -1733,6 +2029,112 @@ class Project(ApprovalStatus):
                     )
                 )
 
+class CanonicalSkill(models.Model):
+    """
+    A skill that the round pages count project skills under. Mentors
+    describe the same skill in lots of different ways ("Python 3", "basic
+    python programming"), so each canonical skill has alias patterns, and
+    project skills whose description matches one of them are counted under
+    this skill's name. See normalize_skill.
+
+    Project skills are normalized when they're saved. When canonical skills
+    are changed in the admin, existing project skills are normalized again;
+    the normalize_skills management command does the same thing.
+    """
+    name = models.CharField(max_length=SENTENCE_LENGTH, unique=True)
+
+    aliases = models.TextField(
+            help_text="One regular expression per line. A project skill counts as this skill if its description contains a match for any of them. Matching ignores case, except inside (?-i:...).")
+
+    order = models.PositiveSmallIntegerField(
+            default=0,
+            help_text="Project skills count as the first skill, in this order, whose aliases they match.")
+
+    additional = models.BooleanField(
+            default=False,
+            help_text="Count matching project skills as this skill too, as well as the first ordinary skill they match. For example, projects often list Android together with another skill.")
+
+    class Meta:
+        ordering = ('order', 'name')
+
+    def __str__(self):
+        return self.name
+
+    @cached_property
+    def patterns(self):
+        return [
+            re.compile(alias, re.IGNORECASE)
+            for alias in (line.strip() for line in self.aliases.splitlines())
+            if alias
+        ]
+
+    def clean(self):
+        for line in self.aliases.splitlines():
+            try:
+                re.compile(line.strip())
+            except re.error as e:
+                raise ValidationError({'aliases': '"{}" is not a valid regular expression: {}'.format(line.strip(), e)})
+
+    def matches(self, skill):
+        return any(pattern.search(skill) for pattern in self.patterns)
+
+def normalize_skill(skill, canonical_skills):
+    """
+    Return the name a project skill description should be counted under,
+    and a list of the additional CanonicalSkills it should be counted under
+    as well. canonical_skills must be in order. Descriptions that don't
+    match any ordinary canonical skill are counted as they were written.
+    """
+    name = next(
+            (c.name for c in canonical_skills if not c.additional and c.matches(skill)),
+            skill.strip())
+    additional = [c for c in canonical_skills if c.additional and c.matches(skill)]
+    return name, additional
+
+def normalize_project_skills(project_skills=None):
+    """
+    Normalize project_skills (by default, every ProjectSkill) again using
+    the current canonical skills, and return how many changed. Each distinct
+    description is only matched once, and only changed rows are written.
+    This uses QuerySet.update(), so it doesn't send any signals.
+    """
+    if project_skills is None:
+        project_skills = ProjectSkill.objects.all()
+    canonical_skills = list(CanonicalSkill.objects.all())
+    Through = ProjectSkill.additional_skills.through
+
+    current_additional = defaultdict(set)
+    for project_skill_id, canonical_skill_id in Through.objects.filter(
+            projectskill__in=project_skills,
+            ).values_list('projectskill_id', 'canonicalskill_id'):
+        current_additional[project_skill_id].add(canonical_skill_id)
+
+    normalized = {}
+    renamed = defaultdict(list)
+    readded = {}
+    for pk, skill, old_name in project_skills.values_list('pk', 'skill', 'normalized_skill'):
+        if skill not in normalized:
+            name, additional = normalize_skill(skill, canonical_skills)
+            normalized[skill] = (name, {c.pk for c in additional})
+        name, additional_ids = normalized[skill]
+        if name != old_name:
+            renamed[name].append(pk)
+        if additional_ids != current_additional[pk]:
+            readded[pk] = additional_ids
+
+    with transaction.atomic():
+        for name, pks in renamed.items():
+            ProjectSkill.objects.filter(pk__in=pks).update(normalized_skill=name)
+        if readded:
+            Through.objects.filter(projectskill__in=list(readded)).delete()
+            Through.objects.bulk_create(
+                Through(projectskill_id=pk, canonicalskill_id=canonical_skill_id)
+                for pk, additional_ids in readded.items()
+                for canonical_skill_id in additional_ids
+            )
+
+    return len(set(pk for pks in renamed.values() for pk in pks) | set(readded))
+
 class ProjectSkill(models.Model):
     project = models.ForeignKey(Project, verbose_name="Project")
 
@@ -1774,6 +2176,16 @@ class ProjectSkill(models.Model):
             help_text="Is this skill a hard requirement, a preference, or an optional bonus? Choose this carefully! Many Outreachy applicants choose not to apply for an internship project unless they meet 100% of the project skill criteria.",
             )
 
+    # What the round pages count this skill as; set by save().
+    normalized_skill = models.CharField(max_length=SENTENCE_LENGTH, blank=True, editable=False)
+    additional_skills = models.ManyToManyField(CanonicalSkill, blank=True, editable=False, related_name='project_skills')
+
+    def save(self, *args, **kwargs):
+        self.normalized_skill, additional = normalize_skill(
+                self.skill, list(CanonicalSkill.objects.all()))
+        super(ProjectSkill, self).save(*args, **kwargs)
+        self.additional_skills.set(additional)
+
     def get_skill_level_display(self):
         if self.experience_level == self.TEACH_YOU:
             return "1"
@@ -2040,16 +2452,202 @@ class CoordinatorApproval(ApprovalStatus):
 # initial application models
 # --------------------------------------------------------------------------- #
 
-def create_time_commitment_calendar(tcs, application_round):
-    application_period_length = (application_round.internends - application_round.internstarts).days + 1
-    calendar = [0]*(application_period_length)
+def find_longest_free_period(tcs, application_round, max_hours=20):
+    """
+    Find the longest run of days during the internship where the time
+    commitments in tcs add up to no more than max_hours a week. Returns a
+    tuple of the run's offset in days from the start of the internship and
+    its length in days; the length is 0 if there's no such day.
+
+    Instead of adding up the hours for every day of the internship, this
+    sweeps over the days where the total changes, so the work depends only
+    on how many time commitments there are.
+    """
+    total_days = (application_round.internends - application_round.internstarts).days + 1
+    changes = Counter()
     for tc in tcs:
-        date = application_round.internstarts
-        for i in range(application_period_length):
-            if date >= tc['start_date'] and date <= tc['end_date']:
-                calendar[i] = calendar[i] + tc['hours']
-            date = date + datetime.timedelta(days=1)
-    return calendar
+        start = max((tc['start_date'] - application_round.internstarts).days, 0)
+        end = min((tc['end_date'] - application_round.internstarts).days + 1, total_days)
+        if tc['hours'] and start < end:
+            changes[start] += tc['hours']
+            changes[end] -= tc['hours']
+
+    longest = (0, 0)
+    hours = 0
+    free_since = None
+    for day in sorted(set(changes) | {0, total_days}):
+        hours += changes[day]
+        is_free = day < total_days and hours <= max_hours
+        if is_free and free_since is None:
+            free_since = day
+        elif not is_free and free_since is not None:
+            # Ties go to the earliest free period.
+            if day - free_since > longest[1]:
+                longest = (free_since, day - free_since)
+            free_since = None
+    return longest
+
+def time_commitment_from_model(tc, hours):
+    return {
+            'start_date': tc.start_date,
+            'end_date': tc.end_date,
+            'hours': hours,
+            }
+
+def summarize_time_commitments(current_round, school_time_commitments,
+        noncollege_school_time_commitments, volunteer_time_commitments,
+        employment_time_commitments):
+    """
+    Find the longest period during the internship where an applicant doesn't
+    have more than 20 hours a week of other commitments. The commitments can
+    be querysets or lists of one applicant's time commitment models; see
+    load_time_commitments to get them for many applicants at once.
+    """
+    tcs = [ time_commitment_from_model(d, d.hours_per_week)
+            for d in volunteer_time_commitments or []
+            if d ]
+    ctcs = [ time_commitment_from_model(d, 0 if d.quit_on_acceptance else d.hours_per_week)
+            for d in noncollege_school_time_commitments or []
+            if d ]
+
+    etcs = [ time_commitment_from_model(d, 0 if d.quit_on_acceptance else d.hours_per_week)
+            for d in employment_time_commitments or []
+            if d ]
+
+    stcs = [ time_commitment_from_model(d, 40)
+            for d in school_time_commitments or []
+            if d ]
+    free_period_start_day, longest_period_free = find_longest_free_period(
+            chain(tcs, ctcs, etcs, stcs), current_round)
+
+    # Catch the case where the person is never free during the internship period
+    if longest_period_free == 0 and current_round.internends >= current_round.internstarts:
+        longest_period_free = None
+        free_period_start_date = None
+        free_period_end_date = None
+    else:
+        free_period_start_date = current_round.internstarts + datetime.timedelta(days=free_period_start_day)
+        free_period_end_date = current_round.internstarts + datetime.timedelta(days=free_period_start_day + longest_period_free - 1)
+    internship_total_days = current_round.internends - current_round.internstarts
+
+    return {
+            'longest_period_free': longest_period_free,
+            'free_period_start_date': free_period_start_date,
+            'free_period_end_date': free_period_end_date,
+            'internship_total_days': internship_total_days,
+            'school_time_commitments': school_time_commitments,
+            'noncollege_school_time_commitments': noncollege_school_time_commitments,
+            'volunteer_time_commitments': volunteer_time_commitments,
+            'employment_time_commitments': employment_time_commitments,
+            }
+
+def load_time_commitments(applications):
+    """
+    Return a dictionary mapping each ApplicantApproval's primary key to the
+    result of its get_time_commitments(), using one query per kind of time
+    commitment no matter how many applicants there are. If applications is
+    a queryset, it's used as a subquery, so this works for every applicant
+    in a round at once.
+    """
+    if isinstance(applications, models.QuerySet):
+        applicant_filter = applications.values('pk')
+        applications = applications.select_related('application_round')
+    else:
+        applications = list(applications)
+        applicant_filter = [a.pk for a in applications]
+
+    kinds = (
+            ('school_time_commitments', SchoolTimeCommitment),
+            ('noncollege_school_time_commitments', NonCollegeSchoolTimeCommitment),
+            ('volunteer_time_commitments', VolunteerTimeCommitment),
+            ('employment_time_commitments', EmploymentTimeCommitment),
+            )
+    commitments = {}
+    for kind, model in kinds:
+        by_applicant = {}
+        for tc in model.objects.filter(applicant__in=applicant_filter):
+            by_applicant.setdefault(tc.applicant_id, []).append(tc)
+        commitments[kind] = by_applicant
+
+    return {
+            a.pk: summarize_time_commitments(a.application_round, **{
+                kind: by_applicant.get(a.pk, [])
+                for kind, by_applicant in commitments.items()
+            })
+            for a in applications
+            }
+
+# The parts of get_time_commitments() that get_availability() returns. The
+# lists of time commitments aren't included, because pages that need those
+# have to load them anyway.
+AVAILABILITY_KEYS = (
+        'longest_period_free',
+        'free_period_start_date',
+        'free_period_end_date',
+        'internship_total_days',
+        )
+
+# Availability is cached until the applicant's time commitments change, but
+# should expire eventually in case a change got past the signal handlers
+# (like a bulk update).
+AVAILABILITY_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+def availability_cache_key(application_id):
+    return 'home:availability:{}'.format(application_id)
+
+def load_availability(applications):
+    """
+    Like load_time_commitments, but only return how long each applicant is
+    free during the internship. Results are cached per applicant, so only
+    applicants whose time commitments changed since the last call need any
+    queries.
+    """
+    queryset = applications if isinstance(applications, models.QuerySet) else None
+    applications = list(applications)
+    keys = { a.pk: availability_cache_key(a.pk) for a in applications }
+    cached = cache.get_many(keys.values())
+
+    result = {}
+    missing = []
+    for a in applications:
+        found = cached.get(keys[a.pk])
+        # The result depends on the internship dates too, in case someone
+        # edits those after people apply.
+        if found is not None and found['round_dates'] == (a.application_round.internstarts, a.application_round.internends):
+            result[a.pk] = found['availability']
+        else:
+            missing.append(a)
+
+    if missing:
+        to_cache = {}
+        if queryset is not None and len(missing) == len(applications):
+            # Nothing was cached, so let the database pick out the time
+            # commitments instead of sending it a long list of applicants.
+            time_commitments = load_time_commitments(queryset)
+        else:
+            time_commitments = load_time_commitments(missing)
+        for a in missing:
+            availability = { key: time_commitments[a.pk][key] for key in AVAILABILITY_KEYS }
+            result[a.pk] = availability
+            to_cache[keys[a.pk]] = {
+                    'round_dates': (a.application_round.internstarts, a.application_round.internends),
+                    'availability': availability,
+                    }
+        cache.set_many(to_cache, AVAILABILITY_CACHE_TIMEOUT)
+
+    return result
+
+def time_commitments_changed(sender, instance, **kwargs):
+    key = availability_cache_key(instance.applicant_id)
+    # Forget the old result now, and again after the transaction commits in
+    # case another request cached the old time commitments in the meantime.
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+def connect_time_commitment_signals():
+    for model in (SchoolTimeCommitment, NonCollegeSchoolTimeCommitment, VolunteerTimeCommitment, EmploymentTimeCommitment):
+        post_save.connect(time_commitments_changed, sender=model, dispatch_uid='availability')
+        post_delete.connect(time_commitments_changed, sender=model, dispatch_uid='availability')
 
 class ApplicationReviewer(ApprovalStatus):
     comrade = models.ForeignKey(Comrade)
@@ -2146,7 +2744,7 @@ class ApplicantApproval(ApprovalStatus):
             return 'Self-identified their gender'
 
         if self.reason_denied == 'TIME':
-            tcs = self.get_time_commitments()
+            tcs = self.get_availability()
             return 'Not enough days free: ' + str(tcs['longest_period_free']) + ' days free / ' + str(tcs['internship_total_days'].days) + ' days total, 49 days free required'
 
         if self.reason_denied[:5] == 'ALIGN':
@@ -2158,7 +2756,7 @@ class ApplicantApproval(ApprovalStatus):
         # Not everyone filled out the school information model
         try:
             if self.schoolinformation and self.schoolinformation.applicant_should_update:
-                tcs = self.get_time_commitments()
+                tcs = self.get_availability()
                 time_string = str(tcs['longest_period_free']) + ' days free / ' + str(tcs['internship_total_days'].days) + ' days total, 49 days free required'
 
                 return 'Revisions to school info requested: ' + time_string
@@ -2170,8 +2768,16 @@ class ApplicantApproval(ApprovalStatus):
 
         return 'Unknown'
 
+    def get_reviews(self):
+        # Use the list from ApplicantReviewQueue, if there is one.
+        try:
+            return self.loaded_reviews
+        except AttributeError:
+            return InitialApplicationReview.objects.filter(
+                    application=self).select_related('reviewer__comrade')
+
     def get_reviewer_comments(self):
-        reviews = InitialApplicationReview.objects.filter(application=self)
+        reviews = self.get_reviews()
         if not reviews:
             return []
         comments = []
@@ -2179,64 +2785,21 @@ class ApplicantApproval(ApprovalStatus):
             comments.append((r.reviewer.comrade.public_name, r.comments))
         return comments
 
-    def time_commitment_from_model(self, tc, hours):
-        return {
-                'start_date': tc.start_date,
-                'end_date': tc.end_date,
-                'hours': hours,
-                }
+    def get_availability(self):
+        # ApplicantReviewQueue loads availability for a whole page at once.
+        try:
+            return self.loaded_availability
+        except AttributeError:
+            return load_availability([self])[self.pk]
 
     def get_time_commitments(self):
-        current_round = self.application_round
-        noncollege_school_time_commitments = NonCollegeSchoolTimeCommitment.objects.filter(applicant=self)
-        school_time_commitments = SchoolTimeCommitment.objects.filter(applicant=self)
-        volunteer_time_commitments = VolunteerTimeCommitment.objects.filter(applicant=self)
-        employment_time_commitments = EmploymentTimeCommitment.objects.filter(applicant=self)
-        tcs = [ self.time_commitment_from_model(d, d.hours_per_week)
-                for d in volunteer_time_commitments or []
-                if d ]
-        ctcs = [ self.time_commitment_from_model(d, 0 if d.quit_on_acceptance else d.hours_per_week)
-                for d in noncollege_school_time_commitments or []
-                if d ]
-
-        etcs = [ self.time_commitment_from_model(d, 0 if d.quit_on_acceptance else d.hours_per_week)
-                for d in employment_time_commitments or []
-                if d ]
-
-        stcs = [ self.time_commitment_from_model(d, 40)
-                for d in school_time_commitments or []
-                if d ]
-        calendar = create_time_commitment_calendar(chain(tcs, ctcs, etcs, stcs), current_round)
-
-        longest_period_free = 0
-        free_period_start_day = 0
-        counter = 0
-        for key, group in groupby(calendar, lambda hours: hours <= 20):
-            group_len = len(list(group))
-            if key is True and group_len > longest_period_free:
-                longest_period_free = group_len
-                free_period_start_day = counter
-            counter = counter + group_len
-        # Catch the case where the person is never free during the internship period
-        if longest_period_free == 0 and free_period_start_day == 0 and counter != 0:
-            longest_period_free = None
-            free_period_start_date = None
-            free_period_end_date = None
-        else:
-            free_period_start_date = current_round.internstarts + datetime.timedelta(days=free_period_start_day)
-            free_period_end_date = current_round.internstarts + datetime.timedelta(days=free_period_start_day + longest_period_free - 1)
-        internship_total_days = current_round.internends - current_round.internstarts
-
-        return {
-                'longest_period_free': longest_period_free,
-                'free_period_start_date': free_period_start_date,
-                'free_period_end_date': free_period_end_date,
-                'internship_total_days': internship_total_days,
-                'school_time_commitments': school_time_commitments,
-                'noncollege_school_time_commitments': noncollege_school_time_commitments,
-                'volunteer_time_commitments': volunteer_time_commitments,
-                'employment_time_commitments': employment_time_commitments,
-                }
+        return summarize_time_commitments(
+                self.application_round,
+                school_time_commitments=SchoolTimeCommitment.objects.filter(applicant=self),
+                noncollege_school_time_commitments=NonCollegeSchoolTimeCommitment.objects.filter(applicant=self),
+                volunteer_time_commitments=VolunteerTimeCommitment.objects.filter(applicant=self),
+                employment_time_commitments=EmploymentTimeCommitment.objects.filter(applicant=self),
+                )
 
     def overlapping_school_terms(self):
         school_time_commitments = SchoolTimeCommitment.objects.filter(applicant=self)
@@ -2247,7 +2810,7 @@ class ApplicantApproval(ApprovalStatus):
 
     def get_essay_ratings(self):
         ratings_list = []
-        ratings = InitialApplicationReview.objects.filter(application=self)
+        ratings = self.get_reviews()
         for r in ratings:
            ratings_list.append(r.get_essay_rating())
         return ratings_list
@@ -2271,7 +2834,7 @@ class ApplicantApproval(ApprovalStatus):
 
     def get_all_red_flags(self):
         red_flags_list = []
-        reviews = InitialApplicationReview.objects.filter(application=self)
+        reviews = self.get_reviews()
         for r in reviews:
            red_flags_list.append(r.get_red_flags())
         return red_flags_list
@@ -3246,6 +3809,56 @@ class FinalApplication(ApprovalStatus):
                 ('applicant', 'project'),
                 )
 
+# These keep the stored counts on RoundCounters, Participation, and Project
+# up to date. Each handler recounts whatever the changed object could affect,
+# rather than adding or subtracting one, so the counts stay right no matter
+# what changed about the object. The recounts run in the same transaction as
+# the change.
+
+def rounds_of_applicant(applicant_id):
+    return ApplicantApproval.objects.filter(pk=applicant_id).values_list('application_round', flat=True)
+
+def rounds_of_participation(participation_id):
+    return Participation.objects.filter(pk=participation_id).values_list('participating_round', flat=True)
+
+def sponsorship_changed(sender, instance, **kwargs):
+    Participation.recount([instance.participation_id])
+
+def participation_changed(sender, instance, **kwargs):
+    Participation.recount([instance.pk])
+    RoundCounters.recount([instance.participating_round_id])
+
+def project_changed(sender, instance, **kwargs):
+    Project.recount([instance.pk])
+    RoundCounters.recount(rounds_of_participation(instance.project_round_id))
+
+def contribution_changed(sender, instance, **kwargs):
+    Project.recount([instance.project_id])
+    RoundCounters.recount(rounds_of_applicant(instance.applicant_id))
+
+def final_application_changed(sender, instance, **kwargs):
+    Project.recount([instance.project_id])
+
+def applicant_approval_changed(sender, instance, **kwargs):
+    RoundCounters.recount([instance.application_round_id])
+    # Only approved applicants are counted on projects.
+    Project.recount(chain(
+        Contribution.objects.filter(applicant=instance).values_list('project', flat=True),
+        FinalApplication.objects.filter(applicant=instance).values_list('project', flat=True),
+    ))
+
+def connect_counter_signals():
+    for model, handler in (
+            (Sponsorship, sponsorship_changed),
+            (Participation, participation_changed),
+            (Project, project_changed),
+            (Contribution, contribution_changed),
+            (FinalApplication, final_application_changed),
+            (ApplicantApproval, applicant_approval_changed),
+            ):
+        post_save.connect(handler, sender=model, dispatch_uid='counters')
+        post_delete.connect(handler, sender=model, dispatch_uid='counters')
+
 class SignedContract(models.Model):
     text = models.TextField(max_length=100000, verbose_name="Contract text")
     legal_name = models.CharField(max_length=LONG_LEGAL_NAME,
@@ -3311,6 +3924,10 @@ class InternSelection(models.Model):
                 mentor__account=user).exists()
 
     def intern_has_custom_dates(self):
+        try:
+            return self.has_custom_dates
+        except AttributeError:
+            pass
         if self.intern_starts != self.project.project_round.participating_round.internstarts:
             return True
         if self.intern_ends != self.project.project_round.participating_round.internends:
@@ -3322,6 +3939,10 @@ class InternSelection(models.Model):
         return False
 
     def is_initial_feedback_on_intern_open(self):
+        try:
+            return self.initial_feedback_on_intern_open
+        except AttributeError:
+            pass
         if not has_deadline_passed(self.initial_feedback_opens):
             return False
         try:
@@ -3330,6 +3951,10 @@ class InternSelection(models.Model):
             return True
 
     def is_initial_feedback_on_intern_past_due(self):
+        try:
+            return self.initial_feedback_on_intern_past_due
+        except AttributeError:
+            pass
         if has_deadline_passed(self.initial_feedback_due):
             return True
         return False
@@ -3343,6 +3968,10 @@ class InternSelection(models.Model):
             return True
 
     def is_midpoint_feedback_on_intern_open(self):
+        try:
+            return self.midpoint_feedback_on_intern_open
+        except AttributeError:
+            pass
         if not has_deadline_passed(self.midpoint_feedback_opens):
             return False
         try:
@@ -3351,6 +3980,10 @@ class InternSelection(models.Model):
             return True
 
     def is_midpoint_feedback_on_intern_past_due(self):
+        try:
+            return self.midpoint_feedback_on_intern_past_due
+        except AttributeError:
+            pass
         if has_deadline_passed(self.midpoint_feedback_due):
             return True
         return False
@@ -3364,6 +3997,10 @@ class InternSelection(models.Model):
             return True
 
     def is_final_feedback_on_intern_open(self):
+        try:
+            return self.final_feedback_on_intern_open
+        except AttributeError:
+            pass
         if not has_deadline_passed(self.final_feedback_opens):
             return False
         try:
@@ -3372,6 +4009,10 @@ class InternSelection(models.Model):
             return True
 
     def is_final_feedback_on_intern_past_due(self):
+        try:
+            return self.final_feedback_on_intern_past_due
+        except AttributeError:
+            pass
         if has_deadline_passed(self.final_feedback_due):
             return True
         return False
@@ -3387,6 +4028,78 @@ class InternSelection(models.Model):
     def intern_name(self):
         return self.applicant.applicant.public_name
 
+    @classmethod
+    def with_email_recipients(cls, queryset):
+        """
+        Load everything the intern notification and feedback emails need up
+        front, so sending one per intern doesn't look up each intern's
+        mentors, coordinators, and round separately.
+        """
+        return queryset.select_related(
+                'applicant__applicant__account',
+                'project__project_round__community',
+                'project__project_round__participating_round',
+                ).prefetch_related(
+                'mentors__mentor__account',
+                prefetch_approved_coordinators('project__project_round__community'),
+                )
+
+    @classmethod
+    def with_feedback_status(cls, queryset, today=None):
+        """
+        Annotate each intern selection with everything the intern progress
+        table and feedback reminders need to know about its feedback, so
+        the methods below that check feedback status don't need a query
+        per intern:
+
+        - {stage}_mentor_feedback_status and {stage}_intern_feedback_status,
+          for get_mentor_feedback_status and get_intern_feedback_status;
+        - {stage}_mentor_extension_date, the extension the mentor asked for;
+        - {stage}_feedback_on_intern_open and _past_due, for
+          is_{stage}_feedback_on_intern_open and _past_due;
+        - has_custom_dates, for intern_has_custom_dates.
+        """
+        if today is None:
+            today = get_deadline_date_for(datetime.datetime.now(DEADLINE_TIME.tzinfo))
+
+        def flag(condition):
+            return models.Case(
+                    models.When(condition, then=models.Value(True)),
+                    default=models.Value(False),
+                    output_field=models.BooleanField())
+
+        annotations = {}
+        for stage in cls.FEEDBACK_STAGES:
+            mentor = stage + 'mentorfeedback'
+            intern = stage + 'internfeedback'
+            annotations[stage + '_mentor_feedback_status'] = models.Case(
+                    models.When(**{mentor + '__isnull': True, 'then': models.Value(cls.MISSING)}),
+                    models.When(**{mentor + '__request_termination': True, 'then': models.Value(cls.TERMINATE)}),
+                    models.When(**{mentor + '__request_extension': True, 'then': models.Value(cls.EXTEND)}),
+                    models.When(**{mentor + '__payment_approved': True, 'then': models.Value(cls.PAY)}),
+                    default=models.Value(cls.SUBMITTED),
+                    output_field=models.CharField())
+            annotations[stage + '_intern_feedback_status'] = models.Case(
+                    models.When(**{intern + '__isnull': True, 'then': models.Value(cls.MISSING)}),
+                    default=models.Value(cls.SUBMITTED),
+                    output_field=models.CharField())
+            annotations[stage + '_mentor_extension_date'] = models.F(mentor + '__extension_date')
+            annotations[stage + '_feedback_on_intern_open'] = flag(
+                    models.Q(**{stage + '_feedback_opens__lte': today})
+                    & (models.Q(**{mentor + '__isnull': True})
+                        | models.Q(**{mentor + '__allow_edits': True})))
+            annotations[stage + '_feedback_on_intern_past_due'] = flag(
+                    models.Q(**{stage + '_feedback_due__lte': today}))
+
+        current_round = 'project__project_round__participating_round__'
+        annotations['has_custom_dates'] = flag(
+                ~models.Q(intern_starts=models.F(current_round + 'internstarts'))
+                | ~models.Q(intern_ends=models.F(current_round + 'internends'))
+                | ~models.Q(initial_feedback_due=models.F(current_round + 'initialfeedback'))
+                | ~models.Q(midpoint_feedback_due=models.F(current_round + 'midfeedback')))
+
+        return queryset.annotate(**annotations)
+
     def round(self):
         return self.project.project_round.participating_round
 
@@ -3432,70 +4145,60 @@ class InternSelection(models.Model):
             'applicant_username': self.applicant.applicant.account.username,
             })
 
+    FEEDBACK_STAGES = ('initial', 'midpoint', 'final')
+
     SUBMITTED = 'SUB'
     MISSING = 'MIS'
     PAY = 'PAY'
     EXTEND = 'EXT'
     TERMINATE = 'TER'
-    def get_mentor_initial_feedback_status(self):
+    def get_mentor_feedback_status(self, stage):
+        # Use the annotation from with_feedback_status, if there is one.
         try:
-            if self.initialmentorfeedback.request_termination:
-                return self.TERMINATE
-            if self.initialmentorfeedback.request_extension:
-                return self.EXTEND
-            if self.initialmentorfeedback.payment_approved:
-                return self.PAY
-            # Validation should ensure this never happens?
-            return self.SUBMITTED
-        except InitialMentorFeedback.DoesNotExist:
+            return getattr(self, stage + '_mentor_feedback_status')
+        except AttributeError:
+            pass
+        try:
+            feedback = getattr(self, stage + 'mentorfeedback')
+        except ObjectDoesNotExist:
             return self.MISSING
-
-    def get_intern_initial_feedback_status(self):
+        if feedback.request_termination:
+            return self.TERMINATE
+        if feedback.request_extension:
+            return self.EXTEND
+        if feedback.payment_approved:
+            return self.PAY
+        # Validation should ensure this never happens?
+        return self.SUBMITTED
+
+    def get_intern_feedback_status(self, stage):
         try:
-            if self.initialinternfeedback:
-                return self.SUBMITTED
-        except InitialInternFeedback.DoesNotExist:
+            return getattr(self, stage + '_intern_feedback_status')
+        except AttributeError:
+            pass
+        try:
+            getattr(self, stage + 'internfeedback')
+        except ObjectDoesNotExist:
             return self.MISSING
+        return self.SUBMITTED
+
+    def get_mentor_initial_feedback_status(self):
+        return self.get_mentor_feedback_status('initial')
+
+    def get_intern_initial_feedback_status(self):
+        return self.get_intern_feedback_status('initial')
 
     def get_mentor_midpoint_feedback_status(self):
-        try:
-            if self.midpointmentorfeedback.request_termination:
-                return self.TERMINATE
-            if self.midpointmentorfeedback.request_extension:
-                return self.EXTEND
-            if self.midpointmentorfeedback.payment_approved:
-                return self.PAY
-            # Validation should ensure this never happens?
-            return self.SUBMITTED
-        except InitialMentorFeedback.DoesNotExist:
-            return self.MISSING
+        return self.get_mentor_feedback_status('midpoint')
 
     def get_intern_midpoint_feedback_status(self):
-        try:
-            if self.midpointinternfeedback:
-                return self.SUBMITTED
-        except InitialInternFeedback.DoesNotExist:
-            return self.MISSING
+        return self.get_intern_feedback_status('midpoint')
 
     def get_mentor_final_feedback_status(self):
-        try:
-            if self.finalmentorfeedback.request_termination:
-                return self.TERMINATE
-            if self.finalmentorfeedback.request_extension:
-                return self.EXTEND
-            if self.finalmentorfeedback.payment_approved:
-                return self.PAY
-            # Validation should ensure this never happens?
-            return self.SUBMITTED
-        except InitialMentorFeedback.DoesNotExist:
-            return self.MISSING
+        return self.get_mentor_feedback_status('final')
 
     def get_intern_final_feedback_status(self):
-        try:
-            if self.finalinternfeedback:
-                return self.SUBMITTED
-        except InitialInternFeedback.DoesNotExist:
-            return self.MISSING
+        return self.get_intern_feedback_status('final')
 
     def __str__(self):
         return self.mentor_names() + ' mentoring ' + self.applicant.applicant.public_name
@@ -3565,16 +4268,59 @@ class BaseMentorFeedback(BaseFeedback):
     def get_versions(self):
         return Version.objects.get_for_object(self)
 
+    @classmethod
+    def resolve_mentor_versions(cls, feedback_list):
+        """
+        Look up the version find_version_mentor_edited would return for
+        every feedback object in the list, using one query for all their
+        versions and one for all their approved mentors, and remember the
+        results on each object.
+        """
+        feedback_list = [f for f in feedback_list if not hasattr(f, '_version_mentor_edited')]
+        if not feedback_list:
+            return
+
+        versions_by_object = defaultdict(list)
+        versions = Version.objects.get_for_model(cls).filter(
+                object_id__in=[str(f.pk) for f in feedback_list],
+                ).select_related('revision__user__comrade').order_by('-pk')
+        for v in versions:
+            versions_by_object[v.object_id].append(v)
+
+        mentor_accounts = defaultdict(set)
+        relationships = MentorRelationship.objects.filter(
+                intern_selection__in=[f.intern_selection_id for f in feedback_list],
+                mentor__approval_status=ApprovalStatus.APPROVED,
+                ).values_list('intern_selection_id', 'mentor__mentor__account_id')
+        for intern_selection_id, account_id in relationships:
+            mentor_accounts[intern_selection_id].add(account_id)
+
+        for f in feedback_list:
+            accounts = mentor_accounts[f.intern_selection_id]
+            f._version_mentor_edited = None
+            for v in versions_by_object[str(f.pk)]:
+                if v.revision.user_id in accounts:
+                    f._version_mentor_edited = v
+                    break
+
     def find_version_mentor_edited(self):
         # When a staff member modifies the initial feedback to approve payment or change internship dates,
         # it counts as a revision. Look for the latest feedback from an approved mentor.
         # (Note: this may not won't work if we switch mentors.
         # we could ignore all revisions made by staff, but staff can be mentors too.)
-        versions = Version.objects.get_for_object(self)
+        # The mentor name, email, and submission date all need this version,
+        # so only look it up once per object.
+        try:
+            return self._version_mentor_edited
+        except AttributeError:
+            pass
+        self._version_mentor_edited = None
+        versions = Version.objects.get_for_object(self).select_related('revision__user__comrade')
         for v in versions:
             if self.intern_selection.mentors.all().approved().filter(mentor__account=v.revision.user).exists():
-                return v
-        return None
+                self._version_mentor_edited = v
+                break
+        return self._version_mentor_edited
 
     def get_submission_date(self):
         version = self.find_version_mentor_edited()
@@ -4505,6 +5251,195 @@ class AlumSurvey(models.Model):
             return self.survey_tracker.alumni_info.community
         return None
 
+class EmailBatch(models.Model):
+    """
+    A group of emails that an organizer asked to send at once, like a round
+    of deadline reminders. The messages wait in the outbox as OutgoingEmail
+    until the send_queued_email management command sends them, so nobody
+    has to wait for the mail server while the page loads.
+    """
+    description = models.CharField(max_length=SENTENCE_LENGTH)
+    created = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        verbose_name_plural = 'email batches'
+
+    def __str__(self):
+        return '{} ({})'.format(self.description, self.created)
+
+    @classmethod
+    def with_progress(cls, queryset):
+        """
+        Annotate each batch with how many of its messages are queued, sent,
+        and failed.
+        """
+        def count_where(**kwargs):
+            return models.Sum(models.Case(
+                models.When(models.Q(**kwargs), then=1),
+                default=0,
+                output_field=models.IntegerField(),
+            ))
+
+        return queryset.annotate(
+                queued=count_where(messages__status=OutgoingEmail.QUEUED),
+                sent=count_where(messages__status=OutgoingEmail.SENT),
+                failed=count_where(messages__status=OutgoingEmail.FAILED),
+        )
+
+class OutgoingEmail(models.Model):
+    QUEUED = 'Q'
+    SENT = 'S'
+    FAILED = 'F'
+    STATUS_CHOICES = (
+            (QUEUED, 'Queued'),
+            (SENT, 'Sent'),
+            (FAILED, 'Failed'),
+            )
+
+    batch = models.ForeignKey(EmailBatch, related_name='messages', on_delete=models.CASCADE)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    # Enough of the original EmailMessage to send it again later. The
+    # recipient and header lists are stored as JSON.
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.TextField()
+    to = models.TextField()
+    cc = models.TextField(default='[]')
+    bcc = models.TextField(default='[]')
+    reply_to = models.TextField(default='[]')
+    headers = models.TextField(default='{}')
+
+    def __str__(self):
+        return self.subject
+
+    @classmethod
+    def from_message(cls, batch, message):
+        def addresses(values):
+            # Recipients may be email.headerregistry.Address objects.
+            return json.dumps([str(address) for address in values])
+
+        return cls(
+                batch=batch,
+                subject=message.subject,
+                body=message.body,
+                from_email=str(message.from_email),
+                to=addresses(message.to),
+                cc=addresses(message.cc),
+                bcc=addresses(message.bcc),
+                reply_to=addresses(message.reply_to),
+                headers=json.dumps(message.extra_headers),
+        )
+
+    def to_message(self, connection=None):
+        return EmailMessage(
+                subject=self.subject,
+                body=self.body,
+                from_email=self.from_email,
+                to=json.loads(self.to),
+                cc=json.loads(self.cc),
+                bcc=json.loads(self.bcc),
+                reply_to=json.loads(self.reply_to),
+                headers=json.loads(self.headers),
+                connection=connection,
+        )
+
+class UserPermissions(object):
+    """
+    The communities one user is an approved coordinator for, the projects
+    they're an approved mentor of, and the rounds they're an approved
+    applicant reviewer for. Each kind is loaded with one query the first
+    time it's needed. The permission checks on RoundPage, Community,
+    Participation, and Project look here instead of querying, so pages that
+    check permissions for every project or community they list don't make
+    a query for each one.
+
+    Use get_permissions(user) to get the copy kept on a user object. Django
+    loads request.user again for every request, so that copy lasts for one
+    request. Code that changes someone's approvals and then checks their
+    permissions again in the same request needs to call forget_permissions.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def coordinated_community_ids(self):
+        if not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(CoordinatorApproval.objects.approved().filter(
+            coordinator__account=self.user,
+        ).values_list('community_id', flat=True))
+
+    @cached_property
+    def coordinated_round_ids(self):
+        # Rounds that an approved community of theirs is participating in
+        if not self.coordinated_community_ids:
+            return frozenset()
+        return frozenset(Participation.objects.approved().filter(
+            community__in=self.coordinated_community_ids,
+        ).values_list('participating_round_id', flat=True))
+
+    @cached_property
+    def mentorships(self):
+        """
+        A (project, project status, participation, participation status,
+        round) tuple of ids and statuses for every project they're an
+        approved mentor of.
+        """
+        if not self.user.is_authenticated:
+            return []
+        return list(MentorApproval.objects.approved().filter(
+            mentor__account=self.user,
+        ).values_list(
+            'project_id',
+            'project__approval_status',
+            'project__project_round_id',
+            'project__project_round__approval_status',
+            'project__project_round__participating_round_id',
+        ))
+
+    @cached_property
+    def mentored_project_ids(self):
+        return frozenset(m[0] for m in self.mentorships)
+
+    @cached_property
+    def mentored_participation_ids(self):
+        # Participations they mentor an approved project in
+        return frozenset(m[2] for m in self.mentorships
+                if m[1] == ApprovalStatus.APPROVED)
+
+    @cached_property
+    def mentored_round_ids(self):
+        # Rounds they mentor an approved project in an approved community in
+        return frozenset(m[4] for m in self.mentorships
+                if m[1] == ApprovalStatus.APPROVED and m[3] == ApprovalStatus.APPROVED)
+
+    @cached_property
+    def reviewed_round_ids(self):
+        if not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(ApplicationReviewer.objects.approved().filter(
+            comrade__account=self.user,
+        ).values_list('reviewing_round_id', flat=True))
+
+def get_permissions(user):
+    try:
+        return user._home_permissions
+    except AttributeError:
+        user._home_permissions = UserPermissions(user)
+        return user._home_permissions
+
+def forget_permissions(user):
+    try:
+        del user._home_permissions
+    except AttributeError:
+        pass
+
 class Role(object):
     """
     Compute the role which the current visitor most likely is interested in for
@@ -4613,6 +5548,22 @@ class Role(object):
 
     # Anything that just uses other properties does not need to be cached:
 
+    @property
+    def can_see_all_project_details(self):
+        """
+        Participation.approved_to_see_all_project_details, answered once for
+        every approved community in the current round. For an approved
+        community, being its approved coordinator already makes you a
+        coordinator for the round, so the answer is the same for all of them.
+        """
+        if self.is_organizer:
+            return True
+        if self.current_round is None:
+            return False
+        if self.current_round.appsopen <= self.today:
+            return True
+        return self.is_coordinator or self.is_mentor
+
     @property
     def is_organizer(self):
         return self.user.is_staff
@@ -4663,6 +5614,641 @@ class Role(object):
     def passed_projects_not_applied_to(self):
         return [ p for p in self.projects_with_passed_deadlines if not p.did_apply ]
 
+class RoundPhases(object):
+    """
+    Answer all the "which round is current?" questions that views and
+    dashboard sections ask, using a single query for all RoundPages.
+
+    There are only a couple of rounds each year, so it's cheaper to load all
+    of them once and compare their deadlines against today in memory than to
+    ask the database a slightly different question for every page section.
+
+    Use get_round_phases(request) to get the instance that is shared by
+    everything handling one request.
+    """
+
+    def __init__(self, today=None):
+        if today is not None:
+            self.__dict__['today'] = today
+
+    @cached_property
+    def today(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return get_deadline_date_for(now)
+
+    @cached_property
+    def rounds(self):
+        return list(RoundPage.objects.order_by('internstarts'))
+
+    def filter(self, predicate):
+        return [r for r in self.rounds if predicate(r)]
+
+    def earliest(self, field, predicate):
+        rounds = self.filter(predicate)
+        if not rounds:
+            return None
+        return min(rounds, key=lambda r: getattr(r, field))
+
+    def latest(self, field, predicate):
+        rounds = self.filter(predicate)
+        if not rounds:
+            return None
+        return max(rounds, key=lambda r: getattr(r, field))
+
+    def with_date_between(self, field, start, end):
+        """
+        Rounds where the named date field is in the inclusive range from start
+        to end, in order of internship start date.
+        """
+        return self.filter(lambda r: start <= getattr(r, field) <= end)
+
+    # Each of these used to be a separate RoundPage query somewhere. If more
+    # than one round matches, we pick the one whose internship starts first.
+
+    @cached_property
+    def application_round(self):
+        """
+        The round shown on the project selection page: from when we start
+        pinging communities until the late application deadline.
+        """
+        return self.earliest('internstarts', lambda r: r.pingnew <= self.today < r.appslate)
+
+    @cached_property
+    def cfp_round(self):
+        """
+        The round mentors and coordinators can sign up for on the call for
+        participation page, until the internships start.
+        """
+        return self.earliest('internstarts', lambda r: r.pingnew <= self.today < r.internstarts)
+
+    @cached_property
+    def initial_application_round(self):
+        """
+        The round applicants can submit or edit initial applications for.
+        """
+        return self.earliest('internstarts', lambda r: r.appsopen <= self.today < r.appslate)
+
+    @cached_property
+    def community_signup_round(self):
+        """
+        The soonest round that new communities can still sign up for.
+        """
+        return self.earliest('lateorgs', lambda r: self.today < r.lateorgs)
+
+    @cached_property
+    def application_review_round(self):
+        """
+        The round whose applications are being reviewed: from when
+        applications open until interns are announced.
+        """
+        return self.earliest('internstarts', lambda r: r.appsopen <= self.today < r.internannounce)
+
+    @cached_property
+    def intern_selection_round(self):
+        """
+        The round staff are selecting interns for, until a week before initial
+        feedback is due.
+        """
+        week = datetime.timedelta(days=7)
+        return self.earliest('internstarts', lambda r: r.appsopen <= self.today and r.initialfeedback > self.today + week)
+
+    @cached_property
+    def upcoming_internship_round(self):
+        """
+        The soonest round whose internships haven't started yet.
+        """
+        return self.earliest('internstarts', lambda r: self.today < r.internstarts)
+
+    @cached_property
+    def internship_active_round(self):
+        """
+        The round with interns currently working. See
+        RoundPage.is_internship_active for why this includes extensions.
+        """
+        extension = datetime.timedelta(days=7*5)
+        return self.earliest('internstarts', lambda r: r.internstarts <= self.today < r.internends + extension)
+
+    @cached_property
+    def feedback_round(self):
+        """
+        The round staff are tracking intern feedback for: from a week before
+        initial feedback is due until a month after final feedback is due.
+        """
+        week = datetime.timedelta(days=7)
+        month = datetime.timedelta(days=30)
+        return self.earliest('internstarts', lambda r: r.initialfeedback <= self.today + week and r.finalfeedback > self.today - month)
+
+    @cached_property
+    def previous_round(self):
+        """
+        The newest round whose application period is over.
+        """
+        return self.latest('internstarts', lambda r: r.appslate <= self.today)
+
+    @cached_property
+    def started_round(self):
+        """
+        The newest round whose internships have started.
+        """
+        return self.latest('internstarts', lambda r: r.internstarts <= self.today)
+
+    @cached_property
+    def announced_round(self):
+        """
+        The newest round whose interns have been announced.
+        """
+        return self.latest('internannounce', lambda r: r.internannounce <= self.today)
+
+    @cached_property
+    def opened_round(self):
+        """
+        The newest round whose application period has opened.
+        """
+        return self.latest('appsopen', lambda r: r.appsopen <= self.today)
+
+    @cached_property
+    def latest_round(self):
+        return self.latest('internstarts', lambda r: True)
+
+    def has_later_open_round(self, current_round):
+        """
+        Has any round with a later intern announcement date than
+        current_round started pinging communities yet?
+        """
+        return any(
+            r.pingnew <= self.today and r.internannounce > current_round.internannounce
+            for r in self.rounds
+        )
+
+def get_round_phases(request):
+    """
+    Return the RoundPhases for this request, creating it the first time it's
+    needed, so the RoundPages are only loaded once no matter how many views,
+    dashboard sections, and templates look at them.
+    """
+    try:
+        return request.round_phases
+    except AttributeError:
+        request.round_phases = RoundPhases()
+        return request.round_phases
+
+class ApplicantRow(object):
+    """
+    One applicant's contributions and final application for one project, as
+    shown in the tables on the community applicants page.
+    """
+
+    def __init__(self, application, project, number_contributions, final_application, time_commitments, selections):
+        self.application = application
+        self.applicant = application.applicant
+        self.project = project
+        self.number_contributions = number_contributions
+        self.final_application = final_application
+        self.time_commitments = time_commitments
+        # Same as FinalApplication.get_intern_selection_conflicts
+        self.conflicts = [
+                s for s in selections
+                if s.funding_source != InternSelection.NOT_FUNDED and s.project_id != project.pk
+        ]
+
+    @property
+    def submitted_application(self):
+        return self.final_application is not None
+
+    @property
+    def withdrew_application(self):
+        return self.submitted_application and self.final_application.approval_status == ApprovalStatus.WITHDRAWN
+
+    @property
+    def applying_to_gsoc(self):
+        return self.submitted_application and self.final_application.applying_to_gsoc != ""
+
+    @property
+    def rating(self):
+        if not self.submitted_application:
+            return None
+        if self.final_application.rating == FinalApplication.UNRATED:
+            return "Unrated"
+        return self.final_application.rating
+
+    @property
+    def rating_tip(self):
+        if not self.submitted_application:
+            return None
+        return self.final_application.get_rating_display()
+
+class InternRow(ApplicantRow):
+    def __init__(self, intern, *args, **kwargs):
+        super(InternRow, self).__init__(*args, **kwargs)
+        self.intern = intern
+        # Same as InternSelection.get_intern_selection_conflicts
+        if intern.funding_source == InternSelection.NOT_FUNDED:
+            self.conflicts = []
+
+class CommunityApplicants(object):
+    """
+    Everything the community applicants page shows about a community's
+    projects, selected interns, and applicants, loaded in a fixed number of
+    queries no matter how many projects and applicants there are. Nothing
+    is loaded until the template first asks for projects.
+    """
+
+    def __init__(self, participation):
+        self.participation = participation
+
+    @cached_property
+    def projects(self):
+        """
+        A list of (project, intern rows, applicant rows) for every project in
+        this community, including ones that aren't approved yet.
+        """
+        projects = list(self.participation.project_set.select_related('project_round__community'))
+
+        contribution_counts = Contribution.objects.filter(
+                project__in=projects,
+                applicant__approval_status=ApprovalStatus.APPROVED,
+        ).values('project', 'applicant').annotate(
+                count=models.Count('pk'),
+        ).order_by('applicant')
+        contributions = {}
+        for c in contribution_counts:
+            contributions.setdefault(c['project'], []).append((c['applicant'], c['count']))
+
+        interns = InternSelection.objects.filter(
+                project__in=projects,
+        ).select_related(
+                'applicant__applicant__account',
+                'project__project_round__community',
+        ).prefetch_related(
+                'mentors__mentor',
+        )
+        interns_by_project = {}
+        for intern in interns:
+            interns_by_project.setdefault(intern.project_id, []).append(intern)
+
+        application_ids = set(intern.applicant_id for intern in interns)
+        for counts in contributions.values():
+            application_ids.update(applicant for applicant, count in counts)
+
+        applications = {
+                a.pk: a
+                for a in ApplicantApproval.objects.filter(
+                    pk__in=application_ids,
+                ).select_related('applicant__account', 'application_round')
+        }
+
+        final_applications = {
+                (fa.project_id, fa.applicant_id): fa
+                for fa in FinalApplication.objects.filter(
+                    project__in=projects,
+                    applicant__in=application_ids,
+                )
+        }
+
+        selections = {}
+        for s in InternSelection.objects.filter(
+                applicant__in=application_ids,
+        ).select_related('project__project_round__community'):
+            selections.setdefault(s.applicant_id, []).append(s)
+
+        time_commitments = load_availability(applications.values())
+
+        def row_for(row_class, project, application_id, *args):
+            counts = dict(contributions.get(project.pk, ()))
+            return row_class(
+                    *args,
+                    application=applications[application_id],
+                    project=project,
+                    number_contributions=counts.get(application_id, 0),
+                    final_application=final_applications.get((project.pk, application_id)),
+                    time_commitments=time_commitments[application_id],
+                    selections=selections.get(application_id, ()),
+            )
+
+        result = []
+        for project in projects:
+            intern_rows = [
+                    row_for(InternRow, project, intern.applicant_id, intern)
+                    for intern in interns_by_project.get(project.pk, ())
+            ]
+            applicant_rows = [
+                    row_for(ApplicantRow, project, application_id)
+                    for application_id, count in contributions.get(project.pk, ())
+            ]
+            result.append((project, intern_rows, applicant_rows))
+        return result
+
+class InternSelectionReport(object):
+    """
+    Everything the staff intern selection report shows about a round's
+    selected interns, grouped in one pass over the round's intern
+    selections, using a fixed number of queries no matter how many interns
+    there are. All the work happens when the report is created, so a
+    finished report can be cached; see
+    pagecache.get_intern_selection_report.
+    """
+
+    STATUS_CHOICES = (
+            ('pending', 'Pending organizer approval'),
+            ('approved', 'Approved by organizers'),
+            ('rejected', 'Rejected by organizers'),
+            ('general', 'Marked for Outreachy general funding'),
+            ('unsigned', 'Approved without a signed contract'),
+            )
+
+    def __init__(self, current_round):
+        self.current_round = current_round
+
+        interns = list(current_round.get_intern_selections().select_related(
+                'applicant__applicant__account',
+                'applicant__application_round',
+                'project',
+        ).prefetch_related(
+                'mentors__mentor',
+        ).annotate(
+                student_visa_restrictions=models.F('applicant__workeligibility__student_visa_restrictions'),
+        ))
+        applicant_ids = set(intern.applicant_id for intern in interns)
+        project_ids = set(intern.project_id for intern in interns)
+
+        # Every intern's participation, loaded at once.
+        participations = {
+                p.pk: p
+                for p in Participation.objects.filter(
+                    participating_round=current_round,
+                    approval_status=Participation.APPROVED,
+                ).select_related('community')
+        }
+
+        final_applications = {
+                (fa.project_id, fa.applicant_id): fa
+                for fa in FinalApplication.objects.filter(
+                    project__in=project_ids,
+                    applicant__in=applicant_ids,
+                )
+        }
+
+        contribution_counts = {
+                (c['project'], c['applicant']): c['count']
+                for c in Contribution.objects.filter(
+                    project__in=project_ids,
+                    applicant__in=applicant_ids,
+                ).values('project', 'applicant').annotate(
+                    count=models.Count('pk'),
+                ).order_by()
+        }
+
+        # Conflicts can be with projects that aren't approved yet, so these
+        # aren't all in the interns list.
+        selections = {}
+        for s in InternSelection.objects.filter(
+                project__project_round__participating_round=current_round,
+                applicant__in=applicant_ids,
+        ).exclude(
+                funding_source=InternSelection.NOT_FUNDED,
+        ).select_related('project__project_round__community'):
+            selections.setdefault(s.applicant_id, []).append(s)
+
+        availability = load_availability(intern.applicant for intern in interns)
+
+        self.interns = interns
+        self.pending = []
+        self.approved = []
+        self.rejected = []
+        self.general = []
+        self.unsigned = []
+        org_funded = Counter()
+        for intern in interns:
+            intern.project.project_round = participations[intern.project.project_round_id]
+            intern.final_application = final_applications.get((intern.project_id, intern.applicant_id))
+            intern.number_contributions = contribution_counts.get((intern.project_id, intern.applicant_id), 0)
+            intern.availability = availability[intern.applicant_id]
+            intern.conflicts = [
+                    s for s in selections.get(intern.applicant_id, ())
+                    if s.project_id != intern.project_id
+            ]
+
+            if intern.organizer_approved is None:
+                self.pending.append(intern)
+            elif intern.organizer_approved:
+                self.approved.append(intern)
+                if intern.intern_contract_id is None:
+                    self.unsigned.append(intern)
+            else:
+                self.rejected.append(intern)
+
+            if intern.funding_source == InternSelection.GENERAL_FUNDED:
+                self.general.append(intern)
+            elif intern.funding_source == InternSelection.ORG_FUNDED:
+                org_funded[intern.project.project_round_id] += 1
+
+        self.communities_with_unused_funding = []
+        for p in sorted(participations.values(), key=lambda p: p.community.name):
+            funded = p.interns_funded()
+            if funded >= 1 and org_funded[p.pk] < funded:
+                self.communities_with_unused_funding.append((p.community, org_funded[p.pk], funded))
+
+        communities = {}
+        for intern in interns:
+            community = intern.project.project_round.community
+            communities[community.pk] = community
+        self.communities = sorted(communities.values(), key=lambda c: c.name)
+
+    def filter(self, community_slug=None, status=None):
+        """
+        Return the interns with the given status (one of the keys in
+        STATUS_CHOICES) in the community with the given slug. Either may be
+        None to include everything.
+        """
+        interns = getattr(self, status) if status in dict(self.STATUS_CHOICES) else self.interns
+        if community_slug:
+            interns = [
+                    intern for intern in interns
+                    if intern.project.project_round.community.slug == community_slug
+            ]
+        return interns
+
+class ApplicantReviewQueue(object):
+    """
+    One page of a round's initial applications with a given approval
+    status, for applicant reviewers, optionally filtered. Everything the
+    review summary rows show is loaded with a fixed number of queries, and
+    each application's average essay rating and number of red flags are
+    computed in the database, so they can be filtered on too.
+
+    Pages are found by application id rather than by page number: after
+    and before are the ids just outside the page. That way, applications
+    that come in or get approved while a reviewer works through the queue
+    don't shift the next page.
+    """
+
+    PAGE_SIZE = 50
+
+    # Essay ratings as numbers, for averaging. Unclear and unrated essays
+    # don't count towards the average.
+    RATING_VALUES = (
+            (InitialApplicationReview.STRONG, 3),
+            (InitialApplicationReview.GOOD, 2),
+            (InitialApplicationReview.MAYBE, 1),
+            (InitialApplicationReview.NOBIAS, -1),
+            (InitialApplicationReview.NOTUNDERSTOOD, -2),
+            (InitialApplicationReview.SPAM, -3),
+            )
+
+    RED_FLAG_FIELDS = (
+            'review_school',
+            'missing_school',
+            'review_work',
+            'missing_work',
+            'incorrect_dates',
+            )
+
+    REVISION_CHOICES = (
+            ('yes', 'Needs revisions'),
+            ('no', "Doesn't need revisions"),
+            )
+    RED_FLAG_CHOICES = (
+            ('yes', 'Has red flags'),
+            ('no', 'No red flags'),
+            )
+    RATING_CHOICES = (('unrated', 'Not rated yet'),) + tuple(
+            (value, value)
+            for value, label in InitialApplicationReview.RATING_CHOICES
+            if value != InitialApplicationReview.UNRATED)
+
+    def __init__(self, current_round, status, revision=None, owner=None, red_flags=None, rating=None, after=None, before=None):
+        self.current_round = current_round
+        self.status = status
+        self.reviewers = list(ApplicationReviewer.objects.approved().filter(
+                reviewing_round=current_round,
+        ).select_related('comrade').order_by('comrade__public_name'))
+
+        # Ignore filters we don't understand, rather than showing nothing.
+        self.revision = revision if revision in dict(self.REVISION_CHOICES) else None
+        self.red_flags = red_flags if red_flags in dict(self.RED_FLAG_CHOICES) else None
+        self.rating = rating if rating in dict(self.RATING_CHOICES) else None
+        if owner == 'none' or owner in set(str(r.pk) for r in self.reviewers):
+            self.owner = owner
+        else:
+            self.owner = None
+
+        applications = self.get_queryset()
+        self.count = applications.count()
+
+        if before is not None:
+            rows = list(applications.filter(pk__lt=before).order_by('-pk')[:self.PAGE_SIZE + 1])
+            self.has_previous = len(rows) > self.PAGE_SIZE
+            rows = rows[:self.PAGE_SIZE]
+            rows.reverse()
+            self.has_next = applications.filter(pk__gte=before).exists()
+        else:
+            rows = applications
+            if after is not None:
+                rows = rows.filter(pk__gt=after)
+            rows = list(rows.order_by('pk')[:self.PAGE_SIZE + 1])
+            self.has_next = len(rows) > self.PAGE_SIZE
+            rows = rows[:self.PAGE_SIZE]
+            # Don't link back to an empty page if after is below the first id.
+            self.has_previous = after is not None and applications.filter(pk__lte=after).exists()
+
+        availability = load_availability(rows)
+        for application in rows:
+            application.loaded_availability = availability[application.pk]
+        self.applications = rows
+
+    def get_queryset(self):
+        applications = ApplicantApproval.objects.filter(
+                application_round=self.current_round,
+                approval_status=self.status,
+        ).select_related(
+                'applicant__account',
+                'application_round',
+                'review_owner__comrade',
+                'workeligibility',
+                'priorfossexperience',
+                'barrierstoparticipation',
+                'schoolinformation',
+        ).prefetch_related(models.Prefetch(
+                'initialapplicationreview_set',
+                queryset=InitialApplicationReview.objects.select_related(
+                    'reviewer__comrade',
+                ).order_by('pk'),
+                to_attr='loaded_reviews',
+        ))
+
+        needs_revision = (
+                models.Q(barrierstoparticipation__applicant_should_update=True)
+                | models.Q(schoolinformation__applicant_should_update=True))
+        if self.revision == 'yes':
+            applications = applications.filter(needs_revision)
+        elif self.revision == 'no':
+            applications = applications.exclude(needs_revision)
+
+        if self.owner == 'none':
+            applications = applications.filter(review_owner__isnull=True)
+        elif self.owner is not None:
+            applications = applications.filter(review_owner=int(self.owner))
+
+        if self.rating == 'unrated':
+            applications = applications.exclude(pk__in=InitialApplicationReview.objects.exclude(
+                    essay_rating=InitialApplicationReview.UNRATED,
+            ).values('application'))
+        elif self.rating is not None:
+            applications = applications.filter(pk__in=InitialApplicationReview.objects.filter(
+                    essay_rating=self.rating,
+            ).values('application'))
+
+        def flag(field):
+            return models.Case(
+                    models.When(**{'initialapplicationreview__' + field: True, 'then': models.Value(1)}),
+                    default=models.Value(0),
+                    output_field=models.IntegerField())
+
+        red_flag_count = flag(self.RED_FLAG_FIELDS[0])
+        for field in self.RED_FLAG_FIELDS[1:]:
+            red_flag_count = red_flag_count + flag(field)
+
+        rating_value = models.Case(
+                *(models.When(initialapplicationreview__essay_rating=rating, then=models.Value(value))
+                    for rating, value in self.RATING_VALUES),
+                default=None,
+                output_field=models.IntegerField())
+
+        applications = applications.annotate(
+                average_rating=models.Avg(rating_value, output_field=models.FloatField()),
+                rated_count=models.Count(rating_value),
+                red_flag_count=Coalesce(models.Sum(red_flag_count), 0),
+        )
+
+        if self.red_flags == 'yes':
+            applications = applications.filter(red_flag_count__gt=0)
+        elif self.red_flags == 'no':
+            applications = applications.filter(red_flag_count=0)
+
+        return applications
+
+    def get_filters(self):
+        """
+        The filters in use, as a dictionary of query string parameters.
+        """
+        filters = {
+                'revision': self.revision,
+                'owner': self.owner,
+                'red_flags': self.red_flags,
+                'rating': self.rating,
+                }
+        return { key: value for key, value in filters.items() if value is not None }
+
+    @property
+    def next_after(self):
+        if self.has_next:
+            return self.applications[-1].pk
+
+    @property
+    def previous_before(self):
+        if self.has_previous:
+            return self.applications[0].pk
+
 # Please keep this at the end of this file; it has to come after the
 # models it mentions, so just keep it after all other definitions.
 DASHBOARD_MODELS = (
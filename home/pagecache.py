@@ -0,0 +1,420 @@
+"""
+Cache whole pages for visitors who aren't logged in.
+
+Most traffic to the project selection, community, and alums pages comes from
+people who aren't logged in, and they all get exactly the same HTML. So we
+keep a copy of those responses in Django's cache, keyed on the URL and on
+"content versions" that get bumped whenever something shown on those pages
+changes:
+
+- every round has its own version, bumped when its communities, projects,
+  skills, channels, sponsors, mentors, or interns change;
+- the shared version is bumped by changes that aren't tied to a single
+  round, like editing a RoundPage or a community;
+- the site version is bumped by every change, and is used by pages that
+  show more than one round.
+
+The key also includes today's deadline date (see get_deadline_date_for), so
+pages whose contents depend on which deadlines have passed are re-rendered
+at 4PM UTC every day.
+
+The same versions make cheap ETags: a browser that already has the current
+version of a page gets a 304 response without us looking up or rendering
+anything. The staff contract and feedback exports get ETags from versions of
+their own.
+
+Staff reports that are slow to compute, like the intern selection report,
+are cached the same way, under versions bumped by changes to anything they
+show. So are the counts of each round's most common project skills.
+
+Each round's list of interns on the alums page is cached separately, for
+logged-in visitors too. Once a round's internships are over, its list only
+changes if someone edits it, so it's kept until a version bumps rather than
+expiring. The alums version is bumped whenever anyone edits their profile.
+
+This only uses the portable parts of Django's cache API, so it works with the
+local-memory and file-based backends as well as memcached.
+"""
+
+import datetime
+from functools import wraps
+import hashlib
+import random
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import models
+
+__all__ = ('anonymous_page_etag', 'cache_anonymous_page', 'connect_signals', 'export_etag', 'get_alum_round_fragments', 'get_common_skills', 'get_intern_selection_report')
+
+# Anything saved here also needs to expire eventually, because some things
+# shown on cached pages (like people's names) don't bump a version.
+DEFAULT_TIMEOUT = 60 * 60
+
+# Reports are cheap to recompute compared to how long they take to go stale.
+REPORT_TIMEOUT = 60 * 60
+
+SITE = 'site'
+SHARED = 'shared'
+EXPORTS = 'exports'
+REPORTS = 'reports'
+ALUMS = 'alums'
+
+
+def get_cache():
+    return caches[getattr(settings, 'ANONYMOUS_PAGE_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'ANONYMOUS_PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def version_key(scope):
+    return 'home:page-version:{}'.format(scope)
+
+
+def round_scope(round_slug):
+    return 'round:{}'.format(round_slug)
+
+
+def export_scope(round_slug):
+    return 'export:{}'.format(round_slug)
+
+
+def report_scope(round_slug):
+    return 'report:{}'.format(round_slug)
+
+
+def new_version():
+    # Start every version somewhere random, so if the cache loses a version
+    # (or the whole cache is cleared), nothing cached or sent as an ETag
+    # under the old version can accidentally match the new one.
+    return random.randrange(1 << 32)
+
+
+def get_versions(scopes):
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            # Versions must outlive any page cached under them, so they
+            # never expire.
+            cache.add(key, new_version(), timeout=None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def bump_versions(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, new_version(), timeout=None)
+
+
+def is_anonymous_visit(request):
+    return (request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            # Flash messages are for one visitor only.
+            and 'messages' not in request.COOKIES)
+
+
+def get_page_version(request, kwargs):
+    """
+    A string that changes whenever the page this view renders for anonymous
+    visitors might change.
+    """
+    if 'round_slug' in kwargs:
+        scopes = (SHARED, round_scope(kwargs['round_slug']))
+    else:
+        scopes = (SITE,)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return '{}:{}'.format(
+        models.get_deadline_date_for(now).isoformat(),
+        '.'.join(str(version) for version in get_versions(scopes)),
+    )
+
+
+def anonymous_page_etag(request, *args, **kwargs):
+    """
+    An etag_func for django.views.decorators.http.condition, for views that
+    use cache_anonymous_page. Logged-in visitors see pages tailored to them,
+    so they don't get an ETag.
+    """
+    if not is_anonymous_visit(request):
+        return None
+    return get_page_version(request, kwargs)
+
+
+def export_etag(request, round_slug, *args, **kwargs):
+    """
+    An etag_func for the per-round contract and feedback export views.
+    """
+    versions = get_versions((EXPORTS, export_scope(round_slug)))
+    return '.'.join(str(version) for version in versions)
+
+
+def cache_anonymous_page(view):
+    """
+    Serve a cached copy of this view's response to anyone who isn't logged
+    in. If the view takes a round_slug argument, the page is only re-rendered
+    when something in that round changes; otherwise any change counts.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = get_timeout()
+        if not timeout or not is_anonymous_visit(request):
+            return view(request, *args, **kwargs)
+
+        key = 'home:page:{}:{}'.format(
+            hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest(),
+            get_page_version(request, kwargs),
+        )
+
+        cache = get_cache()
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = view(request, *args, **kwargs)
+
+        # Don't share anything that's specific to this visitor.
+        if (response.status_code == 200
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_USED')):
+            cache.set(key, response, timeout)
+        return response
+
+    return wrapper
+
+
+def get_intern_selection_report(current_round, refresh=False):
+    """
+    Return an InternSelectionReport for this round, from the cache unless
+    something in it has changed or refresh is requested.
+    """
+    versions = get_versions((REPORTS, report_scope(current_round.slug)))
+    key = 'home:intern-selection-report:{}:{}'.format(
+        current_round.slug,
+        '.'.join(str(version) for version in versions),
+    )
+
+    cache = get_cache()
+    report = None if refresh else cache.get(key)
+    if report is None:
+        report = models.InternSelectionReport(current_round)
+        cache.set(key, report, REPORT_TIMEOUT)
+    return report
+
+
+def get_common_skills(current_round):
+    """
+    Return RoundPage.get_common_skills for this round, from the cache unless
+    the round's projects or the canonical skills have changed.
+    """
+    versions = get_versions((SHARED, round_scope(current_round.slug)))
+    key = 'home:common-skills:{}:{}'.format(
+        current_round.slug,
+        '.'.join(str(version) for version in versions),
+    )
+
+    cache = get_cache()
+    skills = cache.get(key)
+    if skills is None:
+        skills = current_round.get_common_skills()
+        cache.set(key, skills, get_timeout())
+    return skills
+
+
+def get_alum_round_fragments(rounds, is_staff, render):
+    """
+    Return a dictionary mapping the pk of each round in rounds to its part
+    of the alums page. render is called with a list of the rounds that
+    aren't cached, and must return a dictionary with the same shape for
+    them. Staff see interns who aren't in good standing, so they get their
+    own copy.
+    """
+    if not rounds:
+        return {}
+
+    scopes = [SHARED, ALUMS] + [round_scope(r.slug) for r in rounds]
+    versions = get_versions(scopes)
+    shared_version = '{}.{}'.format(*versions[:2])
+    keys = {}
+    for r, round_version in zip(rounds, versions[2:]):
+        keys[r.pk] = 'home:alums:{}:{}:{}.{}'.format(
+            r.slug,
+            'staff' if is_staff else 'public',
+            shared_version,
+            round_version,
+        )
+
+    cache = get_cache()
+    found = cache.get_many(keys.values())
+    fragments = {}
+    missing = []
+    for r in rounds:
+        if keys[r.pk] in found:
+            fragments[r.pk] = found[keys[r.pk]]
+        else:
+            missing.append(r)
+
+    if missing:
+        rendered = render(missing)
+        for r in missing:
+            fragments[r.pk] = rendered[r.pk]
+            if r.has_internship_ended():
+                timeout = None
+            else:
+                timeout = get_timeout()
+            cache.set(keys[r.pk], rendered[r.pk], timeout)
+
+    return fragments
+
+
+# Figure out which round a changed object is shown under. Returning None
+# means the change could affect any round.
+
+def round_of_anything(instance):
+    return None
+
+def round_of_participation(instance):
+    return instance.participating_round
+
+def round_of_project(instance):
+    return instance.project_round.participating_round
+
+def round_of_project_detail(instance):
+    return instance.project.project_round.participating_round
+
+def round_of_sponsorship(instance):
+    return instance.participation.participating_round
+
+def round_of_internship_detail(instance):
+    return instance.intern_selection.project.project_round.participating_round
+
+def round_of_application_detail(instance):
+    return instance.applicant.application_round
+
+PAGE_SENDERS = {
+    models.RoundPage: round_of_anything,
+    models.CohortPage: round_of_anything,
+    models.Community: round_of_anything,
+    models.CoordinatorApproval: round_of_anything,
+    models.CanonicalSkill: round_of_anything,
+    models.Participation: round_of_participation,
+    models.Sponsorship: round_of_sponsorship,
+    models.Project: round_of_project,
+    models.ProjectSkill: round_of_project_detail,
+    models.CommunicationChannel: round_of_project_detail,
+    models.MentorApproval: round_of_project_detail,
+    models.InternSelection: round_of_project_detail,
+    # The alums page lists each intern's mentors.
+    models.MentorRelationship: round_of_internship_detail,
+}
+
+# The staff contract and feedback exports change much more often than the
+# public pages, so they get versions of their own.
+EXPORT_SENDERS = {
+    User: round_of_anything,
+    models.Comrade: round_of_anything,
+    models.Community: round_of_anything,
+    models.Participation: round_of_participation,
+    models.Project: round_of_project,
+    models.InternSelection: round_of_project_detail,
+    models.MentorRelationship: round_of_internship_detail,
+    models.InitialMentorFeedback: round_of_internship_detail,
+    models.MidpointMentorFeedback: round_of_internship_detail,
+    models.FinalMentorFeedback: round_of_internship_detail,
+}
+
+# The intern selection report shows intern selections along with their
+# mentors, applications, contributions, time commitments, and community
+# funding.
+REPORT_SENDERS = {
+    models.RoundPage: round_of_anything,
+    models.Comrade: round_of_anything,
+    models.Participation: round_of_participation,
+    models.Sponsorship: round_of_sponsorship,
+    models.Project: round_of_project,
+    models.InternSelection: round_of_project_detail,
+    models.MentorRelationship: round_of_internship_detail,
+    models.FinalApplication: round_of_project_detail,
+    models.Contribution: round_of_project_detail,
+    models.WorkEligibility: round_of_application_detail,
+    models.SchoolTimeCommitment: round_of_application_detail,
+    models.NonCollegeSchoolTimeCommitment: round_of_application_detail,
+    models.VolunteerTimeCommitment: round_of_application_detail,
+    models.EmploymentTimeCommitment: round_of_application_detail,
+}
+
+
+def changed_round(senders, sender, instance):
+    try:
+        return senders[sender](instance)
+    except ObjectDoesNotExist:
+        # When a whole round or community is deleted, the objects this one
+        # was attached to may already be gone.
+        return None
+
+
+def bump_versions_on_commit(scopes):
+    # Bump now so this process stops serving the old pages, and again after
+    # the transaction commits in case another request cached the old
+    # contents in the meantime.
+    bump_versions(scopes)
+    transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def page_content_changed(sender, instance, **kwargs):
+    current_round = changed_round(PAGE_SENDERS, sender, instance)
+    if current_round is None:
+        bump_versions_on_commit((SITE, SHARED))
+    else:
+        bump_versions_on_commit((SITE, round_scope(current_round.slug)))
+
+
+def export_content_changed(sender, instance, **kwargs):
+    current_round = changed_round(EXPORT_SENDERS, sender, instance)
+    if current_round is None:
+        bump_versions_on_commit((EXPORTS,))
+    else:
+        bump_versions_on_commit((export_scope(current_round.slug),))
+
+
+def report_content_changed(sender, instance, **kwargs):
+    current_round = changed_round(REPORT_SENDERS, sender, instance)
+    if current_round is None:
+        bump_versions_on_commit((REPORTS,))
+    else:
+        bump_versions_on_commit((report_scope(current_round.slug),))
+
+
+def alum_profile_changed(sender, instance, **kwargs):
+    bump_versions_on_commit((ALUMS,))
+
+
+def connect_signals():
+    post_save.connect(alum_profile_changed, sender=models.Comrade, dispatch_uid='pagecache-alums')
+    post_delete.connect(alum_profile_changed, sender=models.Comrade, dispatch_uid='pagecache-alums')
+    for sender in PAGE_SENDERS:
+        post_save.connect(page_content_changed, sender=sender, dispatch_uid='pagecache')
+        post_delete.connect(page_content_changed, sender=sender, dispatch_uid='pagecache')
+    for sender in EXPORT_SENDERS:
+        post_save.connect(export_content_changed, sender=sender, dispatch_uid='pagecache-export')
+        post_delete.connect(export_content_changed, sender=sender, dispatch_uid='pagecache-export')
+    for sender in REPORT_SENDERS:
+        post_save.connect(report_content_changed, sender=sender, dispatch_uid='pagecache-report')
+        post_delete.connect(report_content_changed, sender=sender, dispatch_uid='pagecache-report')
@@ -0,0 +1,122 @@
+"""
+Query budgets: how many database queries the busiest views may make.
+
+Most of our pages list some number of things: projects, applicants,
+interns. It's easy to accidentally load something once per item from a
+template, which works fine with test data and falls over when a round has
+thousands of applicants. So each view listed in QUERY_BUDGETS has a
+QueryBudget saying how many queries it may make for a given number of
+items, and tests use QueryBudgetMixin to check that the view stays within
+budget as the test adds more items.
+
+The budgets have some headroom over what each view needs today. If a
+change makes a view cheaper, lower its budget; if a change needs more
+queries, raise it in the same commit, so reviewers can see the cost.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+__all__ = ('QueryBudget', 'QUERY_BUDGETS', 'query_budget', 'QueryBudgetMixin')
+
+
+class QueryBudget(namedtuple('QueryBudget', 'base per_item')):
+    """
+    A view may make base + per_item * size queries when it lists size
+    items. For views that load their lists in bulk, per_item is 0.
+    """
+    __slots__ = ()
+
+    def limit(self, size):
+        return self.base + self.per_item * size
+
+
+# Keyed by URL name. Each comment says what the items are.
+QUERY_BUDGETS = {
+    # approved projects in the open round
+    'project-selection': QueryBudget(base=40, per_item=0),
+    # initial applications waiting for review, one page at most
+    'pending-applicants-summary': QueryBudget(base=50, per_item=0),
+    # interns and applicants in one community
+    'community-applicants': QueryBudget(base=50, per_item=0),
+    # interns in the round
+    'intern-selection-report': QueryBudget(base=40, per_item=0),
+    # interns in good standing, each getting one email
+    'email-intern-welcome': QueryBudget(base=40, per_item=0),
+    # interns on the staff intern progress table
+    'dashboard': QueryBudget(base=80, per_item=0),
+}
+
+
+@contextmanager
+def query_budget(limit):
+    """
+    Fail if the code in the with block (or the decorated function) makes
+    more than limit queries on the default database.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        yield queries
+    if len(queries) > limit:
+        raise AssertionError('{} queries executed, but the budget is {}:\n{}'.format(
+            len(queries),
+            limit,
+            '\n'.join('{}. {}'.format(i, query['sql']) for i, query in enumerate(queries.captured_queries, 1)),
+        ))
+
+
+class QueryBudgetMixin:
+    """
+    Helpers for TestCase classes that check views against QUERY_BUDGETS.
+    """
+
+    def get_view_queries(self, path, data=None):
+        """
+        Fetch path with the test client and return how many queries it
+        took, including any that a streaming response makes while it's read.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueriesDoNotScale(self, url_name, path, grow, sizes=(1, 4), data=None, cold=False):
+        """
+        Check that the view named url_name stays within its budget as the
+        data it lists grows. For each entry in sizes, grow is called with
+        how many more items to add to reach that size, and then path is
+        fetched and measured. Beyond the budget itself, the count may only
+        grow by per_item queries for each item added.
+
+        Adding items can make cached data stale, so path is fetched once
+        before each measurement to fill the caches again. With cold=True,
+        every cache is cleared before each measurement instead, to check
+        what the view costs when nothing is cached.
+        """
+        budget = QUERY_BUDGETS[url_name]
+        counts = []
+        current_size = 0
+        for size in sizes:
+            grow(size - current_size)
+            current_size = size
+
+            self.get_view_queries(path, data)
+            if cold:
+                for cache in caches.all():
+                    cache.clear()
+
+            count = self.get_view_queries(path, data)
+            self.assertLessEqual(count, budget.limit(size),
+                    '{} made {} queries for {} items, over its budget of {}'.format(
+                        url_name, count, size, budget.limit(size)))
+            counts.append(count)
+
+        for (small, few), (large, many) in zip(zip(sizes, counts), zip(sizes[1:], counts[1:])):
+            self.assertLessEqual(many - few, budget.per_item * (large - small),
+                    '{} made {} queries for {} items but {} for {}'.format(
+                        url_name, few, small, many, large))
@@ -1,7 +1,9 @@
 from datetime import date, timedelta
 from django.test import SimpleTestCase
+from itertools import groupby
+import random
 
-from .models import ApprovalStatus, RoundPage, PromotionTracking
+from .models import ApprovalStatus, RoundPage, PromotionTracking, find_longest_free_period
 from .views import determine_eligibility, EligibilityUpdateView
 
 class MockWizard(object):
@@ -415,3 +417,41 @@ class EligibilityTests(SimpleTestCase):
                 'quit_on_acceptance': False,
             }],
         )
+
+    def test_longest_free_period(self):
+        """
+        Check find_longest_free_period against adding up the hours for
+        every day of the internship.
+        """
+        internstarts = self.application_round.internstarts
+        internends = self.application_round.internends
+        total_days = (internends - internstarts).days + 1
+        rng = random.Random(0)
+
+        def day(offset):
+            return internstarts + timedelta(days=offset)
+
+        for _ in range(200):
+            tcs = []
+            for _ in range(rng.randrange(6)):
+                start = rng.randrange(-30, total_days + 30)
+                tcs.append({
+                    'start_date': day(start),
+                    'end_date': day(start + rng.randrange(-5, 60)),
+                    'hours': rng.choice((0, 5, 10, 20, 21, 40)),
+                })
+
+            calendar = [
+                sum(tc['hours'] for tc in tcs if tc['start_date'] <= day(i) <= tc['end_date'])
+                for i in range(total_days)
+            ]
+            expected = (0, 0)
+            counter = 0
+            for key, group in groupby(calendar, lambda hours: hours <= 20):
+                group_len = len(list(group))
+                if key and group_len > expected[1]:
+                    expected = (counter, group_len)
+                counter += group_len
+
+            with self.subTest(tcs=tcs):
+                self.assertEqual(find_longest_free_period(tcs, self.application_round), expected)
@@ -1,19 +1,36 @@
+import csv
 import datetime
+import json
+from django.core import mail
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from io import StringIO
+import os
+import reversion
+import tempfile
 from reversion.models import Version
 
 from . import models
+from .dashboard import DASHBOARD_SECTIONS
+from .factories import ComradeFactory
+from .factories import ContributionFactory
+from .factories import ProjectFactory
 from .factories import RoundPageFactory
+from .factories import UserFactory
 from .factories import InternSelectionFactory
 from .factories import InitialMentorFeedbackFactory
 from .factories import MidpointMentorFeedbackFactory
 from .factories import FinalMentorFeedbackFactory
+from .querybudget import QueryBudgetMixin
 
 
 # don't try to use the static files manifest during tests
 @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
-class InternSelectionTestCase(TestCase):
+class InternSelectionTestCase(QueryBudgetMixin, TestCase):
     def test_mentor_can_resign(self):
         for mentors_count in (1, 2):
             with self.subTest(mentors_count=mentors_count):
@@ -151,6 +168,82 @@ class InternSelectionTestCase(TestCase):
         # only version should be the one that the view records
         self.assertEqual(Version.objects.get_for_object(feedback).count(), 1)
 
+    def test_resolve_mentor_versions(self):
+        current_round = RoundPageFactory(start_from='initialfeedback')
+        interns = [InternSelectionFactory(active=True, round=current_round) for _ in range(3)]
+        for internselection in interns[:2]:
+            answers = self._mentor_feedback_form(internselection)
+            response = self._submit_mentor_feedback_form(internselection, 'initial', answers)
+            self.assertEqual(response.status_code, 302)
+
+        # A later edit by staff doesn't count as the mentor's submission
+        feedback = models.InitialMentorFeedback.objects.get(intern_selection=interns[0])
+        with reversion.create_revision():
+            reversion.set_user(UserFactory(is_staff=True))
+            feedback.organizer_payment_approved = True
+            feedback.save()
+
+        # A feedback object with no versions at all resolves to None
+        InitialMentorFeedbackFactory(intern_selection=interns[2])
+
+        def load_feedback():
+            return list(models.InitialMentorFeedback.objects.filter(
+                intern_selection__in=interns).order_by('pk'))
+
+        expected = [f.find_version_mentor_edited() for f in load_feedback()]
+        self.assertIsNotNone(expected[0])
+        self.assertIsNotNone(expected[1])
+        self.assertIsNone(expected[2])
+
+        mentor_email = interns[0].mentors.get().mentor.account.email
+        feedback_list = load_feedback()
+        with self.assertNumQueries(2):
+            models.InitialMentorFeedback.resolve_mentor_versions(feedback_list)
+        with self.assertNumQueries(0):
+            found = [f.find_version_mentor_edited() for f in feedback_list]
+            self.assertEqual(feedback_list[0].get_mentor_email(), mentor_email)
+        self.assertEqual(found, expected)
+
+    def test_feedback_status_annotations(self):
+        current_round = RoundPageFactory(start_from='midfeedback')
+
+        def intern(**kwargs):
+            return InternSelectionFactory(active=True, round=current_round, **kwargs)
+
+        InitialMentorFeedbackFactory(intern_selection=intern())
+        InitialMentorFeedbackFactory(intern_selection=intern(),
+                payment_approved=False, request_extension=True,
+                extension_date=current_round.initialfeedback + datetime.timedelta(weeks=2))
+        InitialMentorFeedbackFactory(intern_selection=intern(),
+                payment_approved=False, request_termination=True, allow_edits=True)
+        MidpointMentorFeedbackFactory(intern_selection=intern(), allow_edits=True)
+        intern(intern_ends=current_round.internends + datetime.timedelta(weeks=5))
+        intern(midpoint_feedback_opens=current_round.midfeedback + datetime.timedelta(weeks=1))
+
+        methods = ['intern_has_custom_dates']
+        for stage in models.InternSelection.FEEDBACK_STAGES:
+            methods.extend([
+                'get_mentor_{}_feedback_status'.format(stage),
+                'get_intern_{}_feedback_status'.format(stage),
+                'is_{}_feedback_on_intern_open'.format(stage),
+                'is_{}_feedback_on_intern_past_due'.format(stage),
+            ])
+
+        interns = models.InternSelection.objects.filter(
+                project__project_round__participating_round=current_round)
+        with self.assertNumQueries(1):
+            annotated = {i.pk: i for i in models.InternSelection.with_feedback_status(interns)}
+            results = {
+                pk: [getattr(i, method)() for method in methods]
+                for pk, i in annotated.items()
+            }
+
+        self.assertEqual(len(annotated), 6)
+        for plain in interns:
+            for method, result in zip(methods, results[plain.pk]):
+                with self.subTest(intern=plain.pk, method=method):
+                    self.assertEqual(result, getattr(plain, method)())
+
     def test_invalid_mentor_extension_request(self):
         round = RoundPageFactory(start_from='initialfeedback')
 
@@ -420,3 +513,279 @@ class InternSelectionTestCase(TestCase):
 
                 self.assertEqual(Version.objects.get_for_object(feedback).count(), 1)
 
+
+    def test_community_applicants_queries_do_not_scale(self):
+        # The community applicants page should make the same number of
+        # queries no matter how many interns and applicants there are
+        internselection = InternSelectionFactory(active=True)
+        project = internselection.project
+        current_round = internselection.round()
+        participation = project.project_round
+        ContributionFactory(project=project, applicant=internselection.applicant)
+
+        path = reverse('community-applicants', kwargs={
+            'round_slug': current_round.slug,
+            'community_slug': participation.community.slug,
+        })
+        self.client.force_login(UserFactory(is_staff=True))
+
+        def add_applicants(count):
+            for _ in range(count):
+                ContributionFactory(project=project, round=current_round)
+                InternSelectionFactory(
+                    active=True,
+                    round=current_round,
+                    project=ProjectFactory(
+                        project_round=participation,
+                        approval_status=models.ApprovalStatus.APPROVED,
+                    ),
+                )
+
+        self.assertQueriesDoNotScale('community-applicants', path, add_applicants, sizes=(0, 3))
+
+        # Applicants whose availability isn't cached yet are loaded in bulk,
+        # not one at a time
+        self.assertQueriesDoNotScale('community-applicants', path, add_applicants, sizes=(0, 3), cold=True)
+
+    def test_dashboard_section_timings(self):
+        internselection = InternSelectionFactory(active=True)
+        mentor = internselection.mentors.get()
+        intern_name = internselection.applicant.applicant.public_name
+
+        # Mentors see their mentee, but not how long the dashboard took
+        self.client.force_login(mentor.mentor.account)
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, intern_name, status_code=200)
+        self.assertNotContains(response, 'Dashboard performance')
+
+        # Staff get timings for every section
+        self.client.force_login(UserFactory(is_staff=True))
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Dashboard performance', status_code=200)
+        self.assertEqual(
+                [name for name, milliseconds, queries in response.context['section_timings']],
+                [section.__name__ for section in DASHBOARD_SECTIONS])
+
+    def test_intern_selection_report(self):
+        internselection = InternSelectionFactory(active=True, organizer_approved=None)
+        current_round = internselection.round()
+        path = reverse('intern-selection-report', kwargs={'round_slug': current_round.slug})
+        self.client.force_login(UserFactory(is_staff=True))
+
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].pending, [internselection])
+        self.assertContains(response, internselection.applicant.applicant.public_name)
+
+        # Approving the intern should show up right away, even though the
+        # report is cached
+        internselection.organizer_approved = True
+        internselection.save()
+        response = self.client.get(path)
+        self.assertEqual(response.context['report'].pending, [])
+        self.assertEqual(response.context['report'].approved, [internselection])
+
+        # Filtering by status leaves out everyone else
+        response = self.client.get(path, {'status': 'pending'})
+        self.assertNotContains(response, internselection.applicant.applicant.public_name)
+
+        def add_interns(count):
+            for _ in range(count):
+                InternSelectionFactory(active=True, round=current_round)
+
+        # ?refresh rebuilds the report on every request, so this measures
+        # building it rather than fetching it from the cache
+        self.assertQueriesDoNotScale('intern-selection-report', path, add_interns,
+                sizes=(0, 3), data={'refresh': ''})
+
+        # Without it, the report that was just built is served from the cache
+        self.assertLess(self.get_view_queries(path), self.get_view_queries(path, {'refresh': ''}))
+
+    def test_reminder_emails_are_queued(self):
+        internselection = InternSelectionFactory(active=True)
+        current_round = internselection.round()
+        organizer = ComradeFactory(account__is_staff=True)
+        self.client.force_login(organizer.account)
+
+        path = reverse('email-intern-welcome', kwargs={'round_slug': current_round.slug})
+        response = self.client.post(path)
+        self.assertRedirects(response, reverse('email-outbox'))
+
+        # Nothing is sent until the outbox worker runs
+        self.assertEqual(len(mail.outbox), 0)
+        queued = models.OutgoingEmail.objects.get()
+        self.assertEqual(queued.status, models.OutgoingEmail.QUEUED)
+        self.assertEqual(queued.batch.created_by, organizer.account)
+
+        call_command('send_queued_email', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(internselection.applicant.applicant.email_address().addr_spec, mail.outbox[0].to[0])
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, models.OutgoingEmail.SENT)
+        self.assertEqual(queued.attempts, 1)
+
+        # Running the worker again doesn't send anything twice
+        call_command('send_queued_email', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_contract_export_formats(self):
+        internselection = InternSelectionFactory(active=True, mentors=2)
+        current_round = internselection.round()
+        self.client.force_login(UserFactory(is_staff=True))
+        path = reverse('contract-export', kwargs={'round_slug': current_round.slug})
+
+        response = self.client.get(path)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        exported = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(len(exported), 1)
+        self.assertEqual(exported[0]['legal name'], internselection.applicant.applicant.legal_name)
+        self.assertEqual(exported[0]['community'], internselection.community_name())
+        self.assertEqual(len(exported[0]['mentors']), 2)
+
+        response = self.client.get(path, {'format': 'csv'})
+        self.assertTrue(response['Content-Disposition'].endswith('-contracts.csv"'))
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(len(rows), 2)
+        exported_csv = dict(zip(rows[0], rows[1]))
+        self.assertEqual(exported_csv['legal name'], internselection.applicant.applicant.legal_name)
+        self.assertEqual(len(json.loads(exported_csv['mentors'])), 2)
+
+    def test_contract_export_etag(self):
+        internselection = InternSelectionFactory(active=True)
+        self.client.force_login(UserFactory(is_staff=True))
+        path = reverse('contract-export', kwargs={'round_slug': internselection.round().slug})
+        response = self.client.get(path)
+        b''.join(response.streaming_content)
+        etag = response['ETag']
+
+        # Staff who already have this version shouldn't get it again
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Until something in it changes, like the community's name
+        community = internselection.project.project_round.community
+        community.name = 'A renamed community'
+        community.save()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'A renamed community', b''.join(response.streaming_content))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1, SLOW_REQUEST_SECONDS=0)
+    def test_streaming_export_timing(self):
+        internselection = InternSelectionFactory(active=True)
+        self.client.force_login(UserFactory(is_staff=True))
+        path = reverse('contract-export', kwargs={'round_slug': internselection.round().slug})
+
+        with self.assertLogs('outreachyhome.middleware', 'WARNING') as logs:
+            response = self.client.get(path)
+            # The export isn't timed until all of it has been sent
+            self.assertEqual(logs.output, [])
+            b''.join(response.streaming_content)
+        self.assertIn('(contract-export)', logs.output[0])
+
+        # Or until the server gives up on it without sending any. Like the
+        # test client, don't let closing the response close the connection
+        # that this test's transaction is using.
+        with self.assertLogs('outreachyhome.middleware', 'WARNING') as logs:
+            response = self.client.get(path)
+            request_finished.disconnect(close_old_connections)
+            try:
+                response.close()
+            finally:
+                request_finished.connect(close_old_connections)
+        self.assertIn('(contract-export)', logs.output[0])
+        self.assertFalse(connection.force_debug_cursor)
+
+    def test_alums_page(self):
+        internselection = InternSelectionFactory(active=True)
+        current_round = internselection.round()
+        name = internselection.applicant.applicant.public_name
+        # Logged-in visitors skip the whole-page cache but still get the
+        # cached list of interns for each round
+        self.client.force_login(UserFactory())
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('alums'))
+            self.assertEqual(response.status_code, 200)
+            return len(queries), response
+
+        # Warm up any caches that only get filled on the first request
+        count_queries()
+        cached, response = count_queries()
+        self.assertContains(response, name)
+
+        # Adding interns re-renders their round, in the same number of
+        # queries no matter how many there are
+        InternSelectionFactory(active=True, round=current_round)
+        one_more, response = count_queries()
+        for _ in range(3):
+            InternSelectionFactory(active=True, round=current_round, mentors=2)
+        self.assertEqual(count_queries()[0], one_more)
+        self.assertLess(cached, one_more)
+
+        # Interns who aren't in good standing disappear from the page
+        internselection.in_good_standing = False
+        internselection.save()
+        queries, response = count_queries()
+        self.assertNotContains(response, name)
+
+        # So do mentors who are removed from an internship
+        other = InternSelectionFactory(active=True, round=current_round)
+        mentor_names = other.mentor_names()
+        self.assertContains(count_queries()[1], mentor_names)
+        other.mentorrelationship_set.all().delete()
+        self.assertNotContains(count_queries()[1], mentor_names)
+
+    def test_reminder_email_queries_dont_grow_with_interns(self):
+        internselection = InternSelectionFactory(active=True)
+        current_round = internselection.round()
+        # SendEmailView requires a Comrade
+        self.client.force_login(ComradeFactory(account__is_staff=True).account)
+        path = reverse('email-intern-welcome', kwargs={'round_slug': current_round.slug})
+
+        def add_interns(count):
+            for _ in range(count):
+                InternSelectionFactory(active=True, round=current_round, mentors=2)
+
+        self.assertQueriesDoNotScale('email-intern-welcome', path, add_interns, sizes=(0, 3))
+
+        response = self.client.get(path)
+        self.assertEqual(len(response.context['messages']), 4)
+
+    def test_staff_dashboard_queries_do_not_scale(self):
+        internselection = InternSelectionFactory(active=True, round__start_from='initialfeedback')
+        current_round = internselection.round()
+        InitialMentorFeedbackFactory(intern_selection=internselection)
+        self.client.force_login(UserFactory(is_staff=True))
+
+        def add_interns(count):
+            for _ in range(count):
+                intern = InternSelectionFactory(active=True, round=current_round, project=internselection.project)
+                InitialMentorFeedbackFactory(intern_selection=intern)
+
+        self.assertQueriesDoNotScale('dashboard', reverse('dashboard'), add_interns)
+
+    def test_benchmark_commands(self):
+        call_command('generate_benchmark_round',
+                communities=2, projects=3, applicants=6, contributions=10,
+                final_applications=6, interns=2, stdout=StringIO())
+
+        current_round = models.RoundPage.objects.latest('pk')
+        self.assertEqual(models.InternSelection.objects.filter(
+            project__project_round__participating_round=current_round).count(), 2)
+        self.assertEqual(models.InitialMentorFeedback.objects.count(), 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.json')
+            call_command('benchmark_views', runs=1, output=path, stdout=StringIO())
+            with open(path) as f:
+                report = json.load(f)
+
+        self.assertEqual(report['round'], current_round.slug)
+        self.assertIn('dashboard-mentor', report['results'])
+        for name, result in report['results'].items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['status'], 200)
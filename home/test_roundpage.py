@@ -1,16 +1,32 @@
 from datetime import datetime, timedelta, timezone
+from django.core.management import CommandError, call_command
 from django.test import TestCase, override_settings
+from io import StringIO
 from django.urls import reverse
 import unittest
+from unittest import mock
+from wagtail.wagtailsearch.models import QueryDailyHits
+
+from outreachyhome import requesttiming
+from search import hits
 
 from . import models
+from . import pagecache
+from .context_processors import get_pending_approvals
+from .factories import ApplicantApprovalFactory
+from .factories import ApplicationReviewerFactory
+from .factories import ContributionFactory
+from .factories import CoordinatorApprovalFactory
 from .factories import MentorApprovalFactory
 from .factories import ProjectFactory
+from .factories import RoundPageFactory
+from .factories import UserFactory
+from .querybudget import QueryBudgetMixin
 
 
 # don't try to use the static files manifest during tests
 @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
-class RoundPageTestCase(TestCase):
+class RoundPageTestCase(QueryBudgetMixin, TestCase):
     def test_round_closed_no_new_round(self):
         # Make a round where the internship start date was a month ago
         # Make an approved project in an approved community that is under that round
@@ -155,3 +171,376 @@ class RoundPageTestCase(TestCase):
         self.assertContains(response, 'review the list of participating communities below who are looking for help', status_code=200)
         # Make sure the page shows the community
         self.assertContains(response, community_name, status_code=200)
+
+    def test_round_phases(self):
+        # Make a round whose internships started a month ago,
+        # and a round whose application period opened ten days ago
+        now = datetime.now(timezone.utc)
+        past_round = RoundPageFactory(start_from='internstarts', start_date=now - timedelta(days=30))
+        current_round = RoundPageFactory(start_from='appsopen', start_date=now - timedelta(days=10))
+
+        phases = models.RoundPhases()
+        # Every phase should be answered from a single query
+        with self.assertNumQueries(1):
+            self.assertEqual(phases.application_round, current_round)
+            self.assertEqual(phases.cfp_round, current_round)
+            self.assertEqual(phases.initial_application_round, current_round)
+            self.assertEqual(phases.application_review_round, current_round)
+            self.assertEqual(phases.upcoming_internship_round, current_round)
+            self.assertEqual(phases.opened_round, current_round)
+            self.assertEqual(phases.internship_active_round, past_round)
+            self.assertEqual(phases.previous_round, past_round)
+            self.assertEqual(phases.started_round, past_round)
+            self.assertEqual(phases.announced_round, past_round)
+            self.assertEqual(phases.latest_round, current_round)
+            self.assertTrue(phases.has_later_open_round(past_round))
+
+    def test_round_statistics_snapshot(self):
+        # Make a round whose application period has closed, with one applicant
+        # who made two contributions and one applicant who was rejected
+        contribution = ContributionFactory()
+        current_round = contribution.applicant.application_round
+        ContributionFactory(applicant=contribution.applicant, round=current_round)
+        ApplicantApprovalFactory(
+                application_round=current_round,
+                approval_status=models.ApprovalStatus.REJECTED,
+                reason_denied='TIME')
+
+        statistics = current_round.get_statistics()
+        self.assertEqual(statistics.get_statistics_on_eligibility_check(), (2, 1, 0, 100, 0))
+        self.assertEqual(statistics.contributors, 1)
+
+        # Later requests should be served from the stored snapshot,
+        # even if the underlying data changed
+        ApplicantApprovalFactory(application_round=current_round)
+        current_round = models.RoundPage.objects.get(pk=current_round.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(current_round.get_statistics().applicants, 2)
+
+        # Until someone asks for it to be refreshed
+        self.assertEqual(current_round.get_statistics(refresh=True).applicants, 3)
+
+    # Measure rendering the page, not serving it from the anonymous page cache
+    @override_settings(ANONYMOUS_PAGE_CACHE_TIMEOUT=0)
+    def test_project_selection_queries_do_not_scale(self):
+        # The project selection page should make the same number of queries
+        # no matter how many communities are participating
+        open_date = datetime.now(timezone.utc) - timedelta(days=10)
+        current_round = RoundPageFactory(start_from='appsopen', start_date=open_date)
+
+        def add_communities(count):
+            for _ in range(count):
+                project = ProjectFactory(
+                        approval_status=models.ApprovalStatus.APPROVED,
+                        project_round__approval_status=models.ApprovalStatus.APPROVED,
+                        project_round__participating_round=current_round)
+                models.ProjectSkill.objects.create(project=project, skill='Python')
+
+        self.assertQueriesDoNotScale('project-selection', reverse('project-selection'), add_communities)
+
+    def test_anonymous_page_cache(self):
+        open_date = datetime.now(timezone.utc) - timedelta(days=10)
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                short_title="The original title",
+                project_round__participating_round__start_from='appsopen',
+                project_round__participating_round__start_date=open_date)
+        response = self.client.get(reverse('project-selection'))
+        self.assertContains(response, "The original title", status_code=200)
+
+        # Changes that don't go through save() aren't noticed, so the
+        # cached page should still be served
+        models.Project.objects.filter(pk=project.pk).update(short_title="A sneaky title")
+        response = self.client.get(reverse('project-selection'))
+        self.assertContains(response, "The original title", status_code=200)
+
+        # Saving the project should invalidate the cached page
+        project.short_title = "The new title"
+        project.save()
+        response = self.client.get(reverse('project-selection'))
+        self.assertContains(response, "The new title", status_code=200)
+
+        # Visitors who are logged in never get the cached page
+        models.Project.objects.filter(pk=project.pk).update(short_title="A sneaky title")
+        mentor = MentorApprovalFactory(project=project, approval_status=models.ApprovalStatus.APPROVED)
+        self.client.force_login(mentor.mentor.account)
+        response = self.client.get(reverse('project-selection'))
+        self.assertContains(response, "A sneaky title", status_code=200)
+
+    def test_anonymous_page_etag(self):
+        open_date = datetime.now(timezone.utc) - timedelta(days=10)
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                project_round__participating_round__start_from='appsopen',
+                project_round__participating_round__start_date=open_date)
+        response = self.client.get(reverse('project-selection'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        # A browser that already has this version shouldn't get it again
+        response = self.client.get(reverse('project-selection'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Until something on the page changes
+        project.save()
+        response = self.client.get(reverse('project-selection'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_pending_approvals_count(self):
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.PENDING,
+                project_round__approval_status=models.ApprovalStatus.APPROVED)
+        coordinator = CoordinatorApprovalFactory(
+                community=project.project_round.community,
+                approval_status=models.ApprovalStatus.APPROVED)
+        user = coordinator.coordinator.account
+        self.assertEqual(get_pending_approvals(user), 1)
+
+        # The count is cached, so a second look doesn't need any queries
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_approvals(user), 1)
+
+        # Approving the project should update the count
+        project.approval_status = models.ApprovalStatus.APPROVED
+        project.save()
+        self.assertEqual(get_pending_approvals(user), 0)
+
+    def test_search_projects_without_writing_hits(self):
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                short_title="Frobnicate the widgets")
+        hidden = ProjectFactory(
+                approval_status=models.ApprovalStatus.PENDING,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                short_title="Frobnicate the gadgets")
+
+        with self.settings(SEARCH_HITS_FLUSH_INTERVAL=3600):
+            response = self.client.get(reverse('search'), {'query': 'frobnicate'})
+        self.assertContains(response, project.short_title, status_code=200)
+        self.assertNotContains(response, hidden.short_title)
+
+        # Hits are only saved in batches
+        self.assertFalse(QueryDailyHits.objects.exists())
+        hits.flush()
+        self.assertEqual(QueryDailyHits.objects.get().hits, 1)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1, SLOW_REQUEST_SECONDS=0)
+    def test_request_timing(self):
+        RoundPageFactory(start_from='appsopen')
+        with self.assertLogs('outreachyhome.middleware', 'WARNING') as logs:
+            response = self.client.get(reverse('project-selection'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('(project-selection)', logs.output[0])
+
+        # Staff see the sampled timings once they've been saved
+        requesttiming.flush()
+        self.client.force_login(UserFactory(is_staff=True))
+        with self.settings(SLOW_REQUEST_SECONDS=None):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, '<td>project-selection</td>')
+
+        self.assertEqual(
+            requesttiming.fingerprint("SELECT a FROM t WHERE id = 12 AND name = 'it''s' AND pk IN (1, 2, 3)"),
+            "SELECT a FROM t WHERE id = ? AND name = ? AND pk IN (...)")
+
+    def test_counters(self):
+        current_round = RoundPageFactory(start_from='appsopen')
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                project_round__participating_round=current_round)
+        participation = project.project_round
+
+        def counts():
+            project.refresh_from_db()
+            fresh_round = models.RoundPage.objects.get(pk=current_round.pk)
+            return (
+                project.contributor_count,
+                fresh_round.number_contributors(),
+                fresh_round.number_accepted_initial_applications(),
+                fresh_round.number_approved_projects(),
+            )
+
+        self.assertEqual(counts(), (0, 0, 0, 1))
+
+        first = ContributionFactory(round=current_round, project=project)
+        ContributionFactory(round=current_round, project=project)
+        self.assertEqual(counts(), (2, 2, 2, 1))
+
+        # Counts only include approved applicants and projects
+        first.applicant.approval_status = models.ApprovalStatus.REJECTED
+        first.applicant.save()
+        project.approval_status = models.ApprovalStatus.WITHDRAWN
+        project.save()
+        self.assertEqual(counts(), (1, 1, 1, 0))
+
+        models.Sponsorship.objects.create(participation=participation,
+                coordinator_can_update=True, name='Sponsor', amount=13000)
+        participation.refresh_from_db()
+        self.assertEqual(participation.interns_funded(), 2)
+
+        # The recount command finds and fixes counts that were changed
+        # without sending signals
+        call_command('recount', check=True, stdout=StringIO())
+        models.Project.objects.filter(pk=project.pk).update(contributor_count=5)
+        with self.assertRaises(CommandError):
+            call_command('recount', check=True, stdout=StringIO())
+        call_command('recount', stdout=StringIO())
+        self.assertEqual(counts(), (1, 1, 1, 0))
+
+    def test_common_skills(self):
+        current_round = RoundPageFactory(start_from='appsopen')
+        project = ProjectFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project_round__approval_status=models.ApprovalStatus.APPROVED,
+                project_round__participating_round=current_round)
+        for skill in ('Python 3', 'Django and python', 'Android apps in Java', 'Go programming', 'C'):
+            models.ProjectSkill.objects.create(project=project, skill=skill)
+
+        self.assertEqual(current_round.get_common_skills(), [
+            ('Python', 2),
+            ('Android', 1),
+            ('C programming', 1),
+            ('Go programming', 1),
+            ('Java', 1),
+        ])
+
+        # Skills in projects that aren't approved aren't counted
+        ProjectFactory(
+                project_round=project.project_round,
+                approval_status=models.ApprovalStatus.PENDING,
+        ).projectskill_set.create(skill='Python')
+        self.assertEqual(current_round.get_common_skills()[0], ('Python', 2))
+
+        # New aliases apply to existing skills once they're normalized again
+        models.CanonicalSkill.objects.create(name='Go', aliases='golang\n\\bgo\\b', order=5)
+        golang = models.ProjectSkill.objects.create(project=project, skill='Golang')
+        self.assertEqual(golang.normalized_skill, 'Go')
+        call_command('normalize_skills', stdout=StringIO())
+        self.assertIn(('Go', 2), pagecache.get_common_skills(current_round))
+
+    def test_approval_status_transitions(self):
+        current_round = RoundPageFactory(start_from='pingnew')
+        mentor_approval = MentorApprovalFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                project__approval_status=models.ApprovalStatus.PENDING,
+                project__project_round__approval_status=models.ApprovalStatus.APPROVED,
+                project__project_round__participating_round=current_round)
+        project = mentor_approval.project
+        coordinator_approval = CoordinatorApprovalFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                community=project.project_round.community)
+
+        self.client.force_login(coordinator_approval.coordinator.account)
+        response = self.client.post(project.get_approve_url())
+        self.assertEqual(response.status_code, 302)
+
+        transition = models.ApprovalStatusTransition.objects.for_model(models.Project).get()
+        self.assertEqual(transition.object_id, project.pk)
+        self.assertEqual(transition.from_status, models.ApprovalStatus.PENDING)
+        self.assertEqual(transition.to_status, models.ApprovalStatus.APPROVED)
+        self.assertEqual(transition.actor, coordinator_approval.coordinator.account)
+
+        # Only projects that were pending in the last week are new
+        self.assertEqual(current_round.get_new_projects(), [])
+        submitted = models.ApprovalStatusTransition.objects.create(
+                content_object=project,
+                from_status=models.ApprovalStatus.WITHDRAWN,
+                to_status=models.ApprovalStatus.PENDING)
+        self.assertEqual(current_round.get_new_projects(), [project])
+        submitted.created -= timedelta(days=8)
+        submitted.save()
+        self.assertEqual(current_round.get_new_projects(), [])
+
+    def test_permissions_are_loaded_once(self):
+        current_round = RoundPageFactory(start_from='pingnew')
+        coordinator_approval = CoordinatorApprovalFactory(
+                approval_status=models.ApprovalStatus.APPROVED)
+        community = coordinator_approval.community
+        other_community = CoordinatorApprovalFactory(
+                approval_status=models.ApprovalStatus.PENDING).community
+        models.Participation.objects.create(community=community,
+                participating_round=current_round,
+                approval_status=models.ApprovalStatus.APPROVED)
+        user = coordinator_approval.coordinator.account
+
+        with self.assertNumQueries(2):
+            self.assertTrue(community.is_coordinator(user))
+            self.assertFalse(other_community.is_coordinator(user))
+            self.assertTrue(current_round.is_coordinator(user))
+            self.assertTrue(community.is_coordinator(user))
+
+        coordinator_approval.approval_status = models.ApprovalStatus.WITHDRAWN
+        coordinator_approval.save()
+        self.assertTrue(community.is_coordinator(user))
+        models.forget_permissions(user)
+        self.assertFalse(community.is_coordinator(user))
+
+    def test_applicant_review_queue(self):
+        open_date = datetime.now(timezone.utc) - timedelta(days=10)
+        current_round = RoundPageFactory(start_from='appsopen', start_date=open_date)
+        reviewer = ApplicationReviewerFactory(
+                approval_status=models.ApprovalStatus.APPROVED,
+                reviewing_round=current_round)
+
+        def add_applications(count):
+            for _ in range(count):
+                application = ApplicantApprovalFactory(
+                        approval_status=models.ApprovalStatus.PENDING,
+                        application_round=current_round)
+                models.InitialApplicationReview.objects.create(
+                        application=application,
+                        reviewer=reviewer,
+                        essay_rating=models.InitialApplicationReview.GOOD,
+                        review_work=True,
+                        missing_work=True)
+
+        self.client.force_login(reviewer.comrade.account)
+        self.assertQueriesDoNotScale('pending-applicants-summary',
+                reverse('pending-applicants-summary'), add_applications)
+
+        # Per-application aggregates are computed in the database
+        queue = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING)
+        self.assertEqual(queue.count, 4)
+        self.assertEqual(queue.applications[0].average_rating, 2)
+        self.assertEqual(queue.applications[0].red_flag_count, 2)
+
+        queue = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING,
+                rating='unrated', red_flags='yes')
+        self.assertEqual(queue.count, 0)
+        queue = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING,
+                owner='none', red_flags='yes', rating=models.InitialApplicationReview.GOOD)
+        self.assertEqual(queue.count, 4)
+
+        with mock.patch.object(models.ApplicantReviewQueue, 'PAGE_SIZE', 3):
+            first = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING)
+            self.assertEqual(len(first.applications), 3)
+            self.assertFalse(first.has_previous)
+            self.assertTrue(first.has_next)
+
+            second = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING,
+                    after=first.next_after)
+            self.assertEqual(len(second.applications), 1)
+            self.assertFalse(second.has_next)
+
+            back = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING,
+                    before=second.previous_before)
+            self.assertEqual([a.pk for a in back.applications], [a.pk for a in first.applications])
+            self.assertFalse(back.has_previous)
+            self.assertTrue(back.has_next)
+
+            # There's nothing to go back to from before the first application
+            start = models.ApplicantReviewQueue(current_round, models.ApprovalStatus.PENDING,
+                    after=first.applications[0].pk - 1)
+            self.assertEqual([a.pk for a in start.applications], [a.pk for a in first.applications])
+            self.assertFalse(start.has_previous)
+            self.assertTrue(start.has_next)
+
+        # New applications miss the availability cache, but their
+        # availability is still loaded for the whole page at once
+        self.assertQueriesDoNotScale('pending-applicants-summary',
+                reverse('pending-applicants-summary'), add_applications, sizes=(0, 2), cold=True)
@@ -55,6 +55,7 @@ round_community_patterns = [
 round_patterns = [
     url(r'^communities/(?P<community_slug>[^/]+)/', include(round_community_patterns)),
     url(r'^contract-export/$', views.contract_export_view, name='contract-export'),
+    url(r'^intern-selection/$', views.intern_selection_report, name='intern-selection-report'),
     url(r'^initial-feedback-export/$', views.initial_mentor_feedback_export_view, name='initial-feedback-export'),
     url(r'^initial-feedback-summary/$', views.initial_feedback_summary, name='initial-feedback-summary'),
     url(r'^midpoint-feedback-export/$', views.midpoint_mentor_feedback_export_view, name='midpoint-feedback-export'),
@@ -102,6 +103,7 @@ urlpatterns = [
     url(r'^dashboard/feedback/mentor/final/(?P<username>[^/]+)/$', views.FinalMentorFeedbackUpdate.as_view(), name='final-mentor-feedback'),
     url(r'^dashboard/feedback/intern/final/$', views.FinalInternFeedbackUpdate.as_view(), name='final-intern-feedback'),
     url(r'^dashboard/trusted-volunteers/$', views.TrustedVolunteersListView.as_view(), name='trusted-volunteers-list'),
+    url(r'^dashboard/email-outbox/$', views.email_outbox, name='email-outbox'),
     url(r'^eligibility/$', views.EligibilityUpdateView.as_view(), name='eligibility'),
     url(r'^eligibility/essay-revision/(?P<applicant_username>[^/]+)/$', views.BarriersToParticipationUpdate.as_view(), name='essay-revision'),
     url(r'^eligibility/school-revision/(?P<applicant_username>[^/]+)/$', views.SchoolInformationUpdate.as_view(), name='school-revision'),
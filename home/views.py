@@ -5,27 +5,28 @@ from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.core import mail
 from django.core.mail.backends.base import BaseEmailBackend
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.core.signing import TimestampSigner, SignatureExpired, BadSignature 
 from django.db import models
 from django.forms import inlineformset_factory, ModelForm, modelform_factory, modelformset_factory, ValidationError
 from django.forms.models import BaseInlineFormSet, BaseModelFormSet
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import HttpResponse, Http404
 from django.shortcuts import get_list_or_404
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.http import urlencode
 from django.utils.safestring import mark_safe
 from django.utils.text import slugify
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import condition, require_POST
 from django.views.generic import FormView, View, DetailView, ListView, TemplateView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from formtools.wizard.views import SessionWizardView
-from itertools import chain, groupby
+from itertools import chain
 from markdownx.utils import markdownify
 from registration.forms import RegistrationForm
 from registration.backends.hmac import views as hmac_views
@@ -34,6 +35,9 @@ import reversion
 from . import email
 
 from .dashboard import get_dashboard_sections
+from .exports import export_response
+from .exports import export_row
+from .exports import iterate_in_chunks
 
 from .forms import RadioBooleanField
 
@@ -48,20 +52,24 @@ from .models import AlumSurveyTracker
 from .models import ApplicantApproval
 from .models import ApplicantGenderIdentity
 from .models import ApplicantRaceEthnicityInformation
+from .models import ApplicantReviewQueue
 from .models import ApplicationReviewer
 from .models import ApprovalStatus
 from .models import BarriersToParticipation
 from .models import CohortPage
 from .models import CommunicationChannel
 from .models import Community
+from .models import CommunityApplicants
 from .models import Comrade
 from .models import ContractorInformation
 from .models import Contribution
 from .models import CoordinatorApproval
-from .models import create_time_commitment_calendar
+from .models import EmailBatch
 from .models import EmploymentTimeCommitment
 from .models import FinalApplication
+from .models import find_longest_free_period
 from .models import get_deadline_date_for
+from .models import get_round_phases
 from .models import InternSelection
 from .models import InitialApplicationReview
 from .models import InitialMentorFeedback
@@ -76,6 +84,7 @@ from .models import MentorRelationship
 from .models import NewCommunity
 from .models import NonCollegeSchoolTimeCommitment
 from .models import Notification
+from .models import OutgoingEmail
 from .models import Participation
 from .models import PaymentEligibility
 from .models import PriorFOSSExperience
@@ -86,12 +95,20 @@ from .models import Role
 from .models import RoundPage
 from .models import SchoolInformation
 from .models import SchoolTimeCommitment
+from .models import SENTENCE_LENGTH
 from .models import TimeCommitmentSummary
 from .models import SignedContract
 from .models import Sponsorship
 from .models import VolunteerTimeCommitment
 from .models import WorkEligibility
 
+from .pagecache import anonymous_page_etag
+from .pagecache import cache_anonymous_page
+from .pagecache import export_etag
+from .pagecache import get_alum_round_fragments
+from .pagecache import get_common_skills
+from .pagecache import get_intern_selection_report
+
 from os import path
 
 class RegisterUserForm(RegistrationForm):
@@ -375,12 +392,8 @@ def time_commitments_are_approved(wizard, application_round):
             if d ]
 
     required_free_days = 7*7
-    calendar = create_time_commitment_calendar(chain(tcs, ctcs, etcs, stcs), application_round)
-
-    for key, group in groupby(calendar, lambda hours: hours <= 20):
-        if key is True and len(list(group)) >= required_free_days:
-            return True
-    return False
+    start, longest_period_free = find_longest_free_period(chain(tcs, ctcs, etcs, stcs), application_round)
+    return longest_period_free >= required_free_days
 
 def determine_eligibility(wizard, application_round):
     if not (work_eligibility_is_approved(wizard)):
@@ -398,17 +411,11 @@ def determine_eligibility(wizard, application_round):
 
 # People can only submit new initial applications or edit initial applications
 # when the application period is open.
-def get_current_round_for_initial_application():
-    now = datetime.now(timezone.utc)
-    today = get_deadline_date_for(now)
-
-    try:
-        return RoundPage.objects.get(
-            appsopen__lte=today,
-            appslate__gt=today,
-        )
-    except RoundPage.DoesNotExist:
+def get_current_round_for_initial_application(request):
+    current_round = get_round_phases(request).initial_application_round
+    if current_round is None:
         raise PermissionDenied('The Outreachy application period is closed. If you are an applicant who has submitted an application for an internship project and your time commitments have increased, please contact the Outreachy organizers (see contact link above). Eligibility checking will become available when the next application period opens. Please sign up for the announcements mailing list for an email when the next application period opens: https://lists.outreachy.org/cgi-bin/mailman/listinfo/announce')
+    return current_round
 
 class EligibilityUpdateView(LoginRequiredMixin, ComradeRequiredMixin, reversion.views.RevisionMixin, SessionWizardView):
     template_name = 'home/wizard_form.html'
@@ -662,7 +669,7 @@ class EligibilityUpdateView(LoginRequiredMixin, ComradeRequiredMixin, reversion.
 
     def show_results_if_any(self):
         # get_context_data() and done() both need a round; save it for them.
-        self.current_round = get_current_round_for_initial_application()
+        self.current_round = get_current_round_for_initial_application(self.request)
 
         already_submitted = ApplicantApproval.objects.filter(
             applicant=self.request.user.comrade,
@@ -732,7 +739,7 @@ class EligibilityResults(LoginRequiredMixin, ComradeRequiredMixin, DetailView):
     context_object_name = 'application'
 
     def get_object(self):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         return get_object_or_404(ApplicantApproval,
                     applicant=self.request.user.comrade,
                     application_round=current_round)
@@ -754,7 +761,7 @@ class ViewInitialApplication(LoginRequiredMixin, ComradeRequiredMixin, DetailVie
         return context
 
     def get_object(self):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
 
         self.role = Role(self.request.user, current_round)
 
@@ -765,6 +772,8 @@ class ViewInitialApplication(LoginRequiredMixin, ComradeRequiredMixin, DetailVie
                     applicant__account__username=self.kwargs['applicant_username'],
                     application_round=current_round)
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def past_rounds_page(request):
     return render(request, 'home/past_rounds.html',
             {
@@ -772,53 +781,62 @@ def past_rounds_page(request):
             },
             )
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def current_round_page(request):
     closed_approved_projects = []
     ontime_approved_projects = []
     late_approved_projects = []
     example_skill = ProjectSkill
 
-    now = datetime.now(timezone.utc)
-    today = get_deadline_date_for(now)
-
-    try:
-        previous_round = RoundPage.objects.filter(
-            appslate__lte=today,
-        ).latest('internstarts')
-    except RoundPage.DoesNotExist:
-        previous_round = None
-
-    try:
-        # Keep RoundPage.serve() in sync with this.
-        current_round = RoundPage.objects.get(
-            pingnew__lte=today,
-            # If the application period is closed, don't show projects from the current round
-            appslate__gt=today,
-        )
-    except RoundPage.DoesNotExist:
-        current_round = None
-
-    role = Role(request.user, current_round, today=today)
-    if current_round is not None:
-        approved_participations = current_round.participation_set.approved().order_by('community__name')
+    phases = get_round_phases(request)
+    previous_round = phases.previous_round
+    # If the application period is closed, don't show projects from the current round
+    current_round = phases.application_round
+
+    role = Role(request.user, current_round, today=phases.today)
+    if current_round is not None and role.can_see_all_project_details:
+        approved_participations = current_round.participation_set.approved(
+        ).select_related('community').order_by('community__name')
+
+        # Load every approved project in the round at once, with everything
+        # the project cards need, and sort them into their communities here.
+        projects_by_participation = {}
+        approved_projects = Project.objects.approved().filter(
+                project_round__in=approved_participations,
+        ).select_related(
+                'project_round__community',
+                'project_round__participating_round',
+        ).prefetch_related('projectskill_set')
+        for project in approved_projects:
+            projects_by_participation.setdefault(project.project_round_id, []).append(project)
 
         for p in approved_participations:
-            if not p.approved_to_see_all_project_details(request.user):
-                continue
-            projects = p.project_set.approved().filter(deadline=Project.CLOSED)
-            if projects:
-                closed_approved_projects.append((p.community, projects))
-            projects = p.project_set.approved().filter(deadline=Project.ONTIME)
-            if projects:
-                ontime_approved_projects.append((p.community, p.interns_funded(), projects))
-            projects = p.project_set.approved().filter(deadline=Project.LATE)
-            if projects:
-                late_approved_projects.append((p.community, p.interns_funded(), projects))
+            projects = projects_by_participation.get(p.pk, ())
+            closed = [project for project in projects if project.deadline == Project.CLOSED]
+            if closed:
+                closed_approved_projects.append((p.community, closed))
+            ontime = [project for project in projects if project.deadline == Project.ONTIME]
+            if ontime:
+                ontime_approved_projects.append((p.community, p.interns_funded(), ontime))
+            late = [project for project in projects if project.deadline == Project.LATE]
+            if late:
+                late_approved_projects.append((p.community, p.interns_funded(), late))
+
+    # The most common skills are shown for the previous round until this
+    # round's projects are listed, and then for this round.
+    if current_round is not None and current_round.has_application_period_started():
+        common_skills = get_common_skills(current_round)
+    elif previous_round is not None:
+        common_skills = get_common_skills(previous_round)
+    else:
+        common_skills = []
 
     return render(request, 'home/round_page_with_communities.html',
             {
             'current_round' : current_round,
             'previous_round' : previous_round,
+            'common_skills': common_skills,
             'closed_projects': closed_approved_projects,
             'ontime_projects': ontime_approved_projects,
             'late_projects': late_approved_projects,
@@ -855,6 +873,8 @@ def current_round_page(request):
 #    * If so, put it in a participating communities set
 #    * If not, put it in a not participating communities set
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def community_cfp_view(request):
     # Cheap trick for case-insensitive sorting: the slug is always lower-cased.
     all_communities = Community.objects.all().order_by('slug')
@@ -874,29 +894,15 @@ def community_cfp_view(request):
     # Mentors can still be sent a manual link to sign up to co-mentor after that date,
     # but their community page just won't show their project.
 
-    now = datetime.now(timezone.utc)
-    today = get_deadline_date_for(now)
-
-    try:
-        previous_round = RoundPage.objects.filter(
-            internstarts__lte=today,
-        ).latest('internstarts')
-    except RoundPage.DoesNotExist:
-        previous_round = None
+    phases = get_round_phases(request)
+    previous_round = phases.started_round
+    current_round = phases.cfp_round
 
-    try:
-        current_round = RoundPage.objects.get(
-            pingnew__lte=today,
-            internstarts__gt=today,
-        )
-    except RoundPage.DoesNotExist:
-        current_round = None
+    if current_round is None:
         not_participating_communities = all_communities.filter(
             participation__approval_status=ApprovalStatus.APPROVED,
         ).distinct()
     else:
-        # No exception caught, so we have a current_round
-
         # Now grab the community IDs of all communities participating in the current round
         # https://docs.djangoproject.com/en/1.11/topics/db/queries/#following-relationships-backward
         # https://docs.djangoproject.com/en/1.11/ref/models/querysets/#values-list
@@ -937,23 +943,17 @@ def community_cfp_view(request):
 def community_read_only_view(request, community_slug):
     community = get_object_or_404(Community, slug=community_slug)
 
-    now = datetime.now(timezone.utc)
-    today = get_deadline_date_for(now)
+    phases = get_round_phases(request)
 
     participation_info = None
 
-    try:
-        current_round = RoundPage.objects.get(
-            pingnew__lte=today,
-            # If the application period is closed, don't show projects from the current round
-            appslate__gt=today,
-        )
-        previous_round = None
-    except RoundPage.DoesNotExist:
-        current_round = None
+    # If the application period is closed, don't show projects from the current round
+    current_round = phases.application_round
+    previous_round = None
+    if current_round is None:
         try:
             previous_round = community.rounds.filter(
-                appslate__lte=today,
+                appslate__lte=phases.today,
                 participation__approval_status=ApprovalStatus.APPROVED,
             ).latest('internstarts')
         except RoundPage.DoesNotExist:
@@ -1016,6 +1016,8 @@ class CommunityNotificationUpdate(LoginRequiredMixin, ComradeRequiredMixin, Upda
     def get_success_url(self):
         return self.object.community.get_preview_url()
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def community_landing_view(request, round_slug, community_slug):
     # Try to see if this community is participating in that round
     # and if so, get the Participation object and related objects.
@@ -1089,14 +1091,8 @@ class CommunityCreate(LoginRequiredMixin, ComradeRequiredMixin, CreateView):
             ]
 
     def get_form(self):
-        now = datetime.now(timezone.utc)
-        today = get_deadline_date_for(now)
-
-        try:
-            self.current_round = RoundPage.objects.filter(
-                lateorgs__gt=today,
-            ).earliest('lateorgs')
-        except RoundPage.DoesNotExist:
+        self.current_round = get_round_phases(self.request).community_signup_round
+        if self.current_round is None:
             raise PermissionDenied("There is no round you can participate in right now.")
         return super(CommunityCreate, self).get_form()
 
@@ -1199,6 +1195,8 @@ class ParticipationAction(ApprovalStatusAction):
                 notification.delete()
 
 # This view is for mentors and coordinators to review project information and approve it
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def project_read_only_view(request, round_slug, community_slug, project_slug):
     project = get_object_or_404(
             Project.objects.select_related('project_round__participating_round', 'project_round__community'),
@@ -1446,14 +1444,22 @@ class SendEmailView(LoginRequiredMixin, ComradeRequiredMixin, BaseEmailBackend,
     def get_round(self):
         return get_object_or_404(RoundPage, slug=self.kwargs['round_slug'])
 
-    def get_context_data(self, **kwargs):
+    def get_messages(self, current_round):
         """
         Use this view's BaseEmailBackend implementation to do a dry-run of
-        sending the generated messages, and return a preview of the messages
-        that would be sent.
+        sending the generated messages, and return the messages that would
+        be sent. Both the preview and the outbox use this.
         """
         self.messages = []
-        self.generate_messages(current_round=self.get_round(), connection=self)
+        with email.reuse_templates():
+            self.generate_messages(current_round=current_round, connection=self)
+        return self.messages
+
+    def get_context_data(self, **kwargs):
+        """
+        Return a preview of the messages that would be sent.
+        """
+        self.get_messages(self.get_round())
         context = super(SendEmailView, self).get_context_data(**kwargs)
         context['messages'] = self.messages
         return context
@@ -1468,19 +1474,29 @@ class SendEmailView(LoginRequiredMixin, ComradeRequiredMixin, BaseEmailBackend,
 
     def post(self, request, *args, **kwargs):
         """
-        Use the real email backend to send the generated messages.
+        Queue the generated messages in the outbox. The send_queued_email
+        management command sends them, so this request doesn't have to wait
+        for the mail server.
         """
-        with mail.get_connection() as connection:
-            self.generate_messages(current_round=self.get_round(), connection=connection)
-        return redirect(reverse('dashboard'))
+        current_round = self.get_round()
+        self.get_messages(current_round)
+
+        batch = EmailBatch.objects.create(
+                description='{} for {}'.format(type(self).__name__, current_round.official_name)[:SENTENCE_LENGTH],
+                created_by=request.user,
+                )
+        OutgoingEmail.objects.bulk_create(
+                OutgoingEmail.from_message(batch, message)
+                for message in self.messages)
+        return redirect(reverse('email-outbox'))
 
 class MentorCheckDeadlinesReminder(SendEmailView):
     def generate_messages(self, current_round, connection):
         if not self.request.user.is_staff:
             raise PermissionDenied("You are not authorized to send reminder emails.")
-        projects = Project.objects.filter(
+        projects = Project.with_email_recipients(Project.objects.filter(
                 approval_status__in=[Project.APPROVED, Project.PENDING],
-                project_round__participating_round=current_round)
+                project_round__participating_round=current_round))
         for p in projects:
             email.project_applicant_review(p, self.request, connection=connection)
 
@@ -1492,7 +1508,7 @@ def get_open_approved_projects(current_round):
         return Project.objects.filter(
                 deadline=Project.LATE,
                 project_round__participating_round=current_round).all().approved()
-    return ()
+    return Project.objects.none()
 
 def get_closed_approved_projects(current_round):
     if current_round.has_ontime_application_deadline_passed():
@@ -1503,13 +1519,13 @@ def get_closed_approved_projects(current_round):
         return Project.objects.filter(
                 deadline=Project.LATE,
                 project_round__participating_round=current_round).all().approved()
-    return ()
+    return Project.objects.none()
 
 class MentorApplicationDeadlinesReminder(SendEmailView):
     def generate_messages(self, current_round, connection):
         if not self.request.user.is_staff:
             raise PermissionDenied("You are not authorized to send reminder emails.")
-        projects = get_open_approved_projects(current_round)
+        projects = Project.with_email_recipients(get_open_approved_projects(current_round))
         for p in projects:
             email.mentor_application_deadline_reminder(p, self.request, connection=connection)
 
@@ -1517,7 +1533,7 @@ class MentorInternSelectionReminder(SendEmailView):
     def generate_messages(self, current_round, connection):
         if not self.request.user.is_staff:
             raise PermissionDenied("You are not authorized to send reminder emails.")
-        projects = get_closed_approved_projects(current_round)
+        projects = Project.with_email_recipients(get_closed_approved_projects(current_round))
         for p in projects:
             email.mentor_intern_selection_reminder(p, self.request, connection=connection)
 
@@ -1525,9 +1541,9 @@ class CoordinatorInternSelectionReminder(SendEmailView):
     def generate_messages(self, current_round, connection):
         if not self.request.user.is_staff:
             raise PermissionDenied("You are not authorized to send reminder emails.")
-        participations = Participation.objects.filter(
+        participations = Participation.with_email_recipients(Participation.objects.filter(
                 participating_round=current_round,
-                approval_status=Participation.APPROVED)
+                approval_status=Participation.APPROVED))
         for p in participations:
             email.coordinator_intern_selection_reminder(p, self.request, connection=connection)
 
@@ -1851,13 +1867,14 @@ def community_applicants(request, round_slug, community_slug):
         'current_round': current_round,
         'community': participation.community,
         'participation': participation,
+        'community_applicants': CommunityApplicants(participation),
         'is_coordinator': user_is_coordinator,
         'is_staff': user_is_staff,
         })
 
 def contribution_tips(request):
     try:
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(request)
     except PermissionDenied:
         current_round = None # don't display any eligibility prompts
 
@@ -1869,23 +1886,18 @@ def contribution_tips(request):
         })
 
 def eligibility_information(request):
-    now = datetime.now(timezone.utc)
-    today = get_deadline_date_for(now)
-
-    try:
-        # The most relevant dates come from the soonest round where internships
-        # haven't started yet...
-        current_round = RoundPage.objects.filter(
-            internstarts__gt=today,
-        ).earliest('internstarts')
-    except RoundPage.DoesNotExist:
-        try:
-            # ...but if there aren't any, use the round that started most
-            # recently, so people get some idea of what the timeline looks like
-            # even when the next round isn't announced yet.
-            current_round = RoundPage.objects.latest('internstarts')
-        except RoundPage.DoesNotExist:
-            raise Http404("No internship rounds configured yet!")
+    phases = get_round_phases(request)
+
+    # The most relevant dates come from the soonest round where internships
+    # haven't started yet...
+    current_round = phases.upcoming_internship_round
+    if current_round is None:
+        # ...but if there aren't any, use the round that started most
+        # recently, so people get some idea of what the timeline looks like
+        # even when the next round isn't announced yet.
+        current_round = phases.latest_round
+    if current_round is None:
+        raise Http404("No internship rounds configured yet!")
 
     return render(request, 'home/eligibility.html', {
         'current_round': current_round,
@@ -1981,37 +1993,49 @@ def generic_mentor_contract_export_view(request):
     response['Content-Disposition'] = 'attachment; filename="mentor-contract-generic-unsigned.md"'
     return response
 
+def comrade_contract_columns(get_comrade, get_contract):
+    return (
+            ('public name', lambda o: get_comrade(o).public_name),
+            ('legal name', lambda o: get_comrade(o).legal_name),
+            ('blog URL', lambda o: get_comrade(o).blog_url),
+            ('email address', lambda o: get_comrade(o).account.email),
+            ('contract signed by', lambda o: get_contract(o).legal_name),
+            ('contract signed on', lambda o: str(get_contract(o).date_signed)),
+            ('contract signed from', lambda o: get_contract(o).ip_address),
+            ('contract text', lambda o: get_contract(o).text),
+            )
+
+MENTOR_CONTRACT_COLUMNS = comrade_contract_columns(
+        lambda mr: mr.mentor.mentor,
+        lambda mr: mr.contract)
+
+INTERN_CONTRACT_COLUMNS = comrade_contract_columns(
+        lambda sel: sel.applicant.applicant,
+        lambda sel: sel.intern_contract) + (
+        ('community', lambda sel: sel.community_name()),
+        ('mentors', lambda sel: [
+            export_row(mr, MENTOR_CONTRACT_COLUMNS)
+            for mr in sel.mentorrelationship_set.all()
+            ]),
+        )
+
 @login_required
 @staff_member_required
+@condition(etag_func=export_etag)
 def contract_export_view(request, round_slug):
-    def export_comrade_with_contract(comrade, contract):
-        return {
-                'public name': comrade.public_name,
-                'legal name': comrade.legal_name,
-                'blog URL': comrade.blog_url,
-                'email address': comrade.account.email,
-                'contract signed by': contract.legal_name,
-                'contract signed on': str(contract.date_signed),
-                'contract signed from': contract.ip_address,
-                'contract text': contract.text,
-                }
-
     this_round = get_object_or_404(RoundPage,
             slug=round_slug)
-    interns = this_round.get_approved_intern_selections().exclude(intern_contract=None)
-    dictionary_list = []
-    for sel in interns:
-        intern_export = export_comrade_with_contract(sel.applicant.applicant,
-                sel.intern_contract)
-        intern_export['community'] = sel.community_name()
-        intern_export['mentors'] = [
-                export_comrade_with_contract(mr.mentor.mentor, mr.contract)
-                for mr in sel.mentorrelationship_set.all()
-                ]
-        dictionary_list.append(intern_export)
-    response = JsonResponse(dictionary_list, safe=False)
-    response['Content-Disposition'] = 'attachment; filename="' + round_slug + '-contracts.json"'
-    return response
+    interns = this_round.get_approved_intern_selections().exclude(
+            intern_contract=None).select_related(
+            'applicant__applicant__account',
+            'intern_contract',
+            'project__project_round__community',
+            ).prefetch_related(
+            models.Prefetch('mentorrelationship_set',
+                queryset=MentorRelationship.objects.select_related('mentor__mentor__account', 'contract')),
+            )
+    return export_response(request, round_slug + '-contracts',
+            iterate_in_chunks(interns), INTERN_CONTRACT_COLUMNS)
 
 class SignedContractForm(ModelForm):
     class Meta:
@@ -2372,7 +2396,10 @@ class InternApprove(LoginRequiredMixin, ComradeRequiredMixin, reversion.views.Re
             self.intern_selection.organizer_approved = None
         self.intern_selection.save()
 
-        return redirect(reverse('dashboard') + "#intern-{project}-{applicant}".format(
+        return redirect(reverse('intern-selection-report', kwargs={
+            'round_slug': current_round.slug,
+            }) + "?community={community}#intern-{project}-{applicant}".format(
+            community=self.intern_selection.project.project_round.community.slug,
             project=self.intern_selection.project.slug,
             applicant=self.intern_selection.applicant.applicant.pk))
 
@@ -2473,8 +2500,12 @@ class InternAgreementSign(LoginRequiredMixin, ComradeRequiredMixin, CreateView):
 def round_statistics(request, round_slug):
     current_round = RoundPage.objects.get(slug=round_slug)
     todays_date = datetime.now()
+    # Staff can add ?refresh to the URL to recompute the snapshot right now.
+    statistics = current_round.get_statistics(
+            refresh=request.user.is_staff and 'refresh' in request.GET)
     return render(request, 'home/blog/round-statistics.html', {
         'current_round': current_round,
+        'statistics': statistics,
         'todays_date': todays_date,
         })
 
@@ -2482,7 +2513,8 @@ class InternNotification(SendEmailView):
     def generate_messages(self, current_round, connection):
         if not self.request.user.is_staff:
             raise PermissionDenied("You are not authorized to send reminder emails.")
-        interns = current_round.get_approved_intern_selections()
+        interns = InternSelection.with_email_recipients(
+                current_round.get_approved_intern_selections())
 
         for i in interns:
             email.notify_accepted_intern(i, self.request, connection=connection)
@@ -2493,7 +2525,8 @@ class InternWeek(SendEmailView):
             raise PermissionDenied("You are not authorized to send reminder emails.")
 
         template = 'home/email/internship-week-{}.txt'.format(self.kwargs['week'])
-        interns = current_round.get_in_good_standing_intern_selections()
+        interns = InternSelection.with_email_recipients(
+                current_round.get_in_good_standing_intern_selections())
 
         for i in interns:
             email.biweekly_internship_email(i, self.request, template, connection=connection)
@@ -2613,39 +2646,77 @@ class InitialInternFeedbackUpdate(LoginRequiredMixin, reversion.views.RevisionMi
         feedback.save()
         return redirect(reverse('dashboard') + '#feedback')
 
-def export_feedback(feedback):
-    return {
-            'intern public name': feedback.intern_selection.applicant.applicant.public_name,
-            'intern legal name': feedback.intern_selection.applicant.applicant.legal_name,
-            'intern email address': feedback.intern_selection.applicant.applicant.account.email,
-            'community': feedback.intern_selection.community_name(),
-            'mentor public name': feedback.get_mentor_public_name(),
-            'mentor legal name': feedback.get_mentor_legal_name(),
-            'mentor email address': feedback.get_mentor_email(),
-            'feedback submitted on': str(feedback.get_date_submitted()),
-            'feedback submitted from': feedback.ip_address,
-            'payment approved': feedback.payment_approved,
-            'progress report': feedback.progress_report,
-            'extension requested': feedback.request_extension,
-            'extension date': str(feedback.extension_date),
-            'termination requested': feedback.request_termination,
-            'termination reason': feedback.termination_reason,
-            }
+FEEDBACK_COLUMNS = (
+        ('intern public name', lambda f: f.intern_selection.applicant.applicant.public_name),
+        ('intern legal name', lambda f: f.intern_selection.applicant.applicant.legal_name),
+        ('intern email address', lambda f: f.intern_selection.applicant.applicant.account.email),
+        ('community', lambda f: f.intern_selection.community_name()),
+        ('mentor public name', lambda f: f.get_mentor_public_name()),
+        ('mentor legal name', lambda f: f.get_mentor_legal_name()),
+        ('mentor email address', lambda f: f.get_mentor_email()),
+        ('feedback submitted on', lambda f: str(f.get_date_submitted())),
+        ('feedback submitted from', lambda f: f.ip_address),
+        ('payment approved', lambda f: f.payment_approved),
+        ('progress report', lambda f: f.progress_report),
+        ('extension requested', lambda f: f.request_extension),
+        ('extension date', lambda f: str(f.extension_date)),
+        ('termination requested', lambda f: f.request_termination),
+        ('termination reason', lambda f: f.termination_reason),
+        )
+
+def feedback_export_response(request, this_round, stage, feedback_model):
+    feedback_attr = feedback_model._meta.model_name
+    interns = this_round.get_approved_intern_selections().select_related(
+            feedback_attr,
+            'applicant__applicant__account',
+            'project__project_round__community',
+            )
+
+    def resolve_mentors(interns):
+        feedback_model.resolve_mentor_versions([
+            getattr(i, feedback_attr)
+            for i in interns
+            if hasattr(i, feedback_attr)
+            ])
+
+    feedback = (
+            getattr(i, feedback_attr)
+            for i in iterate_in_chunks(interns, prepare=resolve_mentors)
+            if hasattr(i, feedback_attr)
+            )
+    return export_response(request, '{}-{}-feedback'.format(this_round.slug, stage),
+            feedback, FEEDBACK_COLUMNS)
 
 @login_required
 @staff_member_required
+@condition(etag_func=export_etag)
 def initial_mentor_feedback_export_view(request, round_slug):
     this_round = get_object_or_404(RoundPage, slug=round_slug)
-    interns = this_round.get_approved_intern_selections()
-    dictionary_list = []
-    for i in interns:
-        try:
-            dictionary_list.append(export_feedback(i.initialmentorfeedback))
-        except InitialMentorFeedback.DoesNotExist:
-            continue
-    response = JsonResponse(dictionary_list, safe=False)
-    response['Content-Disposition'] = 'attachment; filename="' + round_slug + '-initial-feedback.json"'
-    return response
+    return feedback_export_response(request, this_round, 'initial', InitialMentorFeedback)
+
+@login_required
+@staff_member_required
+def intern_selection_report(request, round_slug):
+    current_round = get_object_or_404(RoundPage, slug=round_slug)
+    report = get_intern_selection_report(current_round, refresh='refresh' in request.GET)
+
+    community_slug = request.GET.get('community')
+    status = request.GET.get('status')
+    paginator = Paginator(report.filter(community_slug, status), 50)
+    try:
+        page = paginator.page(request.GET.get('page', 1))
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+
+    return render(request, 'home/intern_selection_report.html', {
+        'current_round': current_round,
+        'report': report,
+        'page': page,
+        'community_slug': community_slug,
+        'status': status,
+        })
 
 @login_required
 @staff_member_required
@@ -2762,18 +2833,10 @@ class MidpointInternFeedbackUpdate(LoginRequiredMixin, reversion.views.RevisionM
 
 @login_required
 @staff_member_required
+@condition(etag_func=export_etag)
 def midpoint_mentor_feedback_export_view(request, round_slug):
     this_round = get_object_or_404(RoundPage, slug=round_slug)
-    interns = this_round.get_approved_intern_selections()
-    dictionary_list = []
-    for i in interns:
-        try:
-            dictionary_list.append(export_feedback(i.midpointmentorfeedback))
-        except MidpointMentorFeedback.DoesNotExist:
-            continue
-    response = JsonResponse(dictionary_list, safe=False)
-    response['Content-Disposition'] = 'attachment; filename="' + round_slug + '-midpoint-feedback.json"'
-    return response
+    return feedback_export_response(request, this_round, 'midpoint', MidpointMentorFeedback)
 
 @login_required
 @staff_member_required
@@ -2912,18 +2975,10 @@ class FinalInternFeedbackUpdate(LoginRequiredMixin, reversion.views.RevisionMixi
 
 @login_required
 @staff_member_required
+@condition(etag_func=export_etag)
 def final_mentor_feedback_export_view(request, round_slug):
     this_round = get_object_or_404(RoundPage, slug=round_slug)
-    interns = this_round.get_approved_intern_selections()
-    dictionary_list = []
-    for i in interns:
-        try:
-            dictionary_list.append(export_feedback(i.finalmentorfeedback))
-        except FinalMentorFeedback.DoesNotExist:
-            continue
-    response = JsonResponse(dictionary_list, safe=False)
-    response['Content-Disposition'] = 'attachment; filename="' + round_slug + '-final-feedback.json"'
-    return response
+    return feedback_export_response(request, this_round, 'final', FinalMentorFeedback)
 
 @login_required
 @staff_member_required
@@ -2936,18 +2991,52 @@ def final_feedback_summary(request, round_slug):
             },
             )
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def alums_page(request):
     # Get all the older AlumInfo models (before we had round pages)
-    pages = CohortPage.objects.all()
-    old_cohorts = []
-    for p in pages:
-        old_cohorts.append((p.round_start, p.round_end,
-            AlumInfo.objects.filter(page=p).order_by('community', 'name')))
-    rounds = RoundPage.objects.all().order_by('-internstarts')
-    rounds = [x for x in rounds if x.has_intern_announcement_deadline_passed() and x.get_approved_intern_selections() != None]
+    alums_by_page = {}
+    for alum in AlumInfo.objects.select_related('picture').order_by('community', 'name'):
+        alums_by_page.setdefault(alum.page_id, []).append(alum)
+    old_cohorts = [
+            (p.round_start, p.round_end, alums_by_page.get(p.pk, []))
+            for p in CohortPage.objects.all()
+            ]
+
+    today = get_deadline_date_for(datetime.now(timezone.utc))
+    rounds = list(RoundPage.objects.filter(internannounce__lte=today).order_by('-internstarts'))
+
+    def render_rounds(rounds):
+        # Load the interns for every round that needs rendering at once.
+        interns_by_round = dict((r.pk, []) for r in rounds)
+        interns = RoundPage.get_intern_selections_in(rounds).filter(
+                organizer_approved=True).select_related(
+                'applicant__applicant__account',
+                'project__project_round__community',
+                ).prefetch_related('mentors__mentor')
+        for i in interns:
+            interns_by_round[i.project.project_round.participating_round_id].append(i)
+
+        rendered = {}
+        for r in rounds:
+            in_good_standing = sum(1 for i in interns_by_round[r.pk] if i.in_good_standing)
+            rendered[r.pk] = {
+                'in_good_standing': in_good_standing,
+                'html': render_to_string('home/snippet/alum_round.html', {
+                    'round': r,
+                    'interns': interns_by_round[r.pk],
+                    'in_good_standing': in_good_standing,
+                    'user': request.user,
+                    }),
+                }
+        return rendered
+
+    fragments = get_alum_round_fragments(rounds, request.user.is_staff, render_rounds)
     return render(request, 'home/alums.html', {
         'old_cohorts': old_cohorts,
-        'rounds': rounds,
+        'latest_round': rounds[0] if rounds else None,
+        'num_in_good_standing': fragments[rounds[0].pk]['in_good_standing'] if rounds else 0,
+        'round_fragments': [fragments[r.pk]['html'] for r in rounds],
         })
 
 def privacy_policy(request):
@@ -3065,27 +3154,36 @@ class Survey2018Notification(LoginRequiredMixin, ComradeRequiredMixin, TemplateV
 def applicant_review_summary(request, status):
     """
     For applicant reviewers and staff, show the status of applications that
-    have the specified approval status.
+    have the specified approval status, a page at a time.
     """
-    current_round = get_current_round_for_initial_application()
+    current_round = get_current_round_for_initial_application(request)
 
     if not request.user.is_staff and not current_round.is_reviewer(request.user):
         raise PermissionDenied("You are not authorized to review applications.")
 
-    applications = ApplicantApproval.objects.filter(
-        application_round=current_round,
-        approval_status=status,
-    ).order_by('pk')
+    def application_id(name):
+        try:
+            return int(request.GET[name])
+        except (KeyError, ValueError):
+            return None
 
-    if status == ApprovalStatus.PENDING:
-        context_name = 'pending_applications'
-    elif status == ApprovalStatus.REJECTED:
-        context_name = 'rejected_applications'
-    elif status == ApprovalStatus.APPROVED:
-        context_name = 'approved_applications'
+    queue = ApplicantReviewQueue(
+            current_round,
+            status,
+            revision=request.GET.get('revision'),
+            owner=request.GET.get('owner'),
+            red_flags=request.GET.get('red_flags'),
+            rating=request.GET.get('rating'),
+            after=application_id('after'),
+            before=application_id('before'),
+            )
 
     return render(request, 'home/applicant_review_summary.html', {
-        context_name: applications,
+        'queue': queue,
+        'status': status,
+        'status_label': dict(ApprovalStatus.APPROVAL_STATUS_CHOICES)[status],
+        'pending_status': ApprovalStatus.PENDING,
+        'filter_query': urlencode(queue.get_filters()),
     })
 
 # Passed action, applicant_username
@@ -3093,7 +3191,7 @@ class ApplicantApprovalUpdate(ApprovalStatusAction):
     model = ApplicantApproval
 
     def get_object(self):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         return get_object_or_404(ApplicantApproval,
                 applicant__account__username=self.kwargs['applicant_username'],
                 application_round=current_round)
@@ -3116,7 +3214,7 @@ class DeleteApplication(LoginRequiredMixin, ComradeRequiredMixin, View):
         if not request.user.is_staff:
             raise PermissionDenied("Only Outreachy organizers can delete initial applications.")
 
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         application = get_object_or_404(ApplicantApproval,
                 applicant__account__username=self.kwargs['applicant_username'],
                 application_round=current_round)
@@ -3129,7 +3227,7 @@ class DeleteApplication(LoginRequiredMixin, ComradeRequiredMixin, View):
 class NotifyEssayNeedsUpdating(LoginRequiredMixin, ComradeRequiredMixin, View):
 
     def post(self, request, *args, **kwargs):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         # Allow staff to ask applicants to revise their essays
         if not request.user.is_staff:
             raise PermissionDenied("Only Outreachy organizers can ask applicants to revise their essays.")
@@ -3157,7 +3255,7 @@ class BarriersToParticipationUpdate(LoginRequiredMixin, ComradeRequiredMixin, re
             ]
 
     def get_object(self):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         # Only allow applicants to revise their own essays
         if self.request.user.comrade.account.username != self.kwargs['applicant_username']:
             raise PermissionDenied('You can only edit your own essay.')
@@ -3178,7 +3276,7 @@ class BarriersToParticipationUpdate(LoginRequiredMixin, ComradeRequiredMixin, re
 class NotifySchoolInformationUpdating(LoginRequiredMixin, ComradeRequiredMixin, View):
 
     def post(self, request, *args, **kwargs):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         if not request.user.is_staff:
             raise PermissionDenied("Only Outreachy organizers can ask applicants to revise their school information.")
 
@@ -3204,7 +3302,7 @@ class SchoolInformationUpdate(LoginRequiredMixin, ComradeRequiredMixin, reversio
             ]
 
     def get_object(self):
-        current_round = get_current_round_for_initial_application()
+        current_round = get_current_round_for_initial_application(self.request)
         # Only allow applicants to revise their own essays
         if self.request.user.comrade.account.username != self.kwargs['applicant_username']:
             raise PermissionDenied('You can only edit your own school information.')
@@ -3232,7 +3330,7 @@ class SchoolInformationUpdate(LoginRequiredMixin, ComradeRequiredMixin, reversio
 
 def get_or_create_application_reviewer_and_review(self):
     # Only allow approved reviewers to rate applications for the current round
-    current_round = get_current_round_for_initial_application()
+    current_round = get_current_round_for_initial_application(self.request)
 
     try:
         reviewer = ApplicationReviewer.objects.get(
@@ -3372,14 +3470,26 @@ class ReviewCommentUpdate(LoginRequiredMixin, ComradeRequiredMixin, UpdateView):
             'applicant_username': self.kwargs['applicant_username'],
             })
 
+@condition(etag_func=anonymous_page_etag)
+@cache_anonymous_page
 def travel_stipend(request):
     rounds = RoundPage.objects.all().order_by('-internstarts')
     return render(request, 'home/travel_stipend.html', {
         'rounds': rounds,
         })
 
+@login_required
+@staff_member_required
+def email_outbox(request):
+    batches = EmailBatch.with_progress(EmailBatch.objects.select_related('created_by')).order_by('-created')[:20]
+    return render(request, 'home/email_outbox.html', {
+        'batches': batches,
+    })
+
 @login_required
 def dashboard(request):
+    sections, section_timings = get_dashboard_sections(request)
     return render(request, 'home/dashboard.html', {
-        'sections': get_dashboard_sections(request),
+        'sections': sections,
+        'section_timings': section_timings,
     })
@@ -1,5 +1,15 @@
+import logging
+import random
+import time
+
 from django.conf import settings
 from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from . import requesttiming
+
+logger = logging.getLogger(__name__)
 
 class XForwardedForMiddleware(object):
     def __init__(self, get_response):
@@ -13,3 +23,100 @@ class XForwardedForMiddleware(object):
         if forwarded and request.META.get('REMOTE_ADDR') in self.trusted_proxies:
             request.META['REMOTE_ADDR'] = forwarded.split(',')[-1].strip()
         return self.get_response(request)
+
+class StreamingContent(object):
+    """
+    Wraps a streaming response's content to call finished when the response
+    is closed. Django closes streaming content that has a close method even
+    if nothing iterated over it, which a generator's finally block can't
+    count on.
+    """
+    def __init__(self, content, finished):
+        self.content = content
+        self.finished = finished
+
+    def __iter__(self):
+        return iter(self.content)
+
+    def close(self):
+        finished, self.finished = self.finished, None
+        if finished is not None:
+            finished()
+
+class RequestTimingMiddleware(object):
+    """
+    Time every request, and log the ones slower than SLOW_REQUEST_SECONDS.
+
+    A random REQUEST_TIMING_SAMPLE_RATE fraction of requests also have their
+    queries captured. Those are recorded for the per-view statistics on the
+    staff dashboard (see outreachyhome/requesttiming.py), and if they're
+    slow, the log message lists their most repeated queries. Capturing
+    queries has a cost, which is why it's only done for a sample.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 0)
+        if random.random() >= sample_rate:
+            start = time.perf_counter()
+            response = self.get_response(request)
+
+            def finished():
+                self.log_if_slow(request, time.perf_counter() - start)
+            return self.when_finished(response, finished)
+
+        start = time.perf_counter()
+        queries = CaptureQueriesContext(connection)
+        queries.__enter__()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            queries.__exit__(None, None, None)
+            raise
+
+        def finished():
+            queries.__exit__(None, None, None)
+            seconds = time.perf_counter() - start
+            captured = queries.captured_queries
+            db_seconds = sum(float(query['time']) for query in captured)
+            view_name = self.get_view_name(request)
+            if view_name is not None:
+                requesttiming.record(view_name, seconds, db_seconds, len(captured))
+            self.log_if_slow(request, seconds, captured, db_seconds)
+            requesttiming.flush_if_due()
+        return self.when_finished(response, finished)
+
+    def when_finished(self, response, finished):
+        """
+        Call finished once the response is complete. Streaming responses,
+        like the exports, do most of their work as the server sends them,
+        after get_response has returned; for those, wait until the response
+        is closed, which happens whether or not all of it was sent.
+        """
+        if not response.streaming:
+            finished()
+            return response
+
+        response.streaming_content = StreamingContent(response.streaming_content, finished)
+        return response
+
+    def get_view_name(self, request):
+        # Only requests that resolved to a view have a name to file them under.
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None
+        return match.view_name
+
+    def log_if_slow(self, request, seconds, captured=None, db_seconds=None):
+        threshold = getattr(settings, 'SLOW_REQUEST_SECONDS', None)
+        if threshold is None or seconds < threshold:
+            return
+
+        message = 'Slow request: {} {} ({}) took {:.0f} ms'.format(
+            request.method, request.path, self.get_view_name(request), seconds * 1000)
+        if captured is not None:
+            message += ', {} queries in {:.0f} ms'.format(len(captured), db_seconds * 1000)
+            for count, sql in requesttiming.repeated_queries(captured):
+                message += '\n  {}x {}'.format(count, sql)
+        logger.warning(message)
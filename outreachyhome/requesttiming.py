@@ -0,0 +1,130 @@
+"""
+Collect how long each view takes, for the staff dashboard.
+
+RequestTimingMiddleware (in outreachyhome/middleware.py) records a sample
+for a random REQUEST_TIMING_SAMPLE_RATE fraction of requests: the wall
+time, the time spent in the database, and the number of queries. Samples
+are kept in memory and merged into the cache every
+REQUEST_TIMING_FLUSH_INTERVAL seconds, so all the server processes share one
+set of statistics without writing to the cache on every request. Only the
+newest MAX_SAMPLES samples for each view are kept.
+
+Like search hits, samples still waiting when a server process exits are
+lost, and two processes flushing at once can drop each other's samples.
+They're only statistics, so that's fine.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import Counter, defaultdict
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+__all__ = ('record', 'flush', 'flush_if_due', 'get_summary', 'fingerprint', 'repeated_queries')
+
+DEFAULT_FLUSH_INTERVAL = 60
+MAX_SAMPLES = 500
+CACHE_KEY = 'outreachyhome:request-timing'
+# Keep samples around for a week after the last time anything flushed.
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+_lock = threading.Lock()
+_pending = defaultdict(list)
+_oldest = None
+
+
+def record(view_name, seconds, db_seconds, queries):
+    global _oldest
+    with _lock:
+        if not _pending:
+            _oldest = time.monotonic()
+        _pending[view_name].append((seconds, db_seconds, queries))
+
+
+def is_flush_due():
+    interval = getattr(settings, 'REQUEST_TIMING_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    with _lock:
+        return bool(_pending) and time.monotonic() - _oldest >= interval
+
+
+def flush():
+    """
+    Merge every sample recorded so far into the cache.
+    """
+    global _oldest
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _oldest = None
+
+    if not pending:
+        return
+    samples = cache.get(CACHE_KEY) or {}
+    for view_name, new_samples in pending.items():
+        samples[view_name] = (samples.get(view_name, []) + new_samples)[-MAX_SAMPLES:]
+    cache.set(CACHE_KEY, samples, CACHE_TIMEOUT)
+
+
+def flush_if_due():
+    if is_flush_due():
+        flush()
+
+
+def percentile(ordered, fraction):
+    # nearest-rank percentile of an already-sorted, non-empty list
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def get_summary():
+    """
+    Return a list of dicts, one per view, with the number of samples and
+    percentiles of wall time, database time, and queries. The slowest views
+    (by 90th percentile) come first.
+    """
+    summary = []
+    for view_name, samples in (cache.get(CACHE_KEY) or {}).items():
+        seconds = sorted(s[0] for s in samples)
+        db_seconds = sorted(s[1] for s in samples)
+        queries = sorted(s[2] for s in samples)
+        summary.append({
+            'view': view_name,
+            'samples': len(samples),
+            'p50_ms': round(percentile(seconds, 0.5) * 1000),
+            'p90_ms': round(percentile(seconds, 0.9) * 1000),
+            'p99_ms': round(percentile(seconds, 0.99) * 1000),
+            'db_p50_ms': round(percentile(db_seconds, 0.5) * 1000),
+            'queries_p50': percentile(queries, 0.5),
+            'queries_max': queries[-1],
+        })
+    summary.sort(key=lambda row: row['p90_ms'], reverse=True)
+    return summary
+
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number = re.compile(r'\b\d+(?:\.\d+)?\b')
+_placeholder_list = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+
+
+def fingerprint(sql):
+    """
+    Replace the literal values in a query with ?, so queries that only
+    differ by which row they're looking up come out the same.
+    """
+    sql = _string_literal.sub('?', sql)
+    sql = _number.sub('?', sql)
+    return _placeholder_list.sub('(...)', sql)
+
+
+def repeated_queries(captured_queries, limit=3):
+    """
+    Return up to limit (count, fingerprint) pairs for the queries that were
+    run more than once, most repeated first. A lot of repeats of one query
+    usually means something is being loaded once per row.
+    """
+    counts = Counter(fingerprint(query['sql']) for query in captured_queries)
+    return [(count, sql) for sql, count in counts.most_common(limit) if count > 1]
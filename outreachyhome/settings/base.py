@@ -29,7 +29,7 @@ BASE_DIR = os.path.dirname(PROJECT_DIR)
 
 INSTALLED_APPS = [
     'home',
-    'search',
+    'search.apps.SearchConfig',
     'contacts.apps.ContactsConfig',
 
     'wagtail.wagtailforms',
@@ -75,6 +75,7 @@ if 'SENTRY_DSN' in os.environ:
 MIDDLEWARE = [
     # https://docs.djangoproject.com/en/1.11/ref/middleware/#middleware-ordering
     'outreachyhome.middleware.XForwardedForMiddleware',
+    'outreachyhome.middleware.RequestTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -172,9 +173,42 @@ DATABASES = {
         default='sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3'))
 }
 
+# Search with PostgreSQL's full-text search when we're running on PostgreSQL.
+# It keeps a tsvector of every indexed page, project, and community, with a
+# GIN index, and ranks the results. Run "./manage.py update_index" after
+# turning it on. Other databases (like the SQLite databases used for local
+# development and tests) fall back to Wagtail's database search, which scans
+# the tables instead.
+if DATABASES['default']['ENGINE'].startswith('django.db.backends.postgresql'):
+    INSTALLED_APPS.append('wagtail.contrib.postgres_search')
+    WAGTAILSEARCH_BACKENDS = {
+        'default': {
+            'BACKEND': 'wagtail.contrib.postgres_search.backend',
+            'SEARCH_CONFIG': 'english',
+        },
+    }
+
 # If an error occurs in a view, make sure none of that view's changes are saved.
 ATOMIC_REQUESTS = True
 
+# How many seconds to keep whole pages cached for visitors who aren't logged
+# in, in case nothing they show changes before then. See home/pagecache.py.
+# Set this to 0 to turn that cache off.
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Search hits are counted in memory and saved after a request finishes, once
+# the oldest is this many seconds old or this many different searches are
+# waiting. See search/hits.py.
+SEARCH_HITS_FLUSH_INTERVAL = 60
+SEARCH_HITS_MAX_PENDING = 100
+
+# Log a warning for any request that takes longer than this many seconds.
+# This fraction of requests also count their queries, for the per-view
+# timings on the staff dashboard. See outreachyhome/middleware.py.
+SLOW_REQUEST_SECONDS = 2
+REQUEST_TIMING_SAMPLE_RATE = 0.05
+REQUEST_TIMING_FLUSH_INTERVAL = 60
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.11/topics/i18n/
 
@@ -254,6 +288,14 @@ ACCOUNT_ACTIVATION_DAYS = 7
 
 DEFAULT_FROM_EMAIL = 'organizers@outreachy.org'
 
+# Reminder emails are queued in the outbox and sent by the
+# send_queued_email management command, this many per connection to the
+# mail server, at most this many per second (0 means no limit), giving up
+# on a message after this many temporary failures.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_RATE = 0
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
 # Get optional settings for Raven/Sentry error logging. The Sentry DSN
 # should be given by the environment variable SENTRY_DSN, which is the
 # only environment variable that Raven automatically checks so we don't
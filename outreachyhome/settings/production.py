@@ -20,6 +20,15 @@ TRUSTED_PROXIES = os.getenv('TRUSTED_PROXIES', '172.17.0.1').split()
 
 SECRET_KEY = os.environ['SECRET_KEY']
 
+# Cached pages and their content versions (see home/pagecache.py) have to be
+# shared by all gunicorn workers, so don't use the per-process default cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/outreachyhome-cache'),
+    },
+}
+
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
 if EMAIL_HOST:
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -55,6 +64,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': os.getenv('DJANGO_LOG_LEVEL', 'WARNING'),
         },
+        'outreachyhome': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
     },
 }
 
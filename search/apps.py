@@ -0,0 +1,11 @@
+from __future__ import absolute_import, unicode_literals
+
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    name = 'search'
+
+    def ready(self):
+        from . import hits
+        hits.connect_signals()
@@ -0,0 +1,79 @@
+"""
+Count search queries without writing to the database during the search.
+
+Wagtail keeps a daily hit count for every search query, which it uses to
+show popular searches and to manage promoted results. Recording a hit is
+two or three writes, so instead of doing that in every search, we count
+hits in memory and save them all at once after a request has finished,
+once they're more than SEARCH_HITS_FLUSH_INTERVAL seconds old or there
+are SEARCH_HITS_MAX_PENDING different queries waiting.
+
+Hits still waiting when a server process exits are lost. They're only
+statistics, so that's fine.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import Counter
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import models
+from django.utils import timezone
+from wagtail.wagtailsearch.models import Query, QueryDailyHits
+
+__all__ = ('record_hit', 'flush', 'connect_signals')
+
+DEFAULT_FLUSH_INTERVAL = 60
+DEFAULT_MAX_PENDING = 100
+
+_lock = threading.Lock()
+_pending = Counter()
+_oldest = None
+
+
+def record_hit(query_string):
+    global _oldest
+    with _lock:
+        if not _pending:
+            _oldest = time.monotonic()
+        _pending[(query_string, timezone.now().date())] += 1
+
+
+def is_flush_due():
+    interval = getattr(settings, 'SEARCH_HITS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    max_pending = getattr(settings, 'SEARCH_HITS_MAX_PENDING', DEFAULT_MAX_PENDING)
+    with _lock:
+        return bool(_pending) and (
+            len(_pending) >= max_pending
+            or time.monotonic() - _oldest >= interval
+        )
+
+
+def flush():
+    """
+    Save every hit counted so far.
+    """
+    global _oldest
+    with _lock:
+        hits = _pending.copy()
+        _pending.clear()
+        _oldest = None
+
+    for (query_string, date), count in hits.items():
+        # Like Query.add_hit, but adding all of this query's hits at once.
+        query = Query.get(query_string)
+        daily_hits, created = QueryDailyHits.objects.get_or_create(query=query, date=date)
+        daily_hits.hits = models.F('hits') + count
+        daily_hits.save()
+
+
+def flush_if_due(**kwargs):
+    if is_flush_due():
+        flush()
+
+
+def connect_signals():
+    request_finished.connect(flush_if_due, dispatch_uid='search-hits')
@@ -1,10 +1,17 @@
 from __future__ import absolute_import, unicode_literals
 
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import prefetch_related_objects
 from django.shortcuts import render
 
+from home.models import ApprovalStatus, Community, Project
 from wagtail.wagtailcore.models import Page
-from wagtail.wagtailsearch.models import Query
+from wagtail.wagtailsearch.backends import get_search_backend
+
+from .hits import record_hit
+
+# How many matching projects and communities to list above the pages.
+OTHER_RESULTS = 10
 
 
 def search(request):
@@ -14,12 +21,27 @@ def search(request):
     # Search
     if search_query:
         search_results = Page.objects.live().search(search_query)
-        query = Query.get(search_query)
-
-        # Record hit
-        query.add_hit()
+        backend = get_search_backend()
+        # Only show projects that are shown on their community's landing page.
+        projects = Project.objects.filter(
+            approval_status=ApprovalStatus.APPROVED,
+            project_round__approval_status=ApprovalStatus.APPROVED,
+        )
+        project_results = list(backend.search(search_query, projects)[:OTHER_RESULTS])
+        # The postgres backend joins against this queryset's SQL by id, so
+        # joining in other tables there would make its columns ambiguous.
+        prefetch_related_objects(project_results,
+            'project_round__community',
+            'project_round__participating_round',
+        )
+        community_results = list(backend.search(search_query, Community.objects.all())[:OTHER_RESULTS])
+
+        # Record hit, without writing to the database right now
+        record_hit(search_query)
     else:
         search_results = Page.objects.none()
+        project_results = []
+        community_results = []
 
     # Pagination
     paginator = Paginator(search_results, 10)
@@ -33,4 +55,6 @@ def search(request):
     return render(request, 'search/search.html', {
         'search_query': search_query,
         'search_results': search_results,
+        'project_results': project_results,
+        'community_results': community_results,
     })